@@ -0,0 +1,107 @@
+"""
+Access Log for MUN Society Website
+Pure ASGI middleware emitting one JSON line per (sampled) request. Bodies are
+counted as they stream through, never buffered; body capture is opt-in.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.log_writer import LineWriter
+
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() == "true"
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))  # 0.0 - 1.0
+ACCESS_LOG_FILE = os.getenv("ACCESS_LOG_FILE")  # default: stdout
+ACCESS_LOG_BODY = os.getenv("ACCESS_LOG_BODY", "false").lower() == "true"
+ACCESS_LOG_BODY_MAX = int(os.getenv("ACCESS_LOG_BODY_MAX", "1024"))  # bytes
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+access_log_writer = LineWriter(
+    stream=sys.stdout,
+    path=ACCESS_LOG_FILE,
+    maxsize=ACCESS_LOG_QUEUE_SIZE,
+    name="access-log"
+)
+
+# Never captured, whatever ACCESS_LOG_BODY says
+_BINARY_CONTENT_TYPES = ("multipart/form-data", "application/octet-stream", "image/", "video/", "audio/")
+
+
+class AccessLogMiddleware:
+    """One structured line per request: method, route, status, duration, bytes in/out"""
+
+    def __init__(self, app, writer: LineWriter = access_log_writer,
+                 sample_rate: Optional[float] = None, capture_body: Optional[bool] = None,
+                 body_max: Optional[int] = None):
+        self.app = app
+        self.writer = writer
+        self.sample_rate = ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.capture_body = ACCESS_LOG_BODY if capture_body is None else capture_body
+        self.body_max = ACCESS_LOG_BODY_MAX if body_max is None else body_max
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"status": 500, "bytes_in": 0, "bytes_out": 0}
+        captured = bytearray()
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        content_type = headers.get("content-type", "")
+        capture = (
+            self.capture_body
+            and self.body_max > 0
+            and not content_type.startswith(_BINARY_CONTENT_TYPES)
+        )
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                state["bytes_in"] += len(chunk)
+                if capture and len(captured) < self.body_max:
+                    captured.extend(chunk[:self.body_max - len(captured)])
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes_out"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            status = state["status"]
+            # Server errors are always logged; everything else is sampled
+            if status >= 500 or self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+                route = scope.get("route")
+                entry = {
+                    "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "method": scope.get("method"),
+                    "route": getattr(route, "path", None) or scope.get("path"),
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "bytes_in": state["bytes_in"],
+                    "bytes_out": state["bytes_out"],
+                    "client": (scope.get("client") or [None])[0],
+                    "user_agent": headers.get("user-agent"),
+                }
+                if self.sample_rate < 1.0:
+                    entry["sample_rate"] = self.sample_rate
+                if capture and captured:
+                    entry["body"] = captured.decode("utf-8", errors="replace")
+                    entry["body_truncated"] = state["bytes_in"] > len(captured)
+                self.writer.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+
+
+def get_access_log_stats() -> dict:
+    """Queue depth and written/dropped counters for the access log"""
+    return access_log_writer.stats()
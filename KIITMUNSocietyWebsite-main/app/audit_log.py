@@ -0,0 +1,58 @@
+"""
+Audit Log for MUN Society Website
+Structured record of admin operations (actor, action, target, outcome).
+Records are queued and written in batches by a background writer with
+size-based rotation, so handlers never wait on disk.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.log_writer import LineWriter
+
+AUDIT_LOG_FILE = os.getenv("AUDIT_LOG_FILE", "./logs/admin_audit.log")
+AUDIT_LOG_MAX_BYTES = int(os.getenv("AUDIT_LOG_MAX_BYTES", "5242880"))  # 5MB
+AUDIT_LOG_BACKUPS = int(os.getenv("AUDIT_LOG_BACKUPS", "5"))
+
+audit_writer = LineWriter(
+    path=AUDIT_LOG_FILE,
+    maxsize=5000,
+    batch_size=100,
+    name="audit-log",
+    max_bytes=AUDIT_LOG_MAX_BYTES,
+    backups=AUDIT_LOG_BACKUPS
+)
+
+
+def _actor(user: Optional[dict]) -> Optional[dict]:
+    if not user:
+        return None
+    return {"id": user.get("id"), "email": user.get("email")}
+
+
+def audit(
+    action: str,
+    actor: Optional[dict] = None,
+    target_type: Optional[str] = None,
+    target_id: Any = None,
+    outcome: str = "success",
+    **details: Any
+) -> bool:
+    """Queue one audit record, e.g. audit("member.delete", admin_user, "user", 5)"""
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "actor": _actor(actor),
+        "action": action,
+        "target": {"type": target_type, "id": target_id} if target_type else None,
+        "outcome": outcome,
+    }
+    if details:
+        record["details"] = details
+    return audit_writer.write(json.dumps(record, default=str, separators=(",", ":"), ensure_ascii=False))
+
+
+def get_audit_log_stats() -> dict:
+    """Queue depth and written/dropped/rotation counters for the audit log"""
+    return audit_writer.stats()
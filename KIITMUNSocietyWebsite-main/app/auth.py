@@ -2,9 +2,37 @@ from fastapi import HTTPException, Header, Depends
 from typing import Optional
 from app.database import get_db
 from app.schemas import User
+from app.cache import TTLCache
+from app.session_tokens import TOKEN_PREFIX, verify_session_token
+from app.pagination import invalidate_counts
+import hashlib
 import os
 
+# Authenticated-principal cache (keyed on a hash of the Authorization header)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))  # seconds
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
 
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+def _principal_cache_key(authorization: str) -> str:
+    """Hash the raw Authorization header so credentials are never kept as keys"""
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+def invalidate_principal_cache(user_id: Optional[int] = None, email: Optional[str] = None) -> int:
+    """Drop cached principals after a write to users (all of them if no filter given)"""
+    if user_id is None and email is None:
+        removed = len(principal_cache)
+        principal_cache.clear()
+        return removed
+    
+    return principal_cache.invalidate_where(
+        lambda _key, user: (user_id is not None and user["id"] == user_id)
+        or (email is not None and user["email"] == email)
+    )
+
+def get_principal_cache_stats() -> dict:
+    """Hit/miss counters for the principal cache"""
+    return principal_cache.stats()
 
 async def verify_user_credentials(email: str, password: str, db) -> Optional[dict]:
     """Verify user email and password against database (Turso)"""
@@ -34,16 +62,29 @@ async def get_current_user(authorization: Optional[str] = Header(None), db = Dep
         raise HTTPException(status_code=401, detail="Authorization required")
     
     try:
-        # Expected format: "email:password"
+        # Session token issued by /api/auth/login - verified without touching the database
+        if authorization.startswith(TOKEN_PREFIX):
+            user = verify_session_token(authorization[len(TOKEN_PREFIX):].strip())
+            if not user:
+                raise HTTPException(status_code=401, detail="Invalid or expired session")
+            return user
+        
+        # Legacy format: "email:password"
         if ":" not in authorization:
             raise HTTPException(status_code=401, detail="Invalid authorization format")
         
+        cache_key = _principal_cache_key(authorization)
+        cached_user = principal_cache.get(cache_key)
+        if cached_user is not None:
+            return dict(cached_user)
+        
         email, password = authorization.split(":", 1)
         user = await verify_user_credentials(email, password, db)
         
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
+        principal_cache.set(cache_key, dict(user))
         return user
     except HTTPException:
         raise
@@ -91,6 +132,8 @@ async def create_user_account(email: str, password: str, name: str, role: str, d
             (email, password, name, role)
         )
         # No need to commit with Turso - it's automatic
+        invalidate_principal_cache(email=email)
+        invalidate_counts("users")
         return True
     except Exception as e:
         print(f"❌ Error creating user account: {e}")
@@ -0,0 +1,107 @@
+"""
+Blob Store for MUN Society Website
+Reference counting and garbage collection for the content-addressed uploads
+in the storage backend. A blob's references are the resources, blogs and carousel_images
+rows that name it, so there is no separate counter to drift out of sync.
+"""
+
+import os
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from app.storage_backends import KINDS, get_storage, storage_key
+from app.upload_pipeline import TEMP_PREFIX
+
+# Recently written/deduplicated blobs are never removed, so an upload whose
+# row is not inserted yet cannot lose its file to a concurrent release
+BLOB_RELEASE_GRACE = float(os.getenv("BLOB_RELEASE_GRACE", "60"))  # seconds
+BLOB_GC_GRACE = float(os.getenv("BLOB_GC_GRACE", "3600"))  # seconds
+
+# kind -> (refcount query, number of ? placeholders)
+REFERENCE_COUNT_SQL = {
+    "resources": ("SELECT COUNT(*) FROM resources WHERE filename = ?", 1),
+    "images": ("SELECT COUNT(*) FROM blogs WHERE image1_path = ? OR image2_path = ? OR image_path = ?", 3),
+    "carousel": ("SELECT COUNT(*) FROM carousel_images WHERE image_path = ?", 1),
+}
+
+# kind -> queries listing every referenced name (or path)
+REFERENCED_NAMES_SQL = {
+    "resources": ["SELECT filename FROM resources", "SELECT file_path FROM resources"],
+    "images": [
+        "SELECT image1_path FROM blogs",
+        "SELECT image2_path FROM blogs",
+        "SELECT image_path FROM blogs",
+    ],
+    "carousel": ["SELECT image_path FROM carousel_images"],
+}
+
+
+async def reference_count(db, kind: str, name: str) -> int:
+    """Number of rows that reference the blob `name`"""
+    query, placeholders = REFERENCE_COUNT_SQL[kind]
+    row = await db.fetchone(query, [name] * placeholders)
+    return row[0] if row else 0
+
+
+async def release_blob(db, kind: str, name: Optional[str], grace: Optional[float] = None,
+                       backend=None) -> bool:
+    """Delete a blob once nothing references it; True if it was removed"""
+    if not name:
+        return False
+    backend = backend or get_storage()
+    key = storage_key(kind, name)
+    grace = BLOB_RELEASE_GRACE if grace is None else grace
+    info = await backend.stat(key)
+    if info is None or time.time() - info.modified < grace:
+        return False  # Gone already, or left for collect_garbage
+    if await reference_count(db, kind, os.path.basename(name)) > 0:
+        return False
+    return await backend.delete(key)
+
+
+async def referenced_names(db, kind: str) -> Set[str]:
+    """Every stored name in `kind` that some row points at"""
+    names: Set[str] = set()
+    for query in REFERENCED_NAMES_SQL[kind]:
+        for (value,) in await db.fetchall(query):
+            if value:
+                names.add(os.path.basename(value))
+    return names
+
+
+async def collect_garbage(db, kinds: Iterable[str] = KINDS, grace: Optional[float] = None,
+                          dry_run: bool = False, backend=None) -> Dict[str, Dict[str, int]]:
+    """Remove unreferenced blobs (and stale temp files) older than `grace` seconds"""
+    backend = backend or get_storage()
+    grace = BLOB_GC_GRACE if grace is None else grace
+    report: Dict[str, Dict[str, int]] = {}
+
+    for kind in kinds:
+        summary = {"scanned": 0, "referenced": 0, "removed": 0, "bytes_freed": 0}
+        report[kind] = summary
+
+        referenced = await referenced_names(db, kind)
+        now = time.time()
+        doomed = []
+        for blob in await backend.list(kind):
+            name = os.path.basename(blob.key)
+            # Dotfiles (.gitkeep etc.) are not blobs; abandoned upload temps are
+            if name.startswith(".") and not name.startswith(TEMP_PREFIX):
+                continue
+            summary["scanned"] += 1
+            if name in referenced and not name.startswith(TEMP_PREFIX):
+                summary["referenced"] += 1
+                continue
+            if now - blob.modified >= grace:
+                doomed.append(blob)
+
+        if dry_run:
+            removed = doomed
+        else:
+            # One batched delete per kind
+            results = await backend.delete_many(blob.key for blob in doomed)
+            removed = [blob for blob in doomed if results.get(blob.key)]
+        summary["removed"] = len(removed)
+        summary["bytes_freed"] = sum(blob.size for blob in removed)
+
+    return report
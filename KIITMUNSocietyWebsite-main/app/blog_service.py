@@ -0,0 +1,192 @@
+"""
+Blog Read Service for MUN Society Website
+Single read path behind the public blog endpoints: fixed query shapes,
+a cached author-name lookup and one response builder
+"""
+
+import os
+from math import ceil
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from app.cache import TTLCache
+from app.pagination import decode_cursor, keyset_condition, page_rows, fetch_page
+from app.storage_backends import public_url
+
+# Author names change rarely; admin member updates invalidate them explicitly
+AUTHOR_CACHE_TTL = float(os.getenv("AUTHOR_CACHE_TTL", "300"))  # seconds
+author_cache = TTLCache(maxsize=512, ttl=AUTHOR_CACHE_TTL)
+
+DEFAULT_AUTHOR = "Admin"
+
+# Fields a blog response can contain (in output order)
+BLOG_FIELDS = (
+    "id", "title", "content", "competition_date", "image1_url", "image2_url",
+    "author", "created_at", "updated_at", "published",
+)
+
+# Query shapes - the column list is fixed, only the content expression varies
+_BLOG_COLUMNS = """b.id, b.title, b.competition_date, b.image1_path, b.image2_path,
+               b.created_at, b.updated_at, b.published, b.author_id, {content}"""
+
+CONTENT_FULL = "b.content"
+CONTENT_EXCERPT = "substr(b.content, 1, ?)"
+CONTENT_NONE = "NULL"
+
+BLOG_LIST_SQL = """
+        SELECT """ + _BLOG_COLUMNS + """
+        FROM blogs b
+        WHERE b.published = 1{keyset}
+        ORDER BY b.competition_date DESC, b.created_at DESC, b.id DESC
+        LIMIT ? OFFSET ?
+"""
+
+BLOG_DETAIL_SQL = """
+        SELECT """ + _BLOG_COLUMNS.format(content=CONTENT_FULL) + """
+        FROM blogs b
+        WHERE b.id = ?{published}
+"""
+
+BLOG_COUNT_SQL = "SELECT COUNT(*) FROM blogs WHERE published = 1"
+
+# Row positions in the shapes above
+ROW_ID, ROW_COMPETITION_DATE, ROW_CREATED_AT, ROW_AUTHOR_ID, ROW_CONTENT = 0, 2, 5, 8, 9
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse a comma-separated ?fields= value (id is always included)"""
+    if not fields:
+        return list(BLOG_FIELDS)
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in BLOG_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(BLOG_FIELDS)}"
+        )
+
+    return ["id"] + [field for field in BLOG_FIELDS if field in requested and field != "id"]
+
+
+def _iso(value: Any) -> Any:
+    """Render SQLite 'YYYY-MM-DD HH:MM:SS' timestamps the way the Blog schema serializes them"""
+    if isinstance(value, str) and len(value) > 10 and value[10] == " ":
+        return value[:10] + "T" + value[11:]
+    return value
+
+
+def _image_url(path: Optional[str]) -> Optional[str]:
+    return public_url("images", path)
+
+
+def build_blog(row, author_name: Optional[str], fields: Iterable[str] = BLOG_FIELDS) -> Dict[str, Any]:
+    """Build the JSON-ready blog dict returned by every blog read endpoint"""
+    blog = {
+        "id": row[0],
+        "title": row[1],
+        "content": row[ROW_CONTENT],
+        "competition_date": row[2],
+        "image1_url": _image_url(row[3]),
+        "image2_url": _image_url(row[4]),
+        "author": author_name or DEFAULT_AUTHOR,
+        "created_at": _iso(row[5]),
+        "updated_at": _iso(row[6]),
+        "published": bool(row[7]),
+    }
+    return {field: blog[field] for field in fields}
+
+
+async def resolve_authors(db, author_ids: Iterable[int]) -> Dict[int, str]:
+    """Map author ids to names, querying only ids missing from the author cache"""
+    names: Dict[int, str] = {}
+    missing = []
+    for author_id in set(author_ids):
+        if author_id is None:
+            continue
+        name = author_cache.get(author_id)
+        if name is None:
+            missing.append(author_id)
+        else:
+            names[author_id] = name
+
+    if missing:
+        placeholders = ", ".join("?" for _ in missing)
+        rows = await db.fetchall(f"SELECT id, name FROM users WHERE id IN ({placeholders})", missing)
+        for user_id, name in rows:
+            author_cache.set(user_id, name)
+            names[user_id] = name
+
+    return names
+
+
+def invalidate_author(user_id: Optional[int] = None) -> None:
+    """Forget cached author names (one user, or all)"""
+    if user_id is None:
+        author_cache.clear()
+    else:
+        author_cache.pop(user_id)
+
+
+async def list_blogs(
+    db,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    fields: Optional[str] = None,
+    excerpt: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Published blogs, newest competition first, with offset or keyset pagination"""
+    selected = parse_fields(fields)
+
+    params: List[Any] = []
+    if "content" not in selected:
+        content = CONTENT_NONE
+    elif excerpt:
+        content = CONTENT_EXCERPT
+        params.append(excerpt)
+    else:
+        content = CONTENT_FULL
+
+    keyset = ""
+    offset = (page - 1) * limit
+    if cursor:
+        condition, condition_params = keyset_condition(
+            ["b.competition_date", "b.created_at", "b.id"],
+            decode_cursor(cursor, 3),
+            nullable=["b.competition_date"]
+        )
+        keyset = f" AND {condition}"
+        params.extend(condition_params)
+        offset = 0
+
+    total, rows = await fetch_page(
+        db, "blogs", BLOG_COUNT_SQL if include_total else None, [],
+        BLOG_LIST_SQL.format(content=content, keyset=keyset), params + [limit + 1, offset]
+    )
+    rows, next_cursor = page_rows(rows, limit, (ROW_COMPETITION_DATE, ROW_CREATED_AT, ROW_ID))
+
+    authors = await resolve_authors(db, (row[ROW_AUTHOR_ID] for row in rows))
+
+    return {
+        "blogs": [build_blog(row, authors.get(row[ROW_AUTHOR_ID]), selected) for row in rows],
+        "total": total,
+        "page": page,
+        "pages": (ceil(total / limit) if total > 0 else 1) if total is not None else None,
+        "next_cursor": next_cursor,
+    }
+
+
+async def get_blog(db, blog_id: int, published_only: bool = True) -> Dict[str, Any]:
+    """Single blog post, raising 404 if it does not exist"""
+    row = await db.fetchone(
+        BLOG_DETAIL_SQL.format(published=" AND b.published = 1" if published_only else ""),
+        (blog_id,)
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Blog post not found")
+
+    authors = await resolve_authors(db, [row[ROW_AUTHOR_ID]])
+    return build_blog(row, authors.get(row[ROW_AUTHOR_ID]))
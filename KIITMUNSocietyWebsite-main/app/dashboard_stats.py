@@ -0,0 +1,150 @@
+"""
+Dashboard Statistics for MUN Society Website
+Counters behind /api/admin/dashboard/stats, kept in one small table and
+maintained by triggers on users, blogs and resources - every write path,
+including bulk offboarding and raw SQL, keeps them current. The dashboard is
+one primary-key read however large the tables grow.
+
+dashboard_stats rows are (metric, bucket, value):
+  totals / members|blogs|resources   row counts (members = role 'member')
+  registrations / YYYY-MM-DD         users by registration day
+  blogs_per_month / YYYY-MM          blogs by creation month
+  downloads / <file_type>            download_count summed per file type
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+STATS_WINDOW_DAYS = 30
+
+STATS_TABLE = """CREATE TABLE IF NOT EXISTS dashboard_stats (
+    metric TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, bucket)
+) WITHOUT ROWID"""
+
+
+def _day(row: str) -> str:
+    return f"COALESCE(date({row}.created_at), date('now'))"
+
+
+def _month(row: str) -> str:
+    return f"COALESCE(strftime('%Y-%m', {row}.created_at), strftime('%Y-%m', 'now'))"
+
+
+def _file_type(row: str) -> str:
+    return f"COALESCE({row}.file_type, '')"
+
+
+def _bump(metric: str, bucket: str, delta: str, when: str = "1") -> str:
+    """Trigger step adding `delta` to one counter (created on first use)"""
+    return (
+        f"INSERT INTO dashboard_stats (metric, bucket, value) SELECT '{metric}', {bucket}, {delta} WHERE {when} "
+        f"ON CONFLICT(metric, bucket) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _trigger(name: str, event: str, table: str, steps: List[str], when: str = "") -> str:
+    condition = f" WHEN {when}" if when else ""
+    return f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}{condition} BEGIN {' '.join(steps)} END"
+
+
+STATS_TRIGGERS = [
+    _trigger("stats_users_ai", "INSERT", "users", [
+        _bump("totals", "'members'", "1", "new.role IS 'member'"),
+        _bump("registrations", _day("new"), "1"),
+    ]),
+    _trigger("stats_users_ad", "DELETE", "users", [
+        _bump("totals", "'members'", "-1", "old.role IS 'member'"),
+        _bump("registrations", _day("old"), "-1"),
+    ]),
+    _trigger("stats_users_au", "UPDATE OF role, created_at", "users", [
+        _bump("totals", "'members'", "(new.role IS 'member') - (old.role IS 'member')",
+              "(new.role IS 'member') != (old.role IS 'member')"),
+        _bump("registrations", _day("old"), "-1", f"{_day('old')} != {_day('new')}"),
+        _bump("registrations", _day("new"), "1", f"{_day('old')} != {_day('new')}"),
+    ]),
+    _trigger("stats_blogs_ai", "INSERT", "blogs", [
+        _bump("totals", "'blogs'", "1"),
+        _bump("blogs_per_month", _month("new"), "1"),
+    ]),
+    _trigger("stats_blogs_ad", "DELETE", "blogs", [
+        _bump("totals", "'blogs'", "-1"),
+        _bump("blogs_per_month", _month("old"), "-1"),
+    ]),
+    _trigger("stats_blogs_au", "UPDATE OF created_at", "blogs", [
+        _bump("blogs_per_month", _month("old"), "-1"),
+        _bump("blogs_per_month", _month("new"), "1"),
+    ], when=f"{_month('old')} != {_month('new')}"),
+    _trigger("stats_resources_ai", "INSERT", "resources", [
+        _bump("totals", "'resources'", "1"),
+        _bump("downloads", _file_type("new"), "COALESCE(new.download_count, 0)"),
+    ]),
+    _trigger("stats_resources_ad", "DELETE", "resources", [
+        _bump("totals", "'resources'", "-1"),
+        _bump("downloads", _file_type("old"), "-COALESCE(old.download_count, 0)"),
+    ]),
+    # Fires on every download flush, so only for rows whose count or type changed
+    _trigger("stats_resources_au", "UPDATE OF download_count, file_type", "resources", [
+        _bump("downloads", _file_type("old"), "-COALESCE(old.download_count, 0)"),
+        _bump("downloads", _file_type("new"), "COALESCE(new.download_count, 0)"),
+    ], when="new.download_count IS NOT old.download_count OR new.file_type IS NOT old.file_type"),
+]
+
+# Recompute every counter from the tables (run after the triggers exist)
+REBUILD_STATS = [
+    "DELETE FROM dashboard_stats",
+    """INSERT INTO dashboard_stats (metric, bucket, value)
+       SELECT 'totals', 'members', COUNT(*) FROM users WHERE role = 'member'
+       UNION ALL SELECT 'totals', 'blogs', COUNT(*) FROM blogs
+       UNION ALL SELECT 'totals', 'resources', COUNT(*) FROM resources""",
+    """INSERT INTO dashboard_stats (metric, bucket, value)
+       SELECT 'registrations', COALESCE(date(created_at), date('now')), COUNT(*) FROM users GROUP BY 2""",
+    """INSERT INTO dashboard_stats (metric, bucket, value)
+       SELECT 'blogs_per_month', COALESCE(strftime('%Y-%m', created_at), strftime('%Y-%m', 'now')), COUNT(*)
+       FROM blogs GROUP BY 2""",
+    """INSERT INTO dashboard_stats (metric, bucket, value)
+       SELECT 'downloads', COALESCE(file_type, ''), COALESCE(SUM(download_count), 0) FROM resources GROUP BY 2""",
+]
+
+STATS_SCHEMA = [STATS_TABLE, *STATS_TRIGGERS, *REBUILD_STATS]
+
+STATS_SQL = """SELECT metric, bucket, value FROM dashboard_stats
+    WHERE metric = 'totals' OR (metric = 'registrations' AND bucket >= ?)"""
+
+EXTENDED_STATS_SQL = """SELECT metric, bucket, value FROM dashboard_stats
+    WHERE metric IN ('totals', 'downloads', 'blogs_per_month') OR (metric = 'registrations' AND bucket >= ?)"""
+
+
+def _window(days: int) -> List[str]:
+    """The last `days` UTC dates, oldest first (created_at is stored in UTC)"""
+    today = datetime.now(timezone.utc).date()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+
+async def read_dashboard_stats(db, extended: bool = False, days: int = STATS_WINDOW_DAYS) -> Dict[str, Any]:
+    """Totals, the rolling registration histogram and (extended) per-type/per-month breakdowns"""
+    window = _window(days)
+    rows = await db.fetchall(EXTENDED_STATS_SQL if extended else STATS_SQL, (window[0],))
+
+    totals: Dict[str, int] = {}
+    breakdowns: Dict[str, Dict[str, int]] = {"registrations": {}, "downloads": {}, "blogs_per_month": {}}
+    for metric, bucket, value in rows:
+        if metric == "totals":
+            totals[bucket] = value
+        elif value:
+            breakdowns[metric][bucket] = value
+
+    registrations = {day: breakdowns["registrations"].get(day, 0) for day in window}
+    stats = {
+        "total_members": totals.get("members", 0),
+        "total_blogs": totals.get("blogs", 0),
+        "total_resources": totals.get("resources", 0),
+        "recent_registrations": sum(registrations.values()),
+    }
+    if extended:
+        stats["registrations_by_day"] = registrations
+        stats["downloads_by_file_type"] = dict(sorted(breakdowns["downloads"].items()))
+        stats["blogs_per_month"] = dict(sorted(breakdowns["blogs_per_month"].items()))
+    return stats
@@ -4,9 +4,12 @@
 import os
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List, Tuple
+import time
+from typing import Optional, Dict, Any, List, Sequence, Tuple, Union
 from contextlib import asynccontextmanager
 
+from .read_replica import ReadReplica, is_read_query, TURSO_READ_MODE, TURSO_REPLICA_PATH
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -32,13 +35,55 @@ TURSO_AUTH_TOKEN = os.getenv("TURSO_AUTH_TOKEN", "")
 # Global database client
 turso_client = None
 
+# Local read replica (TURSO_READ_MODE=replica, see app/read_replica.py)
+read_replica = None
+
+# Timing per named transaction (see TursoDatabase.transaction)
+_transaction_metrics: Dict[str, Dict[str, float]] = {}
+
+def _record_transaction(name: str, elapsed: float, statements: int, round_trips: int, outcome: str) -> None:
+    stats = _transaction_metrics.setdefault(name, {
+        "calls": 0, "commits": 0, "rollbacks": 0, "statements": 0, "round_trips": 0, "total_ms": 0.0, "max_ms": 0.0
+    })
+    stats["calls"] += 1
+    stats["commits" if outcome == "commit" else "rollbacks"] += 1
+    stats["statements"] += statements
+    stats["round_trips"] += round_trips
+    stats["total_ms"] += elapsed * 1000
+    stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+
+def get_transaction_stats() -> Dict[str, Dict[str, float]]:
+    """Timing counters per named transaction"""
+    return {
+        name: dict(stats, avg_ms=round(stats["total_ms"] / stats["calls"], 2) if stats["calls"] else 0.0)
+        for name, stats in _transaction_metrics.items()
+    }
+
 class TursoDatabase:
     """Turso database connection handler following MUN Society patterns"""
     
-    def __init__(self, client):
+    def __init__(self, client, replica=None):
         self.client = client
+        self.replica = replica
         self.is_connected = True
     
+    async def _read(self, query: str, safe_params: Optional[Tuple]) -> Any:
+        """Run a read on the replica when it may serve it, else on the primary"""
+        if self.replica is not None:
+            if self.replica.can_serve(query):
+                try:
+                    return await self.replica.fetch(query, safe_params)
+                except Exception as e:
+                    logger.warning(f"⚠️ Replica read failed, using primary: {e}")
+            self.replica.primary_reads += 1
+        if safe_params:
+            return await self.client.execute(query, safe_params)
+        return await self.client.execute(query)
+    
+    def _wrote(self, query: str) -> None:
+        if self.replica is not None and not is_read_query(query):
+            self.replica.record_write()
+    
     async def execute(self, query: str, params: Optional[Tuple] = None) -> Any:
         """Execute a query (INSERT, UPDATE, DELETE)"""
         try:
@@ -59,6 +104,7 @@ class TursoDatabase:
             
             logger.info(f"✅ QUERY EXECUTED SUCCESSFULLY")
             logger.info(f"✅ AFFECTED ROWS: {getattr(result, 'changes', 'unknown')}")
+            self._wrote(query)
             
             return result
         except Exception as e:
@@ -81,6 +127,7 @@ class TursoDatabase:
                 result = await self.client.execute(query, safe_params)
             else:
                 result = await self.client.execute(query)
+            self._wrote(query)
             
             # For Turso/libSQL, the last insert rowid is available
             return result.last_insert_rowid if hasattr(result, 'last_insert_rowid') else 0
@@ -100,10 +147,7 @@ class TursoDatabase:
             # Serialize parameters for Turso compatibility
             safe_params = serialize_params_for_turso(params)
             
-            if safe_params:
-                result = await self.client.execute(query, safe_params)
-            else:
-                result = await self.client.execute(query)
+            result = await self._read(query, safe_params)
             
             if result.rows:
                 return result.rows[0]
@@ -123,10 +167,7 @@ class TursoDatabase:
             # Serialize parameters for Turso compatibility
             safe_params = serialize_params_for_turso(params)
             
-            if safe_params:
-                result = await self.client.execute(query, safe_params)
-            else:
-                result = await self.client.execute(query)
+            result = await self._read(query, safe_params)
             
             return result.rows if result.rows else []
         except Exception as e:
@@ -135,14 +176,182 @@ class TursoDatabase:
             logger.error(f"❌ Original Params: {params}")
             raise
     
+    @staticmethod
+    def _statement(statement: Union[str, Tuple[str, Any]]) -> Tuple[str, List[Any]]:
+        """Normalize "SQL" or (SQL, params) into (SQL, serialized params)"""
+        from .db_utils import serialize_params_for_turso
+        if isinstance(statement, str):
+            return statement, []
+        query, params = statement
+        return query, list(serialize_params_for_turso(params) or ())
+
+    async def batch(self, statements: Sequence[Union[str, Tuple[str, Any]]]) -> List[Any]:
+        """Run statements in one libSQL batch request - one round trip, all or nothing
+
+        Returns one result set (.rows, .rows_affected, .last_insert_rowid) per statement.
+        """
+        stmts = [self._statement(statement) for statement in statements]
+        if not stmts:
+            return []
+        try:
+            logger.info(f"🔄 EXECUTING BATCH OF {len(stmts)}: {[query for query, _ in stmts]}")
+            results = await self.client.batch(stmts)
+            if self.replica is not None and not all(is_read_query(query) for query, _ in stmts):
+                self.replica.record_write()
+            return results
+        except Exception as e:
+            logger.error(f"❌ Error executing batch: {e}")
+            logger.error(f"❌ Statements: {stmts}")
+            raise
+
+    async def gather(self, *statements: Union[str, Tuple[str, Any]]) -> List[List[Tuple]]:
+        """Rows of several independent reads in one round trip
+
+        Served by the local replica when it may answer all of them, otherwise
+        sent to the primary as a single batch.
+        """
+        stmts = [self._statement(statement) for statement in statements]
+        if self.replica is not None:
+            if all(self.replica.can_serve(query) for query, _ in stmts):
+                try:
+                    return [(await self.replica.fetch(query, params)).rows for query, params in stmts]
+                except Exception as e:
+                    logger.warning(f"⚠️ Replica read failed, using primary: {e}")
+            self.replica.primary_reads += len(stmts)
+        results = await self.batch(stmts)
+        return [result.rows or [] for result in results]
+
+    @asynccontextmanager
+    async def transaction(self, name: str = "transaction"):
+        """Run a block of statements as one atomic unit
+
+            async with db.transaction("member.delete") as tx:
+                rows = await tx.fetchall("SELECT ...", (member_id,))
+                await tx.execute("DELETE ...", (member_id,))
+
+        Commits when the block exits, rolls back if it raises. Timing is logged
+        and kept per name (get_transaction_stats).
+        """
+        tx = DatabaseTransaction(self, name)
+        start = time.perf_counter()
+        try:
+            yield tx
+            await tx.commit()
+        except BaseException:
+            try:
+                await tx.rollback()
+            except Exception as e:
+                logger.error(f"❌ Rollback of {name} failed: {e}")
+            _record_transaction(name, time.perf_counter() - start, tx.statements, tx.round_trips, "rollback")
+            raise
+        elapsed = time.perf_counter() - start
+        _record_transaction(name, elapsed, tx.statements, tx.round_trips, "commit")
+        logger.info(f"⏱️ {name}: {tx.statements} statements, {tx.round_trips} round trips, {elapsed * 1000:.1f} ms")
+
     async def commit(self):
-        """Commit transaction (libsql handles this automatically)"""
+        """Commit transaction (statements outside transaction() autocommit)"""
         pass
     
     async def rollback(self):
-        """Rollback transaction (libsql handles this automatically)"""
+        """Rollback transaction (statements outside transaction() autocommit)"""
         pass
 
+class WriteConflict(Exception):
+    """A transaction write matched a different number of rows than its block expected"""
+
+
+class DatabaseTransaction:
+    """Statements of one TursoDatabase.transaction() block
+
+    Reads run straight away; writes are queued and sent together when the
+    block exits, so reads inside the block do not see its own writes.
+
+    On a ws/wss (and file:) connection this is a libSQL interactive transaction:
+    the reads share one snapshot, and a write that conflicts with another
+    connection's commit fails the whole transaction instead of acting on stale
+    reads. The HTTP client has no interactive transactions; there the reads go
+    to the primary and the writes run as one atomic batch.
+    """
+
+    def __init__(self, db: TursoDatabase, name: str):
+        self.db = db
+        self.name = name
+        self.writes: List[Tuple[str, List[Any]]] = []
+        # Index in writes -> rows that write must affect
+        self.expected_rows: Dict[int, int] = {}
+        self.statements = 0
+        self.round_trips = 0
+        try:
+            self._tx = db.client.transaction()
+        except Exception as e:
+            if getattr(e, "code", None) != "TRANSACTIONS_NOT_SUPPORTED":
+                raise
+            self._tx = None
+
+    @property
+    def interactive(self) -> bool:
+        return self._tx is not None
+
+    async def _send(self, stmts: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """Send statements together - one round trip"""
+        self.statements += len(stmts)
+        self.round_trips += 1
+        if self._tx is not None:
+            # Statements on one transaction stream are pipelined; let all of them
+            # finish before reporting a failure so a rollback comes after them
+            results = await asyncio.gather(
+                *(self._tx.execute(query, params) for query, params in stmts), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            return results
+        if len(stmts) == 1:
+            return [await self.db.client.execute(*stmts[0])]
+        return await self.db.client.batch(stmts)
+
+    async def gather(self, *statements: Union[str, Tuple[str, Any]]) -> List[List[Tuple]]:
+        """Rows of several reads in one round trip"""
+        results = await self._send([TursoDatabase._statement(statement) for statement in statements])
+        return [result.rows or [] for result in results]
+
+    async def fetchall(self, query: str, params: Optional[Tuple] = None) -> List[Tuple]:
+        return (await self.gather((query, params)))[0]
+
+    async def fetchone(self, query: str, params: Optional[Tuple] = None) -> Optional[Tuple]:
+        rows = await self.fetchall(query, params)
+        return rows[0] if rows else None
+
+    async def execute(self, query: str, params: Optional[Tuple] = None, expect_rows: Optional[int] = None) -> None:
+        """Queue a write; it is applied when the block exits
+
+        With expect_rows, the block fails with WriteConflict (rolling back an
+        interactive transaction) unless the write affects exactly that many rows.
+        """
+        if expect_rows is not None:
+            self.expected_rows[len(self.writes)] = expect_rows
+        self.writes.append(TursoDatabase._statement((query, params)))
+
+    async def commit(self) -> None:
+        if self.writes:
+            results = await self._send(self.writes)
+            for index, expected in self.expected_rows.items():
+                if results[index].rows_affected != expected:
+                    raise WriteConflict(
+                        f"{self.name}: expected {expected} rows, write affected {results[index].rows_affected}"
+                    )
+        if self._tx is not None:
+            await self._tx.commit()
+            self.round_trips += 1
+        if self.writes and self.db.replica is not None:
+            self.db.replica.record_write()
+
+    async def rollback(self) -> None:
+        self.writes = []
+        self.expected_rows = {}
+        if self._tx is not None and not self._tx.closed:
+            await self._tx.rollback()
+
 async def init_db() -> bool:
     """Initialize Turso database connection"""
     global turso_client
@@ -180,6 +389,8 @@ async def init_db() -> bool:
         logger.info(f"🧪 Test result: {test_result}")
         
         logger.info("✅ Turso database connection successful")
+        await _run_migrations()
+        await _open_read_replica()
         return True
         
     except Exception as e:
@@ -196,6 +407,8 @@ async def init_db() -> bool:
             # If this works, test it
             test_result = await turso_client.execute("SELECT 1")
             logger.info("✅ Sync client creation successful")
+            await _run_migrations()
+            await _open_read_replica()
             return True
             
         except Exception as e2:
@@ -205,9 +418,38 @@ async def init_db() -> bool:
             turso_client = None
             return False
 
+async def _run_migrations():
+    """Bring the schema up to date (see app/migrations.py)"""
+    try:
+        from .migrations import run_migrations
+        applied = await run_migrations(TursoDatabase(turso_client))
+        if applied:
+            logger.info(f"🔧 Applied migrations: {', '.join(str(v) for v in applied)}")
+    except Exception as e:
+        # Keep serving on the schema we have; the next start retries
+        logger.error(f"❌ Failed to apply migrations: {e}")
+
+async def _open_read_replica():
+    """Start serving reads from a local replica when TURSO_READ_MODE=replica"""
+    global read_replica
+    if TURSO_READ_MODE != "replica" or read_replica is not None:
+        return
+    replica = ReadReplica(TURSO_REPLICA_PATH, TURSO_DATABASE_URL, TURSO_AUTH_TOKEN)
+    if await replica.open():
+        replica.start()
+        read_replica = replica
+        logger.info(f"📖 Serving reads from replica at {TURSO_REPLICA_PATH}")
+    else:
+        # Reads simply stay on the primary
+        await replica.close()
+
 async def close_db():
     """Close Turso database connection"""
-    global turso_client
+    global turso_client, read_replica
+    
+    if read_replica is not None:
+        await read_replica.close()
+        read_replica = None
     
     try:
         if turso_client:
@@ -233,7 +475,7 @@ async def get_db_connection():
         if not turso_client:
             raise Exception("Database not initialized. Call init_db() first.")
         
-        db = TursoDatabase(turso_client)
+        db = TursoDatabase(turso_client, read_replica)
         yield db
         
     except Exception as e:
@@ -254,7 +496,7 @@ async def get_db() -> TursoDatabase:
         if not success:
             raise Exception("Database not initialized and failed to initialize.")
     
-    return TursoDatabase(turso_client)
+    return TursoDatabase(turso_client, read_replica)
 
 # Health check function
 async def check_database_health() -> Dict[str, Any]:
@@ -290,7 +532,9 @@ def get_database_info() -> Dict[str, Any]:
         "environment": ENVIRONMENT,
         "libsql_available": LIBSQL_AVAILABLE,
         "database_configured": bool(TURSO_DATABASE_URL and TURSO_AUTH_TOKEN),
-        "connected": turso_client is not None
+        "connected": turso_client is not None,
+        "read_mode": TURSO_READ_MODE,
+        "replica": read_replica.stats() if read_replica is not None else None
     }
 
 # Quick test function for development
@@ -0,0 +1,114 @@
+"""
+Download Counter for MUN Society Website
+Write-behind aggregation of resource download counts. Downloads only bump an
+in-memory delta; a background task folds all pending deltas into one UPDATE
+every DOWNLOAD_FLUSH_INTERVAL seconds and on shutdown (one atomic batch when
+there are more than FLUSH_BATCH resources). Reads add the pending deltas so
+counts stay accurate in between (per process).
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+
+DOWNLOAD_FLUSH_INTERVAL = float(os.getenv("DOWNLOAD_FLUSH_INTERVAL", "10"))  # seconds
+
+# 3 parameters per row (CASE id/delta + IN list), kept under SQLite's 999 limit
+FLUSH_BATCH = 300
+
+
+def build_flush_statement(deltas: List[Tuple[int, int]]) -> Tuple[str, list]:
+    """One UPDATE adding each resource's delta to its download_count"""
+    cases = " ".join("WHEN ? THEN ?" for _ in deltas)
+    placeholders = ", ".join("?" for _ in deltas)
+    params: list = []
+    for resource_id, delta in deltas:
+        params.extend([resource_id, delta])
+    params.extend(resource_id for resource_id, _ in deltas)
+    query = (
+        f"UPDATE resources SET download_count = download_count + CASE id {cases} ELSE 0 END "
+        f"WHERE id IN ({placeholders})"
+    )
+    return query, params
+
+
+class DownloadCounter:
+    """Pending download deltas per resource id, flushed in batches"""
+
+    def __init__(self, interval: float = DOWNLOAD_FLUSH_INTERVAL):
+        self.interval = interval
+        self.pending: Dict[int, int] = {}
+        self.flushes = 0
+        self.flushed = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def increment(self, resource_id: int, count: int = 1) -> None:
+        self.pending[resource_id] = self.pending.get(resource_id, 0) + count
+
+    def pending_for(self, resource_id: int) -> int:
+        """Downloads of resource_id not yet written to the database"""
+        return self.pending.get(resource_id, 0)
+
+    async def flush(self, db=None) -> int:
+        """Write all pending deltas; returns the number of downloads written"""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            # Swap first so downloads during the write land in the next batch
+            batch, self.pending = self.pending, {}
+            items = list(batch.items())
+            try:
+                if db is None:
+                    from app.database import get_db
+                    db = await get_db()
+                # All chunks in one atomic batch, so a failure leaves nothing half-applied
+                await db.batch([
+                    build_flush_statement(items[start:start + FLUSH_BATCH])
+                    for start in range(0, len(items), FLUSH_BATCH)
+                ])
+            except Exception as e:
+                # Put the deltas back so the next flush retries them
+                for resource_id, delta in batch.items():
+                    self.increment(resource_id, delta)
+                self.failures += 1
+                print(f"❌ Failed to flush {len(items)} download counters: {e}")
+                return 0
+            total = sum(batch.values())
+            self.flushes += 1
+            self.flushed += total
+            return total
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Begin periodic flushing (called from the app's startup event)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and write whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_resources": len(self.pending),
+            "pending_downloads": sum(self.pending.values()),
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "failures": self.failures,
+        }
+
+
+download_counter = DownloadCounter()
@@ -0,0 +1,200 @@
+"""
+Allowed Email Import for MUN Society Website
+Bulk-loads a delegate roster into allowed_emails. The upload is parsed as it
+streams in (CSV, or JSON as an array of objects / JSON Lines), and valid rows
+are upserted EMAIL_IMPORT_BATCH_SIZE at a time with one multi-row
+INSERT ... ON CONFLICT per batch - a 2,000 row roster is a handful of round
+trips. Every row gets a status in the report.
+
+Batches are written as they fill up, so an upload that breaks off half way
+keeps the rows before the break; the import is idempotent and can be re-run.
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas import AddMemberEmail
+
+EMAIL_IMPORT_BATCH_SIZE = int(os.getenv("EMAIL_IMPORT_BATCH_SIZE", "250"))  # rows per INSERT
+EMAIL_IMPORT_MAX_ROWS = int(os.getenv("EMAIL_IMPORT_MAX_ROWS", "10000"))
+
+ROLES = ("member", "admin")
+# Columns of a CSV without a header row
+CSV_COLUMNS = ("email", "name", "role")
+# Largest single JSON record we wait for before calling the input malformed
+MAX_JSON_RECORD = 64 * 1024
+
+Row = Tuple[int, Dict[str, Any]]
+
+
+async def _text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode UTF-8 (with or without BOM) chunk by chunk"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Complete CSV records - a quoted field may span several lines"""
+    pending = ""
+    record = ""
+    async for text in _text(chunks):
+        *lines, pending = (pending + text).split("\n")
+        for line in lines:
+            record += line + "\n"
+            # An odd number of quotes means a quoted field continues on the next line
+            if record.count('"') % 2 == 0:
+                yield record
+                record = ""
+    if record or pending:
+        yield record + pending
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """Rows of a CSV upload as (row number, fields); a header row naming the columns is optional"""
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for record in _csv_records(chunks):
+        values = [value.strip() for value in next(csv.reader([record]), [])]
+        if not any(values):
+            continue
+        if header is None:
+            lowered = [value.lower() for value in values]
+            if "email" in lowered:
+                header = lowered
+                continue
+            header = list(CSV_COLUMNS)
+        row_number += 1
+        yield row_number, dict(zip(header, values))
+
+
+async def iter_json_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """Objects of a JSON array (or JSON Lines) upload as (row number, object)"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    row_number = 0
+
+    async for text in _text(chunks):
+        buffer += text
+        pos = 0
+        while True:
+            # Brackets, commas and whitespace only separate the records
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in "[],"):
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] != "{":
+                raise ValueError(f"Record {row_number + 1}: expected a JSON object")
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if len(buffer) - pos > MAX_JSON_RECORD:
+                    raise ValueError(f"Record {row_number + 1}: invalid JSON")
+                break  # wait for the rest of the record
+            row_number += 1
+            yield row_number, record
+        buffer = buffer[pos:]
+
+    if buffer.strip(" \t\r\n[],"):
+        raise ValueError(f"Record {row_number + 1}: invalid or truncated JSON")
+
+
+def _entry(fields: Dict[str, Any]) -> AddMemberEmail:
+    """Validate one roster row (same rules as a single add)"""
+    role = str(fields.get("role") or "member").strip().lower()
+    if role not in ROLES:
+        raise ValueError(f"unknown role '{role}'")
+    name = str(fields.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    return AddMemberEmail(email=str(fields.get("email") or "").strip(), name=name, role=role)
+
+
+def _error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        error = e.errors()[0]
+        return f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+    return str(e)
+
+
+async def _upsert(db, batch: List[Tuple[int, AddMemberEmail]], update_existing: bool, report: List[dict]) -> None:
+    """One atomic round trip: see which emails exist, then insert/update the whole batch"""
+    emails = [entry.email for _, entry in batch]
+    params = [value for _, entry in batch for value in (entry.email, entry.name, entry.role)]
+    on_conflict = ("DO UPDATE SET name = excluded.name, role = excluded.role "
+                   "WHERE name != excluded.name OR role IS NOT excluded.role") if update_existing else "DO NOTHING"
+    existing_rows, _ = await db.batch([
+        (f"SELECT email, name, role FROM allowed_emails WHERE email IN ({', '.join('?' for _ in emails)})", emails),
+        (f"INSERT INTO allowed_emails (email, name, role) VALUES {', '.join('(?, ?, ?)' for _ in batch)} "
+         f"ON CONFLICT(email) {on_conflict}", params),
+    ])
+    existing = {row[0]: (row[1], row[2]) for row in existing_rows.rows}
+
+    for row_number, entry in batch:
+        if entry.email not in existing:
+            status = "added"
+        elif not update_existing:
+            status = "skipped"
+        elif existing[entry.email] == (entry.name, entry.role):
+            status = "unchanged"
+        else:
+            status = "updated"
+        report.append({"row": row_number, "email": entry.email, "status": status})
+
+
+async def import_allowed_emails(
+    db,
+    rows: AsyncIterator[Row],
+    update_existing: bool = True,
+    batch_size: int = EMAIL_IMPORT_BATCH_SIZE,
+    max_rows: int = EMAIL_IMPORT_MAX_ROWS
+) -> List[dict]:
+    """Upsert roster rows into allowed_emails; returns one {row, email, status[, error]} per row
+
+    Statuses: added, updated, unchanged, skipped (exists, update_existing off),
+    duplicate (email already earlier in the file) and invalid.
+    """
+    report: List[dict] = []
+    first_row: Dict[str, int] = {}
+    batch: List[Tuple[int, AddMemberEmail]] = []
+
+    async for row_number, fields in rows:
+        if row_number > max_rows:
+            raise ValueError(f"More than {max_rows} rows")
+        try:
+            entry = _entry(fields)
+        except (ValidationError, ValueError) as e:
+            report.append({"row": row_number, "email": str(fields.get("email") or "") or None,
+                           "status": "invalid", "error": _error(e)})
+            continue
+        if entry.email in first_row:
+            report.append({"row": row_number, "email": entry.email, "status": "duplicate",
+                           "error": f"same email as row {first_row[entry.email]}"})
+            continue
+        first_row[entry.email] = row_number
+        batch.append((row_number, entry))
+        if len(batch) >= batch_size:
+            await _upsert(db, batch, update_existing, report)
+            batch = []
+
+    if batch:
+        await _upsert(db, batch, update_existing, report)
+    return sorted(report, key=lambda item: item["row"])
+
+
+def summarize(report: List[dict]) -> Dict[str, int]:
+    """Row count per status"""
+    counts: Dict[str, int] = {}
+    for item in report:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    return counts
@@ -4,12 +4,20 @@ Handles file uploads to Cloudinary for production deployment
 """
 
 import os
+import asyncio
 import logging
-from typing import Optional, Tuple
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
 from pathlib import Path
 import uuid
 from datetime import datetime
 
+from app.upload_pipeline import store_bytes
+from app.storage_backends import LocalStorageBackend
+
 logger = logging.getLogger(__name__)
 
 # Environment detection
@@ -21,6 +29,11 @@ CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME", "")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY", "")
 CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET", "")
 
+# The Cloudinary SDK is blocking - calls run on a bounded pool, never on the event loop
+CLOUD_MAX_CONCURRENCY = int(os.getenv("CLOUD_MAX_CONCURRENCY", "4"))
+CLOUD_MAX_RETRIES = int(os.getenv("CLOUD_MAX_RETRIES", "3"))
+CLOUD_RETRY_BACKOFF = float(os.getenv("CLOUD_RETRY_BACKOFF", "0.5"))  # seconds, doubled per retry
+
 # Local storage fallback
 LOCAL_UPLOAD_PATH = os.getenv("UPLOAD_PATH", "./uploads")
 
@@ -30,6 +43,8 @@ class FileStorageService:
     def __init__(self):
         self.use_cloud = USE_CLOUD_STORAGE and self._cloudinary_configured()
         self.local_path = LOCAL_UPLOAD_PATH
+        self._executor = ThreadPoolExecutor(max_workers=CLOUD_MAX_CONCURRENCY, thread_name_prefix="cloud-storage")
+        self._metrics: Dict[str, Dict[str, float]] = {}
         
         if self.use_cloud:
             logger.info("🌩️ Using Cloudinary for file storage")
@@ -64,6 +79,51 @@ class FileStorageService:
             logger.error(f"❌ Failed to initialize Cloudinary: {e}")
             self.use_cloud = False
     
+    def _non_retryable_errors(self) -> Tuple[type, ...]:
+        """Cloudinary errors that retrying cannot fix (bad request, auth, not found)"""
+        errors = getattr(getattr(self, "cloudinary", None), "exceptions", None)
+        names = ("BadRequest", "AuthorizationRequired", "NotAllowed", "NotFound")
+        return tuple(getattr(errors, name) for name in names if errors is not None and hasattr(errors, name))
+    
+    def _record(self, operation: str, elapsed: float, retries: int, failed: bool):
+        """Per-operation timing metrics"""
+        stats = self._metrics.setdefault(operation, {
+            "calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0
+        })
+        stats["calls"] += 1
+        stats["retries"] += retries
+        stats["errors"] += 1 if failed else 0
+        stats["total_ms"] += elapsed * 1000
+        stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+    
+    async def _run_blocking(self, operation: str, call: Callable[[], Any], retries: int = CLOUD_MAX_RETRIES) -> Any:
+        """Run a blocking call on the worker pool, retrying transient failures with backoff"""
+        loop = asyncio.get_running_loop()
+        non_retryable = self._non_retryable_errors()
+        start = time.perf_counter()
+        attempt = 0
+        
+        while True:
+            try:
+                result = await loop.run_in_executor(self._executor, call)
+                self._record(operation, time.perf_counter() - start, attempt, failed=False)
+                return result
+            except Exception as e:
+                if attempt >= retries or (non_retryable and isinstance(e, non_retryable)):
+                    self._record(operation, time.perf_counter() - start, attempt, failed=True)
+                    raise
+                delay = CLOUD_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                logger.warning(f"⚠️ {operation} failed ({e}), retry {attempt}/{retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Timing/retry counters per storage operation"""
+        return {
+            operation: dict(stats, avg_ms=round(stats["total_ms"] / stats["calls"], 2) if stats["calls"] else 0.0)
+            for operation, stats in self._metrics.items()
+        }
+    
     def generate_unique_filename(self, original_filename: str, file_type: str = "resource") -> str:
         """Generate unique filename with timestamp"""
         ext = Path(original_filename).suffix
@@ -91,13 +151,14 @@ class FileStorageService:
     async def _upload_to_cloudinary(self, file_content: bytes, unique_filename: str, original_filename: str) -> Tuple[str, str]:
         """Upload file to Cloudinary"""
         try:
-            # Upload to Cloudinary
-            result = self.cloudinary.uploader.upload(
+            # Upload to Cloudinary (blocking SDK call, run off the event loop)
+            result = await self._run_blocking("cloudinary.upload", partial(
+                self.cloudinary.uploader.upload,
                 file_content,
                 public_id=f"mun-resources/{unique_filename}",
                 resource_type="auto",  # Auto-detect file type
                 display_name=original_filename
-            )
+            ))
             
             file_url = result['secure_url']
             file_path = result['public_id']  # Store Cloudinary public_id as path
@@ -112,19 +173,15 @@ class FileStorageService:
     async def _upload_to_local(self, file_content: bytes, unique_filename: str, file_type: str) -> Tuple[str, str]:
         """Upload file to local storage"""
         try:
-            # Create directory path
-            type_dir = os.path.join(self.local_path, f"{file_type}s")  # resources, images, etc.
-            os.makedirs(type_dir, exist_ok=True)
-            
-            # Full file path
-            file_path = os.path.join(type_dir, unique_filename)
-            
-            # Write file
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
+            # Content-addressed under resources/, images/, etc.: identical uploads share one file
+            start = time.perf_counter()
+            local = LocalStorageBackend(self.local_path)
+            stored = await store_bytes(file_content, local, f"{file_type}s", Path(unique_filename).suffix)
+            self._record("local.write", time.perf_counter() - start, 0, False)
+            file_path = local.local_path(stored.key)
             
             # Generate URL (for local development)
-            file_url = f"/uploads/{file_type}s/{unique_filename}"
+            file_url = f"/uploads/{file_type}s/{stored.filename}"
             
             logger.info(f"✅ File uploaded locally: {file_path}")
             return file_url, file_path
@@ -138,7 +195,7 @@ class FileStorageService:
         try:
             if self.use_cloud and not file_path.startswith('/'):
                 # Cloudinary public_id
-                result = self.cloudinary.uploader.destroy(file_path)
+                result = await self._run_blocking("cloudinary.destroy", partial(self.cloudinary.uploader.destroy, file_path))
                 success = result.get('result') == 'ok'
                 logger.info(f"🗑️ Cloudinary delete result: {result}")
                 return success
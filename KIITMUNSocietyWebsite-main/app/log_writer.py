@@ -0,0 +1,148 @@
+"""
+Background Log Writer for MUN Society Website
+Bounded queue drained by a daemon thread, so request handlers never block on
+stdout or disk. Lines are dropped (and counted) when the queue is full, and
+file output can rotate by size.
+"""
+
+import os
+import queue
+import sys
+import threading
+from typing import Optional, TextIO
+
+
+class LineWriter:
+    """Queue of text lines written in batches by a background thread"""
+
+    def __init__(self, stream: Optional[TextIO] = None, path: Optional[str] = None,
+                 maxsize: int = 10000, batch_size: int = 200, name: str = "log-writer",
+                 max_bytes: int = 0, backups: int = 5):
+        self.stream = stream
+        self.path = path
+        self.batch_size = batch_size
+        self.name = name
+        self.max_bytes = max_bytes  # 0 = never rotate
+        self.backups = backups
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._file: Optional[TextIO] = None
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def write(self, line: str) -> bool:
+        """Enqueue one line without blocking; False if it had to be dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _output(self) -> TextIO:
+        if not self.path:
+            return self.stream or sys.stdout
+        if self._file is None or self._file.closed:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _rotate(self) -> None:
+        """path -> path.1 -> path.2 ... keeping `backups` old files"""
+        self._file.close()
+        self._file = None
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    def _write_batch(self, lines) -> None:
+        out = self._output()
+        out.write("".join(line + "\n" for line in lines))
+        out.flush()
+        self.written += len(lines)
+        if self.path and self.max_bytes and out.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                self._close_file()
+                self._queue.task_done()
+                return
+            batch = [line]
+            stop = False
+            # Drain whatever else is already queued into the same write
+            while len(batch) < self.batch_size:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    break
+                batch.append(extra)
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"❌ {self.name} failed to write {len(batch)} lines: {e}", file=sys.stderr)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                self._close_file()
+                return
+
+    def _close_file(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        self._file = None
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait (up to timeout) until everything queued so far has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+
+        def waiter():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=waiter, daemon=True).start()
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out pending lines and stop the background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
@@ -13,6 +13,11 @@ from app.database import init_db, close_db, get_db
 from app.routers import auth, blogs, resources, public, admin, carousel
 from app.schemas import HealthResponse, PublicResourceResponse, PublicResourceCheck
 from app.auth import check_email_allowed, check_user_exists
+from app.access_log import AccessLogMiddleware, ACCESS_LOG_ENABLED, ACCESS_LOG_SAMPLE_RATE, access_log_writer
+from app.audit_log import audit, audit_writer
+from app.download_counter import download_counter
+from app.text_extraction import wait_for_extractions, shutdown_extraction
+from app.read_replica import ReadSessionMiddleware
 
 # Set up comprehensive logging
 logging.basicConfig(level=logging.DEBUG)
@@ -60,37 +65,13 @@ app.add_middleware(
 
 print("=== CORS MIDDLEWARE ADDED ===")
 
-# Add request middleware for debugging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    print(f"🚀 INCOMING REQUEST: {request.method} {request.url}")
-    print(f"🚀 Headers: {dict(request.headers)}")
-    
-    # Capture request body for POST requests
-    if request.method == "POST":
-        body = await request.body()
-        
-        # Safe decoding for both text and binary data
-        if body:
-            # Get content type to determine how to handle the data
-            content_type = request.headers.get("content-type", "")
-            
-            if content_type.startswith("multipart/form-data"):
-                print(f"🚀 REQUEST BODY: Multipart form data ({len(body)} bytes) - Contains file uploads, content not displayed")
-            else:
-                try:
-                    decoded_body = body.decode('utf-8')
-                    print(f"🚀 REQUEST BODY: {decoded_body}")
-                except UnicodeDecodeError:
-                    print(f"🚀 REQUEST BODY: Binary data ({len(body)} bytes) - Content not displayed")
-        else:
-            print("🚀 REQUEST BODY: Empty")
-    
-    response = await call_next(request)
-    print(f"🚀 RESPONSE STATUS: {response.status_code}")
-    return response
+# Lets a session read its own writes when reads come from the local replica
+app.add_middleware(ReadSessionMiddleware)
 
-print("=== DEBUG MIDDLEWARE ADDED ===")
+# Structured access log (sampled, written off the request path)
+if ACCESS_LOG_ENABLED:
+    app.add_middleware(AccessLogMiddleware)
+    print(f"=== ACCESS LOG MIDDLEWARE ADDED (sample rate {ACCESS_LOG_SAMPLE_RATE}) ===")
 
 # Create upload directories
 UPLOAD_PATH = os.getenv("UPLOAD_PATH", "./uploads")
@@ -138,11 +119,18 @@ print("=== ROUTERS INCLUDED ===")
 async def startup_event():
     """Initialize SQLite database on startup"""
     await init_db()
+    download_counter.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connections on shutdown"""
+    # Pending download counts must reach the database before it closes
+    await download_counter.stop()
+    await wait_for_extractions(timeout=10)
+    shutdown_extraction()
     await close_db()
+    access_log_writer.close()
+    audit_writer.close()
 
 # Health check endpoint - Support both GET and HEAD for Render
 @app.get("/api/health", response_model=HealthResponse)
@@ -161,9 +149,7 @@ async def connectivity_test():
     """Simple connectivity test"""
     print("=== TEST ENDPOINT HIT ===")
     
-    # Write to file to ensure we capture this
-    with open("debug_log.txt", "a") as f:
-        f.write(f"ENDPOINT CALLED: /api/test at {datetime.now()}\n")
+    audit("connectivity.test")
     
     print("🔍 CONNECTIVITY TEST endpoint called!")
     print("🔍 This should definitely appear in the logs!")
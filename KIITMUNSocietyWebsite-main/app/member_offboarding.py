@@ -0,0 +1,115 @@
+"""
+Member Offboarding for MUN Society Website
+Deletes any number of members with a fixed handful of set-based statements:
+one round trip of lookups, then the ownership transfer and deletes for the
+whole set. Blogs and resources go to one admin, resolved once, or are
+deleted when there is no admin to take them.
+
+Every write is guarded on all targets still being non-admin users: if one was
+promoted or deleted since the lookup the writes change nothing and the
+transaction fails with WriteConflict, on an interactive transaction and an
+HTTP batch alike.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Upper bound on members per request (each id is bound twice per statement)
+OFFBOARD_MAX_MEMBERS = int(os.getenv("OFFBOARD_MAX_MEMBERS", "500"))
+
+
+@dataclass
+class OffboardingReport:
+    # id, email and name of every deleted member
+    deleted: List[Dict[str, Any]] = field(default_factory=list)
+    # Requested ids that were left alone: "not_found" or "admin"
+    skipped: Dict[int, str] = field(default_factory=dict)
+    transferred_to: Optional[int] = None
+    blogs: int = 0
+    resources: int = 0
+
+    def audit_fields(self) -> Dict[str, Any]:
+        """What happened to the members' content, for the audit record"""
+        fields: Dict[str, Any] = {}
+        if self.blogs:
+            if self.transferred_to:
+                fields["blogs_transferred_to"] = self.transferred_to
+                fields["blogs"] = self.blogs
+            else:
+                fields["blogs_deleted"] = self.blogs
+        if self.resources:
+            if self.transferred_to:
+                fields["resources_transferred_to"] = self.transferred_to
+                fields["resources"] = self.resources
+            else:
+                fields["resources_deleted"] = self.resources
+        return fields
+
+
+def _in_list(ids: List[int]) -> str:
+    return ", ".join("?" for _ in ids)
+
+
+def _still_members(ids: List[int]) -> str:
+    """Condition that every id is still a non-admin user; bind ids and len(ids) after the statement's own parameters"""
+    return f"(SELECT COUNT(*) FROM users WHERE id IN ({_in_list(ids)}) AND role != 'admin') = ?"
+
+
+async def offboard_members(tx, member_ids: Iterable[int]) -> OffboardingReport:
+    """Delete members inside a TursoDatabase.transaction(), handing their content to an admin
+
+    Admins and unknown ids are skipped, never deleted. The block raises
+    WriteConflict if the targets changed before the writes ran.
+    """
+    ids = list(dict.fromkeys(member_ids))
+    report = OffboardingReport()
+    if not ids:
+        return report
+
+    member_rows, blog_rows, resource_rows, admin_rows = await tx.gather(
+        (f"SELECT id, email, name, role FROM users WHERE id IN ({_in_list(ids)})", ids),
+        (f"SELECT author_id, COUNT(*) FROM blogs WHERE author_id IN ({_in_list(ids)}) GROUP BY author_id", ids),
+        (f"SELECT uploaded_by, COUNT(*) FROM resources WHERE uploaded_by IN ({_in_list(ids)}) GROUP BY uploaded_by", ids),
+        "SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1",
+    )
+
+    members = {row[0]: row for row in member_rows}
+    targets = []
+    for member_id in ids:
+        member = members.get(member_id)
+        if member is None:
+            report.skipped[member_id] = "not_found"
+        elif member[3] == "admin":
+            report.skipped[member_id] = "admin"
+        else:
+            targets.append(member_id)
+            report.deleted.append({"id": member[0], "email": member[1], "name": member[2]})
+    if not targets:
+        return report
+
+    target_set = set(targets)
+    report.blogs = sum(count for author_id, count in blog_rows if author_id in target_set)
+    report.resources = sum(count for uploaded_by, count in resource_rows if uploaded_by in target_set)
+    report.transferred_to = admin_rows[0][0] if admin_rows else None
+    in_targets = _in_list(targets)
+    guard = _still_members(targets)
+    guard_params = [*targets, len(targets)]
+
+    if report.blogs:
+        if report.transferred_to:
+            await tx.execute(f"UPDATE blogs SET author_id = ? WHERE author_id IN ({in_targets}) AND {guard}",
+                             [report.transferred_to, *targets, *guard_params])
+        else:
+            await tx.execute(f"DELETE FROM blogs WHERE author_id IN ({in_targets}) AND {guard}", [*targets, *guard_params])
+    if report.resources:
+        if report.transferred_to:
+            await tx.execute(f"UPDATE resources SET uploaded_by = ? WHERE uploaded_by IN ({in_targets}) AND {guard}",
+                             [report.transferred_to, *targets, *guard_params])
+        else:
+            await tx.execute(f"DELETE FROM resources WHERE uploaded_by IN ({in_targets}) AND {guard}", [*targets, *guard_params])
+    await tx.execute(f"DELETE FROM authors WHERE user_id IN ({in_targets}) AND {guard}", [*targets, *guard_params])
+    # Deletes nobody if a target was promoted or deleted since the lookup
+    await tx.execute(f"DELETE FROM users WHERE id IN ({in_targets}) AND {guard}", [*targets, *guard_params],
+                     expect_rows=len(targets))
+    return report
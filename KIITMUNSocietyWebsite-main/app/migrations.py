@@ -0,0 +1,263 @@
+"""
+Schema Migrations for MUN Society Website
+The one canonical schema, as an ordered list of versioned migrations.
+init_db applies whatever a database has not seen yet and records it in
+schema_migrations. Statements are idempotent (IF NOT EXISTS, missing-column
+checks), so a migration that fails halfway is simply re-run on the next start.
+Never edit a shipped migration - append a new one.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from app.dashboard_stats import STATS_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    statements: List[str]
+    # (table, column, declaration) added when an older table lacks them
+    add_columns: List[Tuple[str, str, str]] = field(default_factory=list)
+
+
+BASE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS allowed_emails (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        role TEXT DEFAULT 'member',
+        name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL,
+        name TEXT NOT NULL,
+        account_created BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS blogs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        image_path TEXT,
+        author_id INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        image1_path TEXT,
+        image2_path TEXT,
+        competition_date DATE,
+        published BOOLEAN DEFAULT 1
+    )""",
+    """CREATE TABLE IF NOT EXISTS resources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        file_path TEXT NOT NULL,
+        file_size INTEGER NOT NULL,
+        uploaded_by INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        original_filename TEXT NOT NULL DEFAULT '',
+        filename TEXT NOT NULL DEFAULT '',
+        file_type TEXT NOT NULL DEFAULT '',
+        mime_type TEXT NOT NULL DEFAULT '',
+        download_count INTEGER DEFAULT 0,
+        is_active BOOLEAN DEFAULT TRUE
+    )""",
+    """CREATE TABLE IF NOT EXISTS authors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        user_id INTEGER UNIQUE NOT NULL,
+        bio TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS carousel_images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        image_path TEXT NOT NULL,
+        display_order INTEGER DEFAULT 0,
+        active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+]
+
+# Columns added by hand (ALTER TABLE) to databases created from older schema files
+BASE_COLUMNS = [
+    ("blogs", "image1_path", "TEXT"),
+    ("blogs", "image2_path", "TEXT"),
+    ("blogs", "competition_date", "DATE"),
+    ("blogs", "published", "BOOLEAN DEFAULT 1"),
+    ("resources", "original_filename", "TEXT NOT NULL DEFAULT ''"),
+    ("resources", "filename", "TEXT NOT NULL DEFAULT ''"),
+    ("resources", "file_type", "TEXT NOT NULL DEFAULT ''"),
+    ("resources", "mime_type", "TEXT NOT NULL DEFAULT ''"),
+    ("resources", "download_count", "INTEGER DEFAULT 0"),
+    ("resources", "is_active", "BOOLEAN DEFAULT TRUE"),
+    ("users", "account_created", "BOOLEAN DEFAULT 1"),
+]
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_resources_file_type ON resources(file_type)",
+    "CREATE INDEX IF NOT EXISTS idx_blogs_author ON blogs(author_id)",
+    # One composite index per hot query: filter columns first, then the ORDER BY.
+    # All ascending: SQLite stores the rowid (the "id DESC" tiebreaker) ascending, so
+    # a DESC key column leaves a temp B-tree sort, while an ascending index walked
+    # backwards gives every column, rowid included, in DESC order (tests/test_query_plans.py)
+    # blog_service.BLOG_LIST_SQL: published = 1 ORDER BY competition_date DESC, created_at DESC
+    "CREATE INDEX IF NOT EXISTS idx_blogs_published_order ON blogs(published, competition_date, created_at)",
+    # resources listings: is_active = 1 ORDER BY created_at DESC
+    "CREATE INDEX IF NOT EXISTS idx_resources_active_order ON resources(is_active, created_at)",
+    # ...and with ?file_type=
+    "CREATE INDEX IF NOT EXISTS idx_resources_active_type_created ON resources(is_active, file_type, created_at)",
+    # carousel: active = 1 ORDER BY display_order
+    "CREATE INDEX IF NOT EXISTS idx_carousel_active_order ON carousel_images(active, display_order)",
+    # admin member and blog listings: ORDER BY created_at DESC
+    "CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_blogs_created ON blogs(created_at)",
+    # Left-prefix of idx_resources_active_order, so only costs writes
+    "DROP INDEX IF EXISTS idx_resources_active",
+]
+
+
+# External-content FTS5 tables over resources, extracted resource text, blogs and
+# users (app/search_index.py queries them), kept in sync by triggers. The update
+# triggers fire only for the indexed columns, so download counts never re-index.
+SEARCH_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS resource_texts (
+        resource_id INTEGER PRIMARY KEY,
+        body TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL,
+        error TEXT,
+        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS resource_texts_cleanup AFTER DELETE ON resources
+       BEGIN DELETE FROM resource_texts WHERE resource_id = old.id;
+       END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+        title, description, original_filename, content='resources', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS resources_fts_ai AFTER INSERT ON resources
+       BEGIN
+         INSERT INTO resources_fts(rowid, title, description, original_filename) VALUES (new.id, new.title, new.description, new.original_filename);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS resources_fts_ad AFTER DELETE ON resources
+       BEGIN
+         INSERT INTO resources_fts(resources_fts, rowid, title, description, original_filename) VALUES ('delete', old.id, old.title, old.description, old.original_filename);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS resources_fts_au AFTER UPDATE OF title, description, original_filename ON resources
+       BEGIN
+         INSERT INTO resources_fts(resources_fts, rowid, title, description, original_filename) VALUES ('delete', old.id, old.title, old.description, old.original_filename);
+         INSERT INTO resources_fts(rowid, title, description, original_filename) VALUES (new.id, new.title, new.description, new.original_filename);
+       END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS resource_texts_fts USING fts5(
+        body, content='resource_texts', content_rowid='resource_id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS resource_texts_fts_ai AFTER INSERT ON resource_texts
+       BEGIN
+         INSERT INTO resource_texts_fts(rowid, body) VALUES (new.resource_id, new.body);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS resource_texts_fts_ad AFTER DELETE ON resource_texts
+       BEGIN
+         INSERT INTO resource_texts_fts(resource_texts_fts, rowid, body) VALUES ('delete', old.resource_id, old.body);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS resource_texts_fts_au AFTER UPDATE OF body ON resource_texts
+       BEGIN
+         INSERT INTO resource_texts_fts(resource_texts_fts, rowid, body) VALUES ('delete', old.resource_id, old.body);
+         INSERT INTO resource_texts_fts(rowid, body) VALUES (new.resource_id, new.body);
+       END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(
+        title, content, content='blogs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs
+       BEGIN
+         INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs
+       BEGIN
+         INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, content ON blogs
+       BEGIN
+         INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+         INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+       END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, email, content='users', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users
+       BEGIN
+         INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users
+       BEGIN
+         INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users
+       BEGIN
+         INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+         INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+       END""",
+    # Fill the indexes from rows written before they existed
+    "INSERT INTO resources_fts(resources_fts) VALUES ('rebuild')",
+    "INSERT INTO resource_texts_fts(resource_texts_fts) VALUES ('rebuild')",
+    "INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')",
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+
+
+MIGRATIONS = [
+    Migration(1, "base schema", BASE_SCHEMA, BASE_COLUMNS),
+    Migration(2, "indexes", INDEXES),
+    Migration(3, "full-text search", SEARCH_SCHEMA),
+    Migration(4, "dashboard statistics", STATS_SCHEMA),
+]
+
+MIGRATIONS_TABLE = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+
+
+async def schema_version(db) -> int:
+    """Highest applied migration (0 for a database never migrated)"""
+    await db.execute(MIGRATIONS_TABLE)
+    row = await db.fetchone("SELECT MAX(version) FROM schema_migrations")
+    return (row[0] or 0) if row else 0
+
+
+async def _add_missing_columns(db, columns: List[Tuple[str, str, str]]) -> None:
+    existing = {}
+    for table, column, declaration in columns:
+        if table not in existing:
+            rows = await db.fetchall(f"PRAGMA table_info({table})")
+            existing[table] = {row[1] for row in rows}
+        if column not in existing[table]:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            existing[table].add(column)
+
+
+async def run_migrations(db, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """Apply pending migrations in version order; returns the versions applied"""
+    current = await schema_version(db)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        logger.info(f"🔧 Applying migration {migration.version}: {migration.name}")
+        for statement in migration.statements:
+            await db.execute(statement)
+        await _add_missing_columns(db, migration.add_columns)
+        await db.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+            (migration.version, migration.name)
+        )
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,133 @@
+"""
+Pagination helpers for MUN Society Website
+Opaque keyset cursors plus a short-lived COUNT(*) cache for listing endpoints
+"""
+
+import base64
+import json
+import os
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from app.cache import TTLCache
+
+# Totals only need to be roughly fresh; writes invalidate them explicitly as well
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))  # seconds
+count_cache = TTLCache(maxsize=256, ttl=COUNT_CACHE_TTL)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_condition(
+    columns: Sequence[str],
+    values: Sequence[Any],
+    nullable: Sequence[str] = ()
+) -> Tuple[str, List[Any]]:
+    """Build a WHERE fragment selecting rows strictly after `values` in DESC order
+
+    Columns listed in `nullable` are treated the way SQLite sorts them with
+    DESC: NULLs come after every non-NULL value.
+    """
+    clauses = []
+    params: List[Any] = []
+
+    for i, column in enumerate(columns):
+        parts = []
+        part_params: List[Any] = []
+
+        # All earlier sort columns equal to the cursor...
+        for prev_column, prev_value in zip(columns[:i], values[:i]):
+            if prev_value is None:
+                parts.append(f"{prev_column} IS NULL")
+            else:
+                parts.append(f"{prev_column} = ?")
+                part_params.append(prev_value)
+
+        # ...and this one strictly after it
+        value = values[i]
+        if value is None:
+            # Nothing sorts after NULL in DESC order
+            continue
+        if column in nullable:
+            parts.append(f"({column} < ? OR {column} IS NULL)")
+        else:
+            parts.append(f"{column} < ?")
+        part_params.append(value)
+
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(part_params)
+
+    if not clauses:
+        return "0", []
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def page_rows(rows: Sequence[Any], limit: int, key_indexes: Sequence[int]) -> Tuple[List[Any], Optional[str]]:
+    """Trim a LIMIT limit+1 result to the page and compute next_cursor"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[i] for i in key_indexes])
+
+
+async def fetch_total(db, table: str, count_query: str, params: Sequence[Any] = ()) -> int:
+    """Run a COUNT(*) query, serving repeats from the count cache"""
+    key = (table, count_query, tuple(params))
+    total = count_cache.get(key)
+    if total is None:
+        result = await db.fetchone(count_query, list(params))
+        total = result[0] if result else 0
+        count_cache.set(key, total)
+    return total
+
+
+async def fetch_page(
+    db,
+    table: str,
+    count_query: Optional[str],
+    count_params: Sequence[Any],
+    query: str,
+    params: Sequence[Any]
+) -> Tuple[Optional[int], List[Any]]:
+    """Total (None without count_query) and rows of a listing page
+
+    When the total is not cached, the COUNT and the page query share one round trip.
+    """
+    if count_query is None:
+        return None, await db.fetchall(query, list(params))
+
+    key = (table, count_query, tuple(count_params))
+    total = count_cache.get(key)
+    if total is not None:
+        return total, await db.fetchall(query, list(params))
+
+    count_rows, rows = await db.gather((count_query, list(count_params)), (query, list(params)))
+    total = count_rows[0][0] if count_rows else 0
+    count_cache.set(key, total)
+    return total, rows
+
+
+def invalidate_counts(*tables: str) -> int:
+    """Drop cached totals for the given tables after a write"""
+    return count_cache.invalidate_where(lambda key, _value: key[0] in tables)
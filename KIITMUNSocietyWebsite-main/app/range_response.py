@@ -0,0 +1,180 @@
+"""
+Ranged File Responses for MUN Society Website
+Serves stored files with Accept-Ranges, Range/If-Range (206, multipart for
+several ranges, 416 when unsatisfiable) and a strong ETag derived from the
+file's SHA-256, so interrupted downloads can resume where they stopped.
+Full downloads of local files go through FileResponse (sendfile); ranges and
+other backends are streamed with the backend's ranged reads.
+"""
+
+import hashlib
+import os
+import re
+import uuid
+from email.utils import formatdate
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+
+from app.cache import TTLCache
+from app.response_cache import etag_matches
+from app.storage_backends import BlobInfo, StorageBackend
+
+CONTENT_ADDRESS = re.compile(r"^[0-9a-f]{64}$")
+RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+# Hashes of legacy (not content-addressed) files, keyed on (key, size, mtime)
+etag_cache = TTLCache(maxsize=1024, ttl=86400)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+async def content_etag(backend: StorageBackend, info: BlobInfo) -> str:
+    """Strong ETag: the SHA-256 of the content (free for content-addressed keys)"""
+    stem = os.path.splitext(os.path.basename(info.key))[0]
+    if CONTENT_ADDRESS.match(stem):
+        return f'"{stem}"'
+    cache_key = (info.key, info.size, info.modified)
+    etag = etag_cache.get(cache_key)
+    if etag is None:
+        hasher = hashlib.sha256()
+        async for chunk in backend.read_stream(info.key):
+            hasher.update(chunk)
+        etag = f'"{hasher.hexdigest()}"'
+        etag_cache.set(cache_key, etag)
+    return etag
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Byte ranges as sorted, merged (start, end-exclusive) pairs
+
+    Returns None for a header that should be ignored (malformed or not bytes)
+    and raises RangeNotSatisfiable when no range overlaps the file.
+    """
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or not spec:
+        return None
+    ranges = []
+    for part in spec.split(","):
+        match = RANGE_SPEC.match(part)
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+        first, last = match.groups()
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size
+        else:
+            start = int(first)
+            end = size if last == "" else min(int(last) + 1, size)
+            if last != "" and int(last) < start:
+                return None
+            if start >= size:
+                continue
+        ranges.append((start, end))
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        if start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def is_resumed(response: Response) -> bool:
+    """True when a 206 `response` is not the start of a download
+
+    A single range starting at byte 0 is a fresh (e.g. segmented) download;
+    any other single range continues an earlier one. Multipart responses
+    carry no Content-Range header and are never the start of a download.
+    """
+    if response.status_code != 206:
+        return False
+    return not response.headers.get("content-range", "").startswith("bytes 0-")
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+    """If-Range needs an exact (strong) match, otherwise the full file is sent"""
+    if_range = request.headers.get("if-range")
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+
+async def _stream_ranges(backend: StorageBackend, key: str, ranges: List[Tuple[int, int]],
+                         size: int, boundary: str, media_type: str) -> AsyncIterator[bytes]:
+    for start, end in ranges:
+        yield (
+            f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end - 1}/{size}\r\n\r\n"
+        ).encode("latin-1")
+        async for chunk in backend.read_stream(key, start, end - start):
+            yield chunk
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("latin-1")
+
+
+async def file_response(request: Request, backend: StorageBackend, info: BlobInfo,
+                        filename: str, media_type: str) -> Response:
+    """Serve a stored object with conditional and ranged request support"""
+    key = info.key
+    etag = await content_etag(backend, info)
+    last_modified = formatdate(info.modified, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = info.size
+    range_header = request.headers.get("range")
+    ranges = None
+    if range_header and _if_range_matches(request, etag, last_modified):
+        try:
+            ranges = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return PlainTextResponse("Range Not Satisfiable", status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if not ranges:
+        path = backend.local_path(key)
+        # FileResponse would re-evaluate a Range header itself, so it only gets plain requests
+        if path is not None and not range_header:
+            return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
+        headers["Content-Disposition"] = content_disposition(filename)
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(backend.read_stream(key), media_type=media_type, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition(filename)
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        headers["Content-Length"] = str(end - start)
+        return StreamingResponse(backend.read_stream(key, start, end - start), status_code=206,
+                                 media_type=media_type, headers=headers)
+
+    boundary = uuid.uuid4().hex
+    return StreamingResponse(
+        _stream_ranges(backend, key, ranges, size, boundary, media_type),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers
+    )
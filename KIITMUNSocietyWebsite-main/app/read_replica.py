@@ -0,0 +1,249 @@
+"""
+Read Replica for MUN Society Website
+Serves TursoDatabase reads from a local copy of the primary. The copy is
+synced every TURSO_REPLICA_SYNC_INTERVAL seconds and right after writes.
+Writes always go to the primary. A session that has written reads from the
+primary until the replica has synced past its write (read-your-writes); other
+readers may lag by at most one sync.
+
+Each process keeps its own replica and remembers its sessions' writes in
+memory, so read-your-writes only holds within one process. With several
+workers a session can write on one and read a stale replica on another - keep
+TURSO_READ_MODE=replica to single-worker deployments (uvicorn without
+--workers, as in render.yaml) or use the primary.
+
+Against Turso this is a libSQL embedded replica (needs the `libsql` package).
+A file: primary - a local SQLite stand-in for development and tests - is
+copied with SQLite's backup API instead, so the mode works fully offline.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from app.cache import TTLCache
+
+# Embedded replicas are optional - without libsql only file: primaries can be replicated
+try:
+    import libsql
+    LIBSQL_EMBEDDED_AVAILABLE = True
+except ImportError:
+    libsql = None
+    LIBSQL_EMBEDDED_AVAILABLE = False
+
+TURSO_READ_MODE = os.getenv("TURSO_READ_MODE", "primary")  # primary | replica
+TURSO_REPLICA_PATH = os.getenv("TURSO_REPLICA_PATH", "./data/replica.db")
+TURSO_REPLICA_SYNC_INTERVAL = float(os.getenv("TURSO_REPLICA_SYNC_INTERVAL", "30"))  # seconds
+TURSO_REPLICA_SYNC_ON_WRITE = os.getenv("TURSO_REPLICA_SYNC_ON_WRITE", "true").lower() == "true"
+# How long a session that wrote is remembered (well above the sync interval)
+TURSO_REPLICA_SESSION_TTL = float(os.getenv("TURSO_REPLICA_SESSION_TTL", "600"))  # seconds
+
+READ_PREFIXES = ("SELECT", "WITH")
+
+# Session of the request being served (hash of its Authorization header)
+_read_session: ContextVar[Optional[str]] = ContextVar("read_session", default=None)
+
+
+def is_read_query(query: str) -> bool:
+    return query.lstrip().upper().startswith(READ_PREFIXES)
+
+
+def session_key(authorization: str) -> str:
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:32]
+
+
+def bind_read_session(key: Optional[str]):
+    """Attribute the current task's reads and writes to a session; returns a reset token"""
+    return _read_session.set(key)
+
+
+class ReadSessionMiddleware:
+    """Tags each request with its session so reads can follow the session's writes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        authorization = next(
+            (value.decode("latin-1") for key, value in scope.get("headers", []) if key == b"authorization"),
+            None
+        )
+        token = bind_read_session(session_key(authorization) if authorization else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _read_session.reset(token)
+
+
+@dataclass
+class ReplicaResult:
+    rows: List[Any]
+
+
+class ReadReplica:
+    """Local replica of the primary; all SQLite work runs on one dedicated thread"""
+
+    def __init__(self, path: str, primary_url: str, auth_token: Optional[str] = None,
+                 sync_interval: float = TURSO_REPLICA_SYNC_INTERVAL,
+                 sync_on_write: bool = TURSO_REPLICA_SYNC_ON_WRITE):
+        self.path = path
+        self.primary_url = primary_url
+        self.auth_token = auth_token
+        self.sync_interval = sync_interval
+        self.sync_on_write = sync_on_write
+        # Writes this process sent to the primary, and how many the replica has seen
+        self.generation = 0
+        self.synced_generation = 0
+        self.session_writes = TTLCache(maxsize=4096, ttl=TURSO_REPLICA_SESSION_TTL)
+        self.syncs = 0
+        self.failures = 0
+        self.local_reads = 0
+        self.primary_reads = 0
+        self.last_sync: Optional[float] = None
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="read-replica")
+        self._sync_lock = asyncio.Lock()
+        self._dirty = False
+        self._drain_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def local_primary(self) -> Optional[str]:
+        """Path of a file: primary (None for a remote Turso primary)"""
+        if not self.primary_url.startswith("file:"):
+            return None
+        path = self.primary_url[len("file:"):]
+        return path[2:] if path.startswith("//") else path
+
+    # Blocking parts - only ever called on the replica thread
+
+    def _open_blocking(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self.local_primary is not None:
+            self._conn = sqlite3.connect(self.path)
+        elif libsql is not None:
+            self._conn = libsql.connect(self.path, sync_url=self.primary_url, auth_token=self.auth_token)
+        else:
+            raise RuntimeError("Embedded replicas of a remote primary need the libsql package")
+
+    def _sync_blocking(self) -> None:
+        if self.local_primary is None:
+            self._conn.sync()
+            return
+        source = sqlite3.connect(self.local_primary)
+        try:
+            source.backup(self._conn)
+        finally:
+            source.close()
+
+    def _query_blocking(self, query: str, params: Optional[Sequence[Any]]) -> List[Any]:
+        return self._conn.execute(query, tuple(params or ())).fetchall()
+
+    def _close_blocking(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def open(self) -> bool:
+        """Create the local copy and do the first sync; False leaves reads on the primary"""
+        try:
+            await self._call(self._open_blocking)
+        except Exception as e:
+            print(f"❌ Could not open read replica at {self.path}: {e}")
+            return False
+        return await self.sync()
+
+    async def sync(self) -> bool:
+        """Pull the primary's current state into the replica"""
+        async with self._sync_lock:
+            # Every write acknowledged before the sync starts is included in it
+            target = self.generation
+            try:
+                await self._call(self._sync_blocking)
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Read replica sync failed: {e}")
+                return False
+            self.synced_generation = max(self.synced_generation, target)
+            self.syncs += 1
+            self.last_sync = time.time()
+            return True
+
+    async def _drain(self) -> None:
+        # Writes arriving during a sync are picked up by one more
+        while self._dirty:
+            self._dirty = False
+            await self.sync()
+
+    def record_write(self) -> None:
+        """Called after every write to the primary"""
+        self.generation += 1
+        session = _read_session.get()
+        if session:
+            self.session_writes.set(session, self.generation)
+        if self.sync_on_write:
+            self._dirty = True
+            if self._drain_task is None or self._drain_task.done():
+                self._drain_task = asyncio.create_task(self._drain())
+
+    def can_serve(self, query: str) -> bool:
+        """Whether this read may use the replica (not when its session has unsynced writes)"""
+        if self._conn is None or self.syncs == 0 or not is_read_query(query):
+            return False
+        session = _read_session.get()
+        if session:
+            written = self.session_writes.get(session)
+            if written is not None and written > self.synced_generation:
+                return False
+        return True
+
+    async def fetch(self, query: str, params: Optional[Sequence[Any]] = None) -> ReplicaResult:
+        rows = await self._call(self._query_blocking, query, params)
+        self.local_reads += 1
+        return ReplicaResult(rows=rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    def start(self) -> None:
+        """Begin periodic syncing"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        for task in (self._task, self._drain_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._drain_task = None
+        await self._call(self._close_blocking)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "lag_writes": self.generation - self.synced_generation,
+            "seconds_since_sync": round(time.time() - self.last_sync, 1) if self.last_sync else None,
+            "local_reads": self.local_reads,
+            "primary_reads": self.primary_reads,
+            "sessions_pinned": len(self.session_writes),
+        }
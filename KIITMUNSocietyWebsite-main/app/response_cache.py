@@ -0,0 +1,131 @@
+"""
+Response Cache for MUN Society Website
+Read-through cache of serialized JSON bodies for anonymous, high-traffic endpoints.
+Entries are dropped by the admin write handlers; the TTL is only a safety net.
+Responses carry a strong ETag (hash of the body) and Last-Modified so clients can
+revalidate with If-None-Match / If-Modified-Since and get a 304.
+"""
+
+import hashlib
+import json
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from app.cache import TTLCache
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+# Bumped on every invalidation, so a body built across a write is never stored
+_generations: Dict[str, int] = {}
+
+
+def response_cache_key(namespace: str, request: Request) -> Tuple[Hashable, ...]:
+    """Key a response on its namespace, path and (order-independent) query parameters"""
+    return (namespace, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+def serialize_json(data: Any) -> bytes:
+    """Serialize a handler result exactly once into compact JSON bytes"""
+    return json.dumps(jsonable_encoder(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator for a serialized body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def _not_modified_since(request: Request, last_modified: float) -> bool:
+    """If-Modified-Since check - only consulted when If-None-Match is absent"""
+    header = request.headers.get("if-modified-since")
+    if not header or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(last_modified) <= since
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None,
+    cache_status: Optional[str] = None,
+    cache_control: str = "no-cache"
+) -> Response:
+    """Return 304 if the client's validators still match, otherwise the JSON body"""
+    etag = etag or make_etag(body)
+    # no-cache: clients may store the body but must revalidate before reuse
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if cache_status:
+        headers["X-Cache"] = cache_status
+
+    if etag_matches(request, etag) or (last_modified is not None and _not_modified_since(request, last_modified)):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def conditional_json_response(request: Request, data: Any, cache_control: str = "no-cache") -> Response:
+    """Serialize data and answer with ETag revalidation (for endpoints that are not cached)"""
+    return conditional_response(request, serialize_json(data), cache_control=cache_control)
+
+
+async def cached_json_response(
+    namespace: str,
+    request: Request,
+    producer: Callable[[], Awaitable[Any]]
+) -> Response:
+    """Return the cached body for this request, or build, store and return it"""
+    key = response_cache_key(namespace, request)
+    entry = response_cache.get(key)
+    status = "HIT"
+
+    if entry is None:
+        generation = _generations.get(namespace, 0)
+        body = serialize_json(await producer())
+        # The body is hashed once per cache fill, not per request
+        entry = (body, make_etag(body), time.time())
+        # A write invalidated the namespace while we were reading - the body may be stale
+        if _generations.get(namespace, 0) == generation:
+            response_cache.set(key, entry)
+        status = "MISS"
+
+    body, etag, generated_at = entry
+    return conditional_response(request, body, etag, generated_at, status)
+
+
+def invalidate_responses(*namespaces: str) -> int:
+    """Drop cached responses for the given namespaces after a write"""
+    for namespace in namespaces:
+        _generations[namespace] = _generations.get(namespace, 0) + 1
+    return response_cache.invalidate_where(lambda key, _body: key[0] in namespaces)
+
+
+def get_response_cache_stats() -> dict:
+    """Hit/miss counters for the response cache"""
+    return response_cache.stats()
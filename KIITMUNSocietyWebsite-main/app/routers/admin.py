@@ -1,27 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, File, UploadFile, Form
 from fastapi.responses import FileResponse
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import os
 import uuid
-import aiofiles
 from pathlib import Path
 from pydantic import ValidationError
 
-from app.database import get_db
+from app.database import get_db, get_database_info, get_transaction_stats, WriteConflict
 from app.schemas import (
-    DashboardStats, MemberManagement, MemberUpdate, 
-    AddMemberEmail, SuccessResponse, AuthorCreate, Author
+    DashboardStats, ExtendedDashboardStats, MemberManagement, MemberUpdate, 
+    AddMemberEmail, SuccessResponse, AuthorCreate, Author,
+    BulkMemberDelete, BulkMemberDeleteResponse, EmailImportResponse
 )
-from app.auth import require_admin, get_current_user
+from app.auth import require_admin, get_current_user, invalidate_principal_cache, get_principal_cache_stats
+from app.session_tokens import revoke_user_sessions, get_revocation_stats
+from app.pagination import decode_cursor, keyset_condition, page_rows, fetch_page, invalidate_counts
+from app.blog_service import invalidate_author
+from app.member_offboarding import offboard_members, OFFBOARD_MAX_MEMBERS
+from app.dashboard_stats import read_dashboard_stats
+from app.email_import import import_allowed_emails, iter_csv_rows, iter_json_rows, summarize
+from app.response_cache import invalidate_responses, get_response_cache_stats
+from app.audit_log import audit, get_audit_log_stats
+from app.upload_pipeline import store_upload
+from app.blob_store import release_blob, collect_garbage
+from app.file_storage import file_storage
+from app.storage_backends import get_storage
+from app.download_counter import download_counter
+from app.search_index import match_expression, match_ids, ranked_hits_sql, highlight
+from app.text_extraction import schedule_text_extraction, get_extraction_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 # Upload configuration
 UPLOAD_PATH = os.getenv("UPLOAD_PATH", "./uploads")
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "52428800"))  # 50MB
-RESOURCES_DIR = os.path.join(UPLOAD_PATH, "resources")
 
 # File validation
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.zip', '.rar', '.png', '.jpg', '.jpeg'}
@@ -37,9 +51,6 @@ ALLOWED_MIME_TYPES = {
     'image/jpeg'
 }
 
-# Ensure directories exist
-os.makedirs(RESOURCES_DIR, exist_ok=True)
-
 def validate_file(file: UploadFile) -> tuple[bool, str]:
     """Validate uploaded file"""
     # Check file extension
@@ -98,48 +109,66 @@ async def get_dashboard_stats(
         from ..database import get_db
         db = await get_db()
         
-        # Get total counts
-        member_result = await db.fetchone("SELECT COUNT(*) FROM users WHERE role = 'member'")
-        total_members = member_result[0] if member_result else 0
-        
-        blog_result = await db.fetchone("SELECT COUNT(*) FROM blogs")
-        total_blogs = blog_result[0] if blog_result else 0
-        
-        resource_result = await db.fetchone("SELECT COUNT(*) FROM resources")
-        total_resources = resource_result[0] if resource_result else 0
-        
-        # Get recent registrations (last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_result = await db.fetchone(
-            "SELECT COUNT(*) FROM users WHERE created_at >= ?", 
-            (thirty_days_ago,)
-        )
-        recent_registrations = recent_result[0] if recent_result else 0
-        
-        return DashboardStats(
-            total_members=total_members,
-            total_blogs=total_blogs,
-            total_resources=total_resources,
-            recent_registrations=recent_registrations
-        )
+        # Trigger-maintained counters - one primary-key read (see app/dashboard_stats.py)
+        return DashboardStats(**await read_dashboard_stats(db))
         
     except Exception as e:
         print(f"❌ Error fetching dashboard stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch dashboard statistics")
 
+@router.get("/dashboard/stats/extended", response_model=ExtendedDashboardStats)
+async def get_extended_dashboard_stats(
+    admin_user: dict = Depends(require_admin),
+    cur = Depends(get_db)
+):
+    """Dashboard statistics plus the 30-day registration histogram, downloads per file type and blogs per month"""
+    try:
+        return ExtendedDashboardStats(**await read_dashboard_stats(cur, extended=True))
+    except Exception as e:
+        print(f"❌ Error fetching extended dashboard stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch dashboard statistics")
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    admin_user: dict = Depends(require_admin),
+):
+    """Get hit/miss counters for in-process caches"""
+    return {
+        "principal_cache": get_principal_cache_stats(),
+        "session_revocations": get_revocation_stats(),
+        "response_cache": get_response_cache_stats(),
+        "audit_log": get_audit_log_stats(),
+        "storage": file_storage.get_metrics(),
+        "download_counter": download_counter.stats(),
+        "text_extraction": get_extraction_stats(),
+        "read_replica": get_database_info()["replica"],
+        "transactions": get_transaction_stats()
+    }
+
+@router.post("/storage/gc")
+async def collect_storage_garbage(
+    dry_run: bool = Query(True, description="Only report what would be removed"),
+    admin_user: dict = Depends(require_admin),
+):
+    """Remove uploaded files no resource, blog or carousel row references"""
+    db = await get_db()
+    report = await collect_garbage(db, dry_run=dry_run)
+    audit("storage.gc", admin_user, backend=get_storage().name, dry_run=dry_run, report=report)
+    return {"dry_run": dry_run, "report": report}
+
 @router.get("/members")
 async def get_all_members(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
     role_filter: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True),
     # admin_user: dict = Depends(require_admin),  # Temporarily disable auth
 ):
     """Get all members with pagination and filtering"""
     
-    # Write debug info to file
-    with open("admin_debug.txt", "a") as f:
-        f.write(f"GET /admin/members called - page={page}, limit={limit}, search={search}\n")
+    audit("member.list", page=page, limit=limit, search=search, role_filter=role_filter)
     
     print(f"🔍 GET /admin/members called - page={page}, limit={limit}, search={search}")
     
@@ -157,11 +186,11 @@ async def get_all_members(
         conditions = []
         params = []
         
-        # Add search filter
-        if search:
-            conditions.append("(u.email LIKE ? OR u.name LIKE ?)")
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param])
+        # Add search filter (prefix match on name/email words via the FTS5 index)
+        match = match_expression(search)
+        if match:
+            conditions.append(f"u.id IN ({match_ids('users_fts')})")
+            params.append(match)
         
         # Add role filter
         if role_filter:
@@ -170,22 +199,29 @@ async def get_all_members(
         
         # Add WHERE clause if conditions exist
         if conditions:
-            where_clause = " WHERE " + " AND ".join(conditions)
-            base_query += where_clause
-            count_query += where_clause
+            count_query += " WHERE " + " AND ".join(conditions)
+        count_params = list(params)
         
-        # Get total count
-        total_result = await db.fetchone(count_query, params)
-        total = total_result[0] if total_result else 0
+        # Keyset mode: continue after the (created_at, id) of the last row seen
+        if cursor:
+            condition, condition_params = keyset_condition(["u.created_at", "u.id"], decode_cursor(cursor, 2))
+            conditions.append(condition)
+            params.extend(condition_params)
+            offset = 0
         
-        # Calculate total pages
-        total_pages = (total + limit - 1) // limit
+        if conditions:
+            base_query += " WHERE " + " AND ".join(conditions)
         
-        # Get members with pagination
-        base_query += " ORDER BY u.created_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        # Get members with pagination - one extra row tells us if there is a next page
+        base_query += " ORDER BY u.created_at DESC, u.id DESC LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
         
-        members_data = await db.fetchall(base_query, params)
+        # Total (cached between writes) comes back in the same round trip as the page
+        total, members_data = await fetch_page(
+            db, "users", count_query if include_total else None, count_params, base_query, params
+        )
+        total_pages = (total + limit - 1) // limit if total is not None else None
+        members_data, next_cursor = page_rows(members_data, limit, (5, 0))
         
         members = [
             {
@@ -204,18 +240,17 @@ async def get_all_members(
             "total": total,
             "total_pages": total_pages,
             "current_page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = f"Error fetching members: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Write error to file
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in get_all_members: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
+        audit("member.list", outcome="error", error=str(e))
         
         raise HTTPException(status_code=500, detail="Failed to fetch members")
 
@@ -227,11 +262,6 @@ async def update_member(
 ):
     """Update member information"""
     
-    # Add debug logging
-    with open("admin_debug.txt", "a") as f:
-        f.write(f"PUT /admin/members/{member_id} called\n")
-        f.write(f"Update data: {member_update}\n")
-    
     try:
         from ..database import get_db
         db = await get_db()
@@ -285,10 +315,14 @@ async def update_member(
         query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
         
         await db.execute(query, tuple(update_values))
+        invalidate_principal_cache(user_id=member_id)
+        revoke_user_sessions(member_id)
+        invalidate_counts("users")
+        invalidate_author(member_id)
+        invalidate_responses("blogs")
         
-        # Log success
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"SUCCESS: Member {member_id} updated successfully\n")
+        # Field names only - never the new password
+        audit("member.update", None, "user", member_id, fields=[field.split(" ")[0] for field in update_fields])
         
         return SuccessResponse(
             success=True,
@@ -301,11 +335,7 @@ async def update_member(
         error_msg = f"Error updating member: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Write error to file
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in update_member: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
+        audit("member.update", None, "user", member_id, outcome="error", error=str(e))
         
         raise HTTPException(status_code=500, detail="Failed to update member")
 
@@ -318,107 +348,23 @@ async def delete_member(
     """Delete member account with proper cascade handling"""
     
     try:
-        # Log the delete attempt
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"DELETE /admin/members/{member_id} called\n")
-        
-        # Check if member exists
-        async with cur.execute("SELECT id, email, name, role FROM users WHERE id = ?", (member_id,)) as cursor:
-            member = await cursor.fetchone()
+        # Lookups and the cascade commit or roll back together
+        async with cur.transaction("member.delete") as tx:
+            report = await offboard_members(tx, [member_id])
         
-        if not member:
-            with open("admin_debug.txt", "a") as f:
-                f.write(f"ERROR: Member {member_id} not found\n")
+        if report.skipped.get(member_id) == "not_found":
+            audit("member.delete", admin_user, "user", member_id, outcome="not_found")
             raise HTTPException(status_code=404, detail="Member not found")
         
-        member_data = {
-            "id": member[0],
-            "email": member[1], 
-            "name": member[2],
-            "role": member[3]
-        }
-        
-        # Log member details
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"Member to delete: {member_data}\n")
-        
         # Prevent deletion of admin users
-        if member_data["role"] == "admin":
-            with open("admin_debug.txt", "a") as f:
-                f.write(f"ERROR: Cannot delete admin user {member_id}\n")
+        if report.skipped.get(member_id) == "admin":
+            audit("member.delete", admin_user, "user", member_id, outcome="denied", reason="admin user")
             raise HTTPException(status_code=400, detail="Cannot delete admin users")
         
-        # Handle dependent records manually (more reliable than CASCADE)
+        member_data = report.deleted[0]
+        _after_members_deleted([member_id])
         
-        # 1. Handle authors and their blogs
-        async with cur.execute("SELECT id FROM authors WHERE user_id = ?", (member_id,)) as cursor:
-            author_records = await cursor.fetchall()
-        
-        if author_records:
-            with open("admin_debug.txt", "a") as f:
-                f.write(f"Found {len(author_records)} author records for user {member_id}\n")
-            
-            # Check if author has blogs and transfer them to admin
-            async with cur.execute("SELECT id, title FROM blogs WHERE author_id = ?", (member_id,)) as cursor:
-                blog_records = await cursor.fetchall()
-            
-            if blog_records:
-                with open("admin_debug.txt", "a") as f:
-                    f.write(f"Found {len(blog_records)} blogs by user {member_id}\n")
-                
-                # Find an admin user to transfer to
-                async with cur.execute("SELECT id FROM users WHERE role = 'admin' AND id != ? LIMIT 1", (member_id,)) as cursor:
-                    admin_user_result = await cursor.fetchone()
-                
-                if admin_user_result:
-                    admin_user_id = admin_user_result[0]
-                    with open("admin_debug.txt", "a") as f:
-                        f.write(f"Transferring {len(blog_records)} blogs to admin user {admin_user_id}\n")
-                    
-                    # Update blogs to point to admin user
-                    await cur.execute("UPDATE blogs SET author_id = ? WHERE author_id = ?", 
-                                    (admin_user_id, member_id))
-                else:
-                    # If no admin found, delete the blogs (last resort)
-                    with open("admin_debug.txt", "a") as f:
-                        f.write(f"No admin found, deleting {len(blog_records)} blogs\n")
-                    await cur.execute("DELETE FROM blogs WHERE author_id = ?", (member_id,))
-            
-            # Delete the author record
-            await cur.execute("DELETE FROM authors WHERE user_id = ?", (member_id,))
-        
-        # 2. Handle resources - transfer to admin or delete
-        async with cur.execute("SELECT id, title FROM resources WHERE uploaded_by = ?", (member_id,)) as cursor:
-            resource_records = await cursor.fetchall()
-        
-        if resource_records:
-            with open("admin_debug.txt", "a") as f:
-                f.write(f"Found {len(resource_records)} resources uploaded by user {member_id}\n")
-            
-            # Find an admin user to transfer to
-            async with cur.execute("SELECT id FROM users WHERE role = 'admin' AND id != ? LIMIT 1", (member_id,)) as cursor:
-                admin_user_result = await cursor.fetchone()
-            
-            if admin_user_result:
-                admin_user_id = admin_user_result[0]
-                with open("admin_debug.txt", "a") as f:
-                    f.write(f"Transferring {len(resource_records)} resources to admin user {admin_user_id}\n")
-                
-                await cur.execute("UPDATE resources SET uploaded_by = ? WHERE uploaded_by = ?", 
-                                (admin_user_id, member_id))
-            else:
-                # If no admin found, delete the resources
-                with open("admin_debug.txt", "a") as f:
-                    f.write(f"No admin found, deleting {len(resource_records)} resources\n")
-                await cur.execute("DELETE FROM resources WHERE uploaded_by = ?", (member_id,))
-        
-        # 3. Now safe to delete the user
-        await cur.execute("DELETE FROM users WHERE id = ?", (member_id,))
-        await cur.commit()
-        
-        # Log success
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"SUCCESS: Member {member_id} ({member_data['name']}) deleted successfully\n")
+        audit("member.delete", admin_user, "user", member_id, email=member_data["email"], **report.audit_fields())
         
         return SuccessResponse(
             success=True,
@@ -427,21 +373,16 @@ async def delete_member(
         
     except HTTPException:
         raise
+    except WriteConflict as e:
+        print(f"⚠️ Member {member_id} changed during deletion: {e}")
+        audit("member.delete", admin_user, "user", member_id, outcome="conflict")
+        raise HTTPException(status_code=409, detail="Member changed during deletion, nothing was deleted - please retry")
     except Exception as e:
         error_msg = f"Error deleting member {member_id}: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Log detailed error information
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in delete_member: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
-        
-        # Rollback any changes
-        try:
-            await cur.rollback()
-        except:
-            pass
+        # The transaction has already rolled back
+        audit("member.delete", admin_user, "user", member_id, outcome="error", error=str(e))
         
         # Provide more specific error message based on the error type
         if "FOREIGN KEY constraint failed" in str(e):
@@ -460,6 +401,71 @@ async def delete_member(
                 detail=f"Failed to delete member: {str(e)[:100]}..."  # Truncate long error messages
             )
 
+def _after_members_deleted(member_ids: List[int]) -> None:
+    """Drop sessions and cached data of deleted members"""
+    for member_id in member_ids:
+        invalidate_principal_cache(user_id=member_id)
+        revoke_user_sessions(member_id)
+        invalidate_author(member_id)
+    invalidate_counts("users", "blogs", "resources")
+    invalidate_responses("blogs")
+
+@router.post("/members/bulk-delete", response_model=BulkMemberDeleteResponse)
+async def bulk_delete_members(
+    request: BulkMemberDelete,
+    admin_user: dict = Depends(require_admin),
+    cur = Depends(get_db)
+):
+    """Delete many members at once (e.g. a graduating batch); admins and unknown ids are skipped"""
+    
+    if not request.member_ids:
+        raise HTTPException(status_code=400, detail="No member ids given")
+    if len(request.member_ids) > OFFBOARD_MAX_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"At most {OFFBOARD_MAX_MEMBERS} members per request")
+    
+    try:
+        async with cur.transaction("member.bulk_delete") as tx:
+            report = await offboard_members(tx, request.member_ids)
+    except WriteConflict as e:
+        print(f"⚠️ Members changed during bulk deletion: {e}")
+        audit("member.bulk_delete", admin_user, "user", None, outcome="conflict", member_ids=request.member_ids)
+        raise HTTPException(status_code=409, detail="Members changed during deletion, nothing was deleted - please retry")
+    except Exception as e:
+        print(f"❌ Error deleting {len(request.member_ids)} members: {e}")
+        audit("member.bulk_delete", admin_user, "user", None, outcome="error",
+              member_ids=request.member_ids, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to delete members")
+    
+    deleted = [member["id"] for member in report.deleted]
+    if deleted:
+        _after_members_deleted(deleted)
+    audit("member.bulk_delete", admin_user, "user", None, deleted=deleted, skipped=report.skipped,
+          **report.audit_fields())
+    
+    return BulkMemberDeleteResponse(
+        success=True,
+        deleted=deleted,
+        skipped=report.skipped,
+        transferred_to=report.transferred_to,
+        blogs=report.blogs,
+        resources=report.resources
+    )
+
+@router.post("/members/{member_id}/revoke-sessions", response_model=SuccessResponse)
+async def revoke_member_sessions(
+    member_id: int,
+    admin_user: dict = Depends(require_admin),
+):
+    """Invalidate every session token issued to a member"""
+    revoke_user_sessions(member_id)
+    invalidate_principal_cache(user_id=member_id)
+    audit("member.revoke_sessions", admin_user, "user", member_id)
+    
+    return SuccessResponse(
+        success=True,
+        message=f"Sessions for member {member_id} revoked"
+    )
+
 @router.post("/members/add-email", response_model=SuccessResponse)
 async def add_allowed_email(
     request: Request
@@ -483,29 +489,17 @@ async def add_allowed_email(
         email_data = AddMemberEmail(**body)
         
     except json.JSONDecodeError as e:
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"JSON Decode Error: {str(e)}\n")
+        audit("allowed_email.add", outcome="invalid", error=f"JSON decode error: {e}")
         raise HTTPException(status_code=400, detail="Invalid JSON format")
     except ValidationError as e:
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"Validation Error: {str(e)}\n")
+        audit("allowed_email.add", outcome="invalid", error=str(e))
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"Request parsing error: {str(e)}\n")
+        audit("allowed_email.add", outcome="invalid", error=f"Request parsing error: {e}")
         raise HTTPException(status_code=400, detail="Failed to parse request")
     """Add email to allowed_emails list"""
     
-    # Write debug info to file
-    with open("admin_debug.txt", "a") as f:
-        f.write(f"POST /admin/members/add-email called\n")
-        f.write(f"Raw request headers: {dict(request.headers)}\n")
-        f.write(f"email_data: {email_data}\n")
-        f.write(f"Content-Type: {request.headers.get('content-type', 'Not set')}\n")
-        f.write(f"Authorization: {request.headers.get('authorization', 'Not set')}\n")
-    
     print(f"🔍 POST /admin/members/add-email called")
-    print(f"🔍 Raw request headers: {dict(request.headers)}")
     print(f"🔍 Parsed email_data: {email_data}")
     print(f"🔍 email_data.email: {email_data.email}")
     print(f"🔍 email_data.name: {email_data.name}")
@@ -527,9 +521,7 @@ async def add_allowed_email(
             VALUES (?, ?, ?)
         """, (email_data.email, email_data.name, email_data.role))
         
-        # Write success to debug file
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"SUCCESS: Email {email_data.email} added to allowed list\n")
+        audit("allowed_email.add", None, "allowed_email", email_data.email, role=email_data.role)
         
         return SuccessResponse(
             success=True,
@@ -542,14 +534,45 @@ async def add_allowed_email(
         error_msg = f"Error adding email: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Write error to file
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in add_allowed_email: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
+        audit("allowed_email.add", None, "allowed_email", email_data.email, outcome="error", error=str(e))
         
         raise HTTPException(status_code=500, detail="Failed to add email")
 
+@router.post("/members/import-emails", response_model=EmailImportResponse)
+async def import_allowed_emails_roster(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or json (default: from Content-Type)"),
+    update_existing: bool = Query(True, description="Update name/role of emails already allowed"),
+    admin_user: dict = Depends(require_admin),
+    cur = Depends(get_db)
+):
+    """Bulk-add a roster to allowed_emails from a streamed CSV or JSON body
+
+    CSV columns email,name,role (header optional); JSON an array of
+    {"email", "name", "role"} objects or JSON Lines. Role defaults to member.
+    """
+    content_type = request.headers.get("content-type", "").lower()
+    format = (format or ("json" if "json" in content_type else "csv")).lower()
+    if format not in ("csv", "json"):
+        raise HTTPException(status_code=400, detail="format must be csv or json")
+    
+    rows = (iter_json_rows if format == "json" else iter_csv_rows)(request.stream())
+    try:
+        report = await import_allowed_emails(cur, rows, update_existing=update_existing)
+    except ValueError as e:
+        # Malformed upload; complete batches before the problem are kept
+        audit("allowed_email.import", admin_user, outcome="invalid", format=format, error=str(e))
+        raise HTTPException(status_code=400, detail=f"Import stopped: {e}")
+    except Exception as e:
+        print(f"❌ Error importing allowed emails: {e}")
+        audit("allowed_email.import", admin_user, outcome="error", format=format, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to import emails")
+    
+    counts = summarize(report)
+    audit("allowed_email.import", admin_user, format=format, update_existing=update_existing, **counts)
+    
+    return EmailImportResponse(success=True, total=len(report), counts=counts, rows=report)
+
 @router.get("/authors", response_model=List[Author])
 async def get_all_authors(
     admin_user: dict = Depends(require_admin),
@@ -558,14 +581,13 @@ async def get_all_authors(
     """Get all blog authors"""
     
     try:
-        await cur.execute("""
+        authors_data = await cur.fetchall("""
             SELECT a.id, a.username, a.user_id, a.bio, a.created_at,
                    u.name, u.email
             FROM authors a
             JOIN users u ON a.user_id = u.id
             ORDER BY a.created_at DESC
         """)
-        authors_data = await cur.fetchall()
         
         authors = [
             Author(
@@ -595,15 +617,15 @@ async def create_author(
     """Create new blog author"""
     
     try:
-        # Check if user exists
-        async with cur.execute("SELECT id FROM users WHERE id = ?", (author.user_id,)) as cursor:
-            user_exists = await cursor.fetchone()
+        # Both checks in one round trip
+        user_exists, username_exists = await cur.gather(
+            ("SELECT id FROM users WHERE id = ?", (author.user_id,)),
+            ("SELECT id FROM authors WHERE username = ?", (author.username,)),
+        )
         if not user_exists:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Check if username is unique
-        async with cur.execute("SELECT id FROM authors WHERE username = ?", (author.username,)) as cursor:
-            username_exists = await cursor.fetchone()
         if username_exists:
             raise HTTPException(status_code=400, detail="Username already exists")
         
@@ -631,13 +653,13 @@ async def get_all_blogs(
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True),
     admin_user: dict = Depends(require_admin),
 ):
     """Get all blogs with pagination and filtering"""
     
-    # Write debug info to file
-    with open("admin_debug.txt", "a") as f:
-        f.write(f"GET /admin/blogs called - page={page}, limit={limit}, search={search}\n")
+    audit("blog.list", admin_user, page=page, limit=limit, search=search)
     
     print(f"🔍 GET /admin/blogs called - page={page}, limit={limit}, search={search}")
     
@@ -649,47 +671,60 @@ async def get_all_blogs(
         offset = (page - 1) * limit
         
         # Build base query with author information
-        base_query = """
+        match = match_expression(search)
+        search_join = ""
+        conditions = []
+        params = []
+        
+        # Add search filter (title/content or author name, via the FTS5 indexes)
+        if match:
+            if cursor:
+                raise HTTPException(status_code=400, detail="Search results are ranked; use page instead of cursor")
+            # Scored blog matches plus unscored blogs by a matching author. One pass over
+            # each index - a per-row MATCH subquery re-ran the whole search for every blog
+            author_blogs = f"SELECT id FROM blogs WHERE author_id IN ({match_ids('users_fts')})"
+            search_join = f"JOIN ({ranked_hits_sql(('blogs_fts',), unranked=(author_blogs,))}) hits ON hits.id = b.id"
+            params.extend([match, match])
+        
+        base_query = f"""
             SELECT b.id, b.title, b.content, b.competition_date, 
                    b.image_path, b.image1_path, b.image2_path, b.published,
                    b.created_at, b.updated_at,
-                   u.name as author_name, u.email as author_email
+                   u.name as author_name, u.email as author_email,
+                   {"hits.snippet" if match else "NULL"}
             FROM blogs b
             LEFT JOIN users u ON b.author_id = u.id
+            {search_join}
         """
-        count_query = "SELECT COUNT(*) FROM blogs b"
+        count_query = f"SELECT COUNT(*) FROM blogs b {search_join}"
         
-        conditions = []
-        params = []
+        count_params = list(params)
         
-        # Add search filter (search in title and content)
-        if search:
-            conditions.append("""
-                (b.title LIKE ? OR b.content LIKE ? OR u.name LIKE ?)
-            """)
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param])
-            # Also need to join users table in count query for search
-            count_query = "SELECT COUNT(*) FROM blogs b LEFT JOIN users u ON b.author_id = u.id"
+        # Keyset mode: continue after the (created_at, id) of the last row seen
+        if cursor:
+            condition, condition_params = keyset_condition(["b.created_at", "b.id"], decode_cursor(cursor, 2))
+            conditions.append(condition)
+            params.extend(condition_params)
+            offset = 0
         
-        # Add WHERE clause if conditions exist
         if conditions:
-            where_clause = " WHERE " + " AND ".join(conditions)
-            base_query += where_clause
-            count_query += where_clause
-        
-        # Get total count
-        total_result = await db.fetchone(count_query, params)
-        total = total_result[0] if total_result else 0
-        
-        # Calculate total pages
-        total_pages = (total + limit - 1) // limit
-        
-        # Get blogs with pagination
-        base_query += " ORDER BY b.created_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+            base_query += " WHERE " + " AND ".join(conditions)
         
-        blogs_data = await db.fetchall(base_query, params)
+        # Get blogs with pagination - one extra row tells us if there is a next page
+        if match:
+            # Title/content matches by bm25 first, then author-only matches
+            base_query += " ORDER BY hits.score IS NULL, hits.score, b.created_at DESC, b.id DESC LIMIT ? OFFSET ?"
+        else:
+            base_query += " ORDER BY b.created_at DESC, b.id DESC LIMIT ? OFFSET ?"
+        # Total (cached between writes) comes back in the same round trip as the page
+        total, blogs_data = await fetch_page(
+            db, "blogs", count_query if include_total else None, count_params,
+            base_query, params + [limit + 1, offset]
+        )
+        total_pages = (total + limit - 1) // limit if total is not None else None
+        blogs_data, next_cursor = page_rows(blogs_data, limit, (8, 0))
+        if match:
+            next_cursor = None  # Ranked order has no keyset
         
         blogs = [
             {
@@ -704,7 +739,8 @@ async def get_all_blogs(
                 "created_at": row[8],
                 "updated_at": row[9],
                 "author_name": row[10] or "Unknown Author",
-                "author_email": row[11] or "No Email"
+                "author_email": row[11] or "No Email",
+                "snippet": highlight(row[12])
             }
             for row in blogs_data
         ]
@@ -714,18 +750,17 @@ async def get_all_blogs(
             "total": total,
             "total_pages": total_pages,
             "current_page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = f"Error fetching blogs: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Write error to file
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in get_all_blogs: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
+        audit("blog.list", admin_user, outcome="error", error=str(e))
         
         raise HTTPException(status_code=500, detail="Failed to fetch blogs")
 
@@ -740,34 +775,31 @@ async def delete_blog(
         from ..database import get_db
         db = await get_db()
         
-        # Log the delete attempt
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"DELETE /admin/blogs/{blog_id} called\n")
-        
         # Check if blog exists
-        blog = await db.fetchone("SELECT id, title, image_path FROM blogs WHERE id = ?", (blog_id,))
+        blog = await db.fetchone(
+            "SELECT id, title, image1_path, image2_path, image_path FROM blogs WHERE id = ?", (blog_id,)
+        )
         
         if not blog:
-            with open("admin_debug.txt", "a") as f:
-                f.write(f"ERROR: Blog {blog_id} not found\n")
+            audit("blog.delete", admin_user, "blog", blog_id, outcome="not_found")
             raise HTTPException(status_code=404, detail="Blog not found")
         
         blog_data = {
             "id": blog[0],
-            "title": blog[1],
-            "image_path": blog[2]
+            "title": blog[1]
         }
         
-        # Log blog details
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"Blog to delete: {blog_data}\n")
-        
         # Delete the blog
         await db.execute("DELETE FROM blogs WHERE id = ?", (blog_id,))
+        invalidate_counts("blogs")
+        invalidate_responses("blogs")
+        
+        # Clean up image files no other blog still uses
+        await release_blob(db, "images", blog[2])  # image1_path
+        await release_blob(db, "images", blog[3])  # image2_path
+        await release_blob(db, "images", blog[4])  # image_path
         
-        # Log success
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"SUCCESS: Blog {blog_id} ({blog_data['title']}) deleted successfully\n")
+        audit("blog.delete", admin_user, "blog", blog_id, title=blog_data["title"])
         
         return SuccessResponse(
             success=True,
@@ -780,11 +812,7 @@ async def delete_blog(
         error_msg = f"Error deleting blog {blog_id}: {str(e)}"
         print(f"❌ {error_msg}")
         
-        # Log detailed error information
-        with open("admin_debug.txt", "a") as f:
-            f.write(f"ERROR in delete_blog: {error_msg}\n")
-            import traceback
-            f.write(f"Traceback: {traceback.format_exc()}\n")
+        audit("blog.delete", admin_user, "blog", blog_id, outcome="error", error=str(e))
         
         raise HTTPException(status_code=500, detail=f"Failed to delete blog: {str(e)[:100]}...")
 
@@ -845,6 +873,7 @@ async def upload_resource(
     admin_user: dict = Depends(require_admin)
 ):
     """Upload new resource file (Admin only)"""
+    stored = None
     try:
         from ..database import get_db
         db = await get_db()
@@ -854,35 +883,21 @@ async def upload_resource(
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        # Read file content to check size
-        content = await file.read()
-        file_size = len(content)
-        
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
-        
-        if file_size == 0:
-            raise HTTPException(status_code=400, detail="File is empty")
-        
-        # Generate unique filename and get file info
-        unique_filename = generate_unique_filename(file.filename)
-        file_type, mime_type = get_file_type_from_extension(file.filename)
-        file_path = os.path.join(RESOURCES_DIR, unique_filename)
-        
-        # Check if title already exists
+        # Check if title already exists (before spending time on the upload)
         existing = await db.fetchone("SELECT id FROM resources WHERE title = ? AND is_active = 1", (title,))
         if existing:
             raise HTTPException(status_code=409, detail="A resource with this title already exists")
         
-        # Save file to disk
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        file_type, mime_type = get_file_type_from_extension(file.filename)
+        
+        # Stream in chunks, enforcing MAX_FILE_SIZE as it arrives; the
+        # stored name is the content hash, so a re-upload reuses the blob
+        stored = await store_upload(file, get_storage(), "resources", Path(file.filename).suffix, MAX_FILE_SIZE)
+        unique_filename = stored.filename
+        file_size = stored.size
         
         # Save to database
-        await db.execute("""
+        resource_id = await db.execute_with_lastrowid("""
             INSERT INTO resources (
                 title, description, filename, original_filename, file_path, 
                 file_size, file_type, mime_type, uploaded_by, created_at,
@@ -894,12 +909,17 @@ async def upload_resource(
             description,
             unique_filename,
             file.filename,
-            file_path,
+            stored.key,
             file_size,
             file_type,
             mime_type,
             admin_user["id"]
         ))
+        invalidate_counts("resources")
+        # Document text is extracted off the request path and indexed for search
+        schedule_text_extraction(resource_id, stored.key, Path(stored.filename).suffix)
+        audit("resource.upload", admin_user, "resource", resource_id, title=title, filename=unique_filename,
+              size=file_size, sha256=stored.sha256, deduplicated=stored.deduplicated)
         
         return SuccessResponse(
             success=True,
@@ -909,8 +929,8 @@ async def upload_resource(
     except HTTPException:
         raise
     except Exception as e:
-        # Clean up file if database insert fails
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        # Clean up the blob if database insert fails (unless other rows share it)
+        if stored is not None and not stored.deduplicated:
+            await release_blob(db, "resources", stored.filename, grace=0)
         print(f"❌ Error uploading resource: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to upload resource: {str(e)}")
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from fastapi.responses import JSONResponse
+from typing import Optional
 import json
 from app.database import get_db
 from app.schemas import (
@@ -10,6 +11,7 @@ from app.auth import (
     check_email_allowed, check_user_exists, create_user_account, 
     verify_user_credentials
 )
+from app.session_tokens import TOKEN_PREFIX, issue_session_token, revoke_session_token
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -98,6 +100,8 @@ async def login(request: Request, cur = Depends(get_db)):
         if not user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
+        token, expires_at = issue_session_token(user)
+        
         return LoginResponse(
             success=True,
             user=User(
@@ -105,7 +109,9 @@ async def login(request: Request, cur = Depends(get_db)):
                 email=user["email"],
                 name=user["name"],
                 role=user["role"]
-            )
+            ),
+            token=token,
+            expires_at=expires_at
         )
         
     except json.JSONDecodeError as e:
@@ -119,3 +125,17 @@ async def login(request: Request, cur = Depends(get_db)):
             status_code=400,
             content={"detail": f"Invalid request format: {str(e)}"}
         )
+
+@router.post("/logout", response_model=SuccessResponse)
+async def logout(authorization: Optional[str] = Header(None)):
+    """Revoke the session token sent in the Authorization header"""
+    if not authorization or not authorization.startswith(TOKEN_PREFIX):
+        raise HTTPException(status_code=400, detail="No session token provided")
+    
+    if not revoke_session_token(authorization[len(TOKEN_PREFIX):].strip()):
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+    
+    return SuccessResponse(
+        success=True,
+        message="Logged out successfully"
+    )
@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
 from typing import List, Optional
 import os
-import uuid
 from datetime import datetime
-import aiofiles
 
 from app.schemas import Blog, BlogList
 from app.auth import require_admin
+from app.pagination import invalidate_counts
+from app import blog_service
+from app.response_cache import invalidate_responses
+from app.upload_pipeline import store_upload, IMAGE_TYPES
+from app.blob_store import release_blob
+from app.storage_backends import get_storage, public_url
 
 router = APIRouter(prefix="/api/blogs", tags=["blogs"])
 
 # File upload settings
-UPLOAD_DIR = "uploads/images"
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
@@ -32,42 +35,15 @@ async def save_image_file(file: UploadFile) -> Optional[str]:
             print(f"❌ Invalid file extension: {file_ext}. Allowed: {ALLOWED_EXTENSIONS}")
             return None
         
-        # Create unique filename
-        unique_filename = f"blog_image_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        print(f"🔍 Will save to: {file_path}")
-        
-        # Ensure upload directory exists
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        print(f"🔍 Upload directory exists: {os.path.exists(UPLOAD_DIR)}")
-        
-        # Read file content
-        print(f"🔍 Reading file content...")
-        content = await file.read()
-        print(f"🔍 Read {len(content)} bytes")
-        
-        if len(content) == 0:
-            print(f"❌ File is empty")
-            return None
-        
-        if len(content) > MAX_FILE_SIZE:
-            print(f"❌ File too large: {len(content)} > {MAX_FILE_SIZE}")
-            return None
-        
-        # Write file using regular file operations
-        print(f"🔍 Writing file to disk...")
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        print(f"🔍 Checking if file was written...")
-        if os.path.exists(file_path):
-            saved_size = os.path.getsize(file_path)
-            print(f"✅ File saved successfully: {unique_filename} ({saved_size} bytes)")
-            return unique_filename
-        else:
-            print(f"❌ File was not saved to disk")
-            return None
+        # Stream in chunks; rejects empty, oversized or non-image content.
+        # Stored under its content hash, so the same image is only kept once.
+        stored = await store_upload(file, get_storage(), "images", file_ext, MAX_FILE_SIZE, allowed_types=IMAGE_TYPES)
+        print(f"✅ File saved successfully: {stored.filename} ({stored.size} bytes, deduplicated={stored.deduplicated})")
+        return stored.filename
         
+    except HTTPException as e:
+        print(f"❌ Image rejected: {e.detail}")
+        return None
     except Exception as e:
         print(f"❌ Error in save_image_file: {str(e)}")
         print(f"❌ Error type: {type(e)}")
@@ -75,109 +51,7 @@ async def save_image_file(file: UploadFile) -> Optional[str]:
         traceback.print_exc()
         return None
 
-@router.get("", response_model=dict)
-async def get_blogs(
-    page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=50),
-):
-    """Get list of MUN blog posts"""
-    
-    print(f"📚 GET_BLOGS: Fetching blog list")
-    
-    try:
-        from ..database import get_db
-        db = await get_db()
-        
-        # Simple query without author joins
-        blogs = await db.fetchall("""
-            SELECT id, title, content, competition_date, image1_path, image2_path, 
-                   created_at, updated_at, published, author_id
-            FROM blogs
-            ORDER BY created_at DESC
-        """)
-        
-        print(f"🔍 Found {len(blogs)} blogs")
-        
-        # Simple response without complex conversion
-        blog_objects = []
-        for blog in blogs:
-            try:
-                # Manual blog object creation to avoid Schema issues
-                blog_obj = {
-                    "id": blog[0],
-                    "title": blog[1],
-                    "content": blog[2],
-                    "competition_date": blog[3],
-                    "image1_url": f"/uploads/images/{blog[4]}" if blog[4] else None,
-                    "image2_url": f"/uploads/images/{blog[5]}" if blog[5] else None,
-                    "created_at": blog[6],
-                    "updated_at": blog[7],
-                    "author": "Admin",
-                    "published": bool(blog[8])
-                }
-                blog_objects.append(blog_obj)
-                print(f"✅ Successfully converted blog: {blog_obj['title']}")
-            except Exception as e:
-                print(f"❌ Error converting blog {blog[0] if blog else 'unknown'}: {e}")
-        
-        # Calculate pagination
-        total = len(blog_objects)
-        
-        return {
-            "blogs": blog_objects,
-            "total": total,
-            "page": page,
-            "pages": max(1, (total + limit - 1) // limit)
-        }
-        
-    except Exception as e:
-        print(f"❌ Error in get_blogs: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch blog posts: {str(e)}")
-
-@router.get("/{blog_id}", response_model=dict)
-async def get_blog(blog_id: int):
-    """Get single MUN blog post by ID"""
-    
-    print(f"📖 GET_BLOG: Fetching blog ID {blog_id}")
-    
-    try:
-        from ..database import get_db
-        db = await get_db()
-        
-        # Simple query without author joins
-        blog = await db.fetchone("""
-            SELECT id, title, content, competition_date, image1_path, image2_path, 
-                   created_at, updated_at, published, author_id
-            FROM blogs
-            WHERE id = ?
-        """, (blog_id,))
-        
-        if not blog:
-            raise HTTPException(status_code=404, detail="Blog post not found")
-        
-        print(f"📖 Blog found: {blog[1]}")
-        
-        # Manual blog object creation
-        blog_obj = {
-            "id": blog[0],
-            "title": blog[1],
-            "content": blog[2],
-            "competition_date": blog[3],
-            "image1_url": f"/uploads/images/{blog[4]}" if blog[4] else None,
-            "image2_url": f"/uploads/images/{blog[5]}" if blog[5] else None,
-            "created_at": blog[6],
-            "updated_at": blog[7],
-            "author": "Admin",
-            "published": bool(blog[8])
-        }
-        
-        return blog_obj
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Error in get_blog: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch blog post: {str(e)}")
+# Blog reads (GET /api/blogs, GET /api/blogs/{id}) are served by public.router via app.blog_service
 
 @router.post("/debug-test", response_model=dict)
 async def debug_blog_creation():
@@ -327,6 +201,8 @@ async def process_blog_creation(title, content, competition_date, image1, image2
             
             print(f"📝 Blog inserted, committing...")
             await db.commit()
+            invalidate_counts("blogs")
+            invalidate_responses("blogs")
             print(f"📝 Blog created with ID: {blog_id}")
             
         except Exception as db_error:
@@ -345,8 +221,8 @@ async def process_blog_creation(title, content, competition_date, image1, image2
             "title": title,
             "content": content,
             "competition_date": str(parsed_date) if parsed_date else None,
-            "image1_url": f"/uploads/images/{image1_filename}" if image1_filename else None,
-            "image2_url": f"/uploads/images/{image2_filename}" if image2_filename else None,
+            "image1_url": public_url("images", image1_filename),
+            "image2_url": public_url("images", image2_filename),
             "author": "Admin",
             "published": True,
             "created_at": now.isoformat(),
@@ -384,6 +260,8 @@ async def create_blog_simple(
         blog_id = result.last_insert_rowid if hasattr(result, 'last_insert_rowid') else 0
         
         await db.commit()
+        invalidate_counts("blogs")
+        invalidate_responses("blogs")
         
         print(f"✅ Simple blog created with ID: {blog_id}")
         
@@ -420,7 +298,7 @@ async def update_blog(
         from ..database import get_db
         db = await get_db()
         # Check if blog exists
-        existing_blog = await db.fetchone("SELECT * FROM blogs WHERE id = ?", (blog_id,))
+        existing_blog = await db.fetchone("SELECT id, image1_path, image2_path FROM blogs WHERE id = ?", (blog_id,))
         
         if not existing_blog:
             raise HTTPException(status_code=404, detail="Blog post not found")
@@ -447,18 +325,21 @@ async def update_blog(
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid competition_date format. Use YYYY-MM-DD")
         
-        # Handle image uploads
+        # Handle image uploads (replaced images are released after the update)
+        replaced_images = []
         if image1:
             image1_filename = await save_image_file(image1)
             if image1_filename:
                 update_fields.append("image1_path = ?")
                 update_values.append(image1_filename)
+                replaced_images.append(existing_blog[1])
         
         if image2:
             image2_filename = await save_image_file(image2)
             if image2_filename:
                 update_fields.append("image2_path = ?")
                 update_values.append(image2_filename)
+                replaced_images.append(existing_blog[2])
         
         if not update_fields:
             raise HTTPException(status_code=400, detail="No fields to update")
@@ -473,11 +354,16 @@ async def update_blog(
         query = f"UPDATE blogs SET {', '.join(update_fields)} WHERE id = ?"
         await db.execute(query, update_values)
         await db.commit()
+        invalidate_counts("blogs")
+        invalidate_responses("blogs")
+        
+        for old_image in replaced_images:
+            await release_blob(db, "images", old_image)
         
         print(f"✅ Blog updated successfully: ID {blog_id}")
         
         # Return updated blog
-        return await get_blog(blog_id, db)
+        return await blog_service.get_blog(db, blog_id, published_only=False)
         
     except HTTPException:
         raise
@@ -506,19 +392,12 @@ async def delete_blog(
         # Delete the blog record
         await db.execute("DELETE FROM blogs WHERE id = ?", (blog_id,))
         await db.commit()
+        invalidate_counts("blogs")
+        invalidate_responses("blogs")
         
-        # Clean up image files
-        if blog[0]:  # image1_path
-            try:
-                os.remove(os.path.join(UPLOAD_DIR, blog[0]))
-            except:
-                pass
-        
-        if blog[1]:  # image2_path
-            try:
-                os.remove(os.path.join(UPLOAD_DIR, blog[1]))
-            except:
-                pass
+        # Clean up image files no other blog still uses
+        await release_blob(db, "images", blog[0])  # image1_path
+        await release_blob(db, "images", blog[1])  # image2_path
         
         print(f"✅ Blog deleted successfully: {blog[2]}")
         return {"success": True, "message": "Blog post deleted successfully"}
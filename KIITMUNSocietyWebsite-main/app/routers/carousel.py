@@ -1,29 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from fastapi.responses import FileResponse
-import aiofiles
 import os
-import uuid
 from datetime import datetime
 from typing import List, Optional
 from ..auth import get_current_user, require_admin
 from ..database import get_db_connection
 from ..schemas import CarouselImage, CarouselImageCreate
+from ..response_cache import cached_json_response, invalidate_responses
+from ..upload_pipeline import store_upload, IMAGE_TYPES
+from ..blob_store import release_blob
+from ..storage_backends import get_storage
 
 router = APIRouter(prefix="/api/carousel", tags=["carousel"])
 
-# Directory for carousel images
-CAROUSEL_UPLOAD_DIR = "uploads/carousel"
-os.makedirs(CAROUSEL_UPLOAD_DIR, exist_ok=True)
+MAX_IMAGE_SIZE = int(os.getenv("MAX_FILE_SIZE", "52428800"))  # 50MB
 
-@router.get("/", response_model=List[CarouselImage])
-async def get_carousel_images():
-    """Get all active carousel images ordered by display_order"""
+async def _load_active_carousel_images() -> List[CarouselImage]:
     async with get_db_connection() as db:
-        async with db.execute(
+        rows = await db.fetchall(
             "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images WHERE active = 1 ORDER BY display_order ASC"
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [CarouselImage.from_db(row) for row in rows]
+        )
+        return [CarouselImage.from_db(row) for row in rows]
+
+@router.get("/", response_model=List[CarouselImage])
+async def get_carousel_images(request: Request):
+    """Get all active carousel images ordered by display_order"""
+    return await cached_json_response("carousel", request, _load_active_carousel_images)
 
 @router.post("/", response_model=CarouselImage)
 async def create_carousel_image(
@@ -39,36 +41,33 @@ async def create_carousel_image(
     if not image.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Generate unique filename
+    # Stream image file to storage (named by content hash, so duplicates share one file)
     file_extension = os.path.splitext(image.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(CAROUSEL_UPLOAD_DIR, unique_filename)
-    
-    # Save image file
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await image.read()
-            await f.write(content)
+        stored = await store_upload(image, get_storage(), "carousel", file_extension, MAX_IMAGE_SIZE, allowed_types=IMAGE_TYPES)
+        unique_filename = stored.filename
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save image: {str(e)}")
     
     # Save to database
     async with get_db_connection() as db:
-        await db.execute(
+        image_id = await db.execute_with_lastrowid(
             """INSERT INTO carousel_images (title, description, image_path, display_order, active, created_at)
                VALUES (?, ?, ?, ?, ?, ?)""",
             (title, description, unique_filename, display_order, True, datetime.now())
         )
         await db.commit()
+        invalidate_responses("carousel")
         
-        # Get the created record
-        async with db.execute(
-            "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images WHERE image_path = ?",
-            (unique_filename,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return CarouselImage.from_db(row)
+        # Get the created record (image_path is no longer unique per row)
+        row = await db.fetchone(
+            "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images WHERE id = ?",
+            (image_id,)
+        )
+        if row:
+            return CarouselImage.from_db(row)
     
     raise HTTPException(status_code=500, detail="Failed to create carousel image")
 
@@ -86,13 +85,12 @@ async def update_carousel_image(
     
     async with get_db_connection() as db:
         # Check if image exists
-        async with db.execute(
+        existing_row = await db.fetchone(
             "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images WHERE id = ?",
             (image_id,)
-        ) as cursor:
-            existing_row = await cursor.fetchone()
-            if not existing_row:
-                raise HTTPException(status_code=404, detail="Carousel image not found")
+        )
+        if not existing_row:
+            raise HTTPException(status_code=404, detail="Carousel image not found")
         
         # Prepare update data
         update_fields = []
@@ -119,28 +117,19 @@ async def update_carousel_image(
             if not image.content_type.startswith('image/'):
                 raise HTTPException(status_code=400, detail="File must be an image")
             
-            # Delete old image
-            old_image_path = os.path.join(CAROUSEL_UPLOAD_DIR, existing_row[3])
-            if os.path.exists(old_image_path):
-                try:
-                    os.remove(old_image_path)
-                except:
-                    pass  # Continue if deletion fails
-            
             # Save new image
             file_extension = os.path.splitext(image.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(CAROUSEL_UPLOAD_DIR, unique_filename)
             
             try:
-                async with aiofiles.open(file_path, 'wb') as f:
-                    content = await image.read()
-                    await f.write(content)
+                stored = await store_upload(image, get_storage(), "carousel", file_extension, MAX_IMAGE_SIZE, allowed_types=IMAGE_TYPES)
                 
                 update_fields.append("image_path = ?")
-                update_values.append(unique_filename)
+                update_values.append(stored.filename)
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to save image: {str(e)}")
+
         
         # Update database if there are changes
         if update_fields:
@@ -150,15 +139,19 @@ async def update_carousel_image(
                 tuple(update_values)
             )
             await db.commit()
+            invalidate_responses("carousel")
+            
+            # Release the old image once nothing references it
+            if image and existing_row[3] != stored.filename:
+                await release_blob(db, "carousel", existing_row[3])
         
         # Return updated record
-        async with db.execute(
+        row = await db.fetchone(
             "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images WHERE id = ?",
             (image_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return CarouselImage.from_db(row)
+        )
+        if row:
+            return CarouselImage.from_db(row)
     
     raise HTTPException(status_code=500, detail="Failed to update carousel image")
 
@@ -171,27 +164,22 @@ async def delete_carousel_image(
     
     async with get_db_connection() as db:
         # Get image info before deletion
-        async with db.execute(
+        row = await db.fetchone(
             "SELECT image_path FROM carousel_images WHERE id = ?",
             (image_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Carousel image not found")
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="Carousel image not found")
         
         image_path = row[0]
         
         # Delete from database
         await db.execute("DELETE FROM carousel_images WHERE id = ?", (image_id,))
         await db.commit()
+        invalidate_responses("carousel")
         
-        # Delete image file
-        file_path = os.path.join(CAROUSEL_UPLOAD_DIR, image_path)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass  # Continue if deletion fails
+        # Delete image file unless another slide uses the same image
+        await release_blob(db, "carousel", image_path)
     
     return {"message": "Carousel image deleted successfully"}
 
@@ -199,11 +187,10 @@ async def delete_carousel_image(
 async def get_all_carousel_images(current_user=Depends(require_admin)):
     """Get all carousel images including inactive ones (admin only)"""
     async with get_db_connection() as db:
-        async with db.execute(
+        rows = await db.fetchall(
             "SELECT id, title, description, image_path, display_order, active, created_at FROM carousel_images ORDER BY display_order ASC"
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [CarouselImage.from_db(row) for row in rows]
+        )
+        return [CarouselImage.from_db(row) for row in rows]
 
 @router.post("/{image_id}/toggle")
 async def toggle_carousel_image(
@@ -214,13 +201,12 @@ async def toggle_carousel_image(
     
     async with get_db_connection() as db:
         # Check if image exists and get current status
-        async with db.execute(
+        row = await db.fetchone(
             "SELECT active FROM carousel_images WHERE id = ?",
             (image_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Carousel image not found")
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="Carousel image not found")
         
         current_active = bool(row[0])
         new_active = not current_active
@@ -231,5 +217,6 @@ async def toggle_carousel_image(
             (new_active, image_id)
         )
         await db.commit()
+        invalidate_responses("carousel")
     
     return {"message": f"Carousel image {'activated' if new_active else 'deactivated'} successfully"}
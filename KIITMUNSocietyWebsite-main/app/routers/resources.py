@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Form, Request
-from fastapi.responses import FileResponse
 from typing import Optional, List
 import os
 import uuid
@@ -9,13 +8,19 @@ from pathlib import Path
 
 from app.schemas import ResourceList, Resource, SuccessResponse, PublicResourceList, PublicResource, ResourceUpdate
 from app.auth import get_current_user, require_admin
+from app.pagination import decode_cursor, keyset_condition, page_rows, fetch_page, invalidate_counts
+from app.response_cache import conditional_json_response
+from app.blob_store import release_blob
+from app.storage_backends import get_storage, storage_key
+from app.range_response import file_response, is_resumed
+from app.download_counter import download_counter
+from app.search_index import RESOURCE_INDEXES, match_expression, ranked_hits_sql, highlight
 
 router = APIRouter(prefix="/api/resources", tags=["resources"])
 
 # Configuration
 UPLOAD_PATH = os.getenv("UPLOAD_PATH", "./uploads")
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "52428800"))  # 50MB
-RESOURCES_DIR = os.path.join(UPLOAD_PATH, "resources")
 
 # File validation
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.zip'}
@@ -28,9 +33,6 @@ ALLOWED_MIME_TYPES = {
     'application/x-zip-compressed'
 }
 
-# Ensure directories exist
-os.makedirs(RESOURCES_DIR, exist_ok=True)
-
 def get_file_type_from_extension(filename: str) -> tuple[str, str]:
     """Get file type and MIME type from filename"""
     ext = Path(filename).suffix.lower()
@@ -55,10 +57,13 @@ def generate_unique_filename(original_filename: str) -> str:
 # Public endpoints (no authentication required)
 @router.get("/public", response_model=PublicResourceList)
 async def get_public_resources(
+    request: Request,
     search: Optional[str] = Query(None),
     file_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True),
 ):
     """Get public list of resources (no authentication required)"""
     
@@ -72,10 +77,15 @@ async def get_public_resources(
         where_conditions = ["r.is_active = 1"]
         params = []
         
-        if search:
-            where_conditions.append("(r.title LIKE ? OR r.description LIKE ?)")
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term])
+        # Full-text search: ranked prefix matching via the FTS5 index
+        match = match_expression(search)
+        search_join = ""
+        if match:
+            if cursor:
+                raise HTTPException(status_code=400, detail="Search results are ranked; use page instead of cursor")
+            # Matches in the title/description or in the document text itself
+            search_join = f"JOIN ({ranked_hits_sql()}) hits ON hits.id = r.id"
+            params.extend([match] * len(RESOURCE_INDEXES))
         
         if file_type:
             where_conditions.append("r.file_type = ?")
@@ -83,21 +93,34 @@ async def get_public_resources(
         
         where_clause = " AND ".join(where_conditions)
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM resources r WHERE {where_clause}"
-        total_result = await db.fetchone(count_query, params)
-        total = total_result[0] if total_result else 0
+        # Total (cached between writes) - fetched together with the page
+        count_query = f"SELECT COUNT(*) FROM resources r {search_join} WHERE {where_clause}" if include_total else None
+        count_params = list(params)
+        
+        # Keyset mode: continue after the (created_at, id) of the last row seen
+        if cursor:
+            condition, condition_params = keyset_condition(["r.created_at", "r.id"], decode_cursor(cursor, 2))
+            where_clause += f" AND {condition}"
+            params.extend(condition_params)
+            offset = 0
         
         # Get resources (public view - excludes file_path)
         query = f"""
             SELECT r.id, r.title, r.description, r.original_filename, 
-                   r.file_size, r.file_type, r.created_at, r.download_count
+                   r.file_size, r.file_type, r.created_at, r.download_count,
+                   {"hits.snippet" if match else "NULL"}
             FROM resources r
+            {search_join}
             WHERE {where_clause}
-            ORDER BY r.created_at DESC
+            ORDER BY {"hits.score, " if match else ""}r.created_at DESC, r.id DESC
             LIMIT ? OFFSET ?
         """
-        resource_rows = await db.fetchall(query, params + [limit, offset])
+        total, resource_rows = await fetch_page(
+            db, "resources", count_query, count_params, query, params + [limit + 1, offset]
+        )
+        resource_rows, next_cursor = page_rows(resource_rows, limit, (6, 0))
+        if match:
+            next_cursor = None  # Ranked order has no keyset
 
         resources = []
         for row in resource_rows:
@@ -109,17 +132,22 @@ async def get_public_resources(
                 file_size=row[4],
                 file_type=row[5],
                 upload_date=row[6],  # created_at as upload_date
-                download_count=row[7]
+                download_count=row[7] + download_counter.pending_for(row[0]),
+                snippet=highlight(row[8])
             )
             resources.append(resource)
         
-        return PublicResourceList(
+        # ETag over the page body lets polling clients revalidate with a 304
+        return conditional_json_response(request, PublicResourceList(
             resources=resources,
             total=total,
             page=page,
-            pages=ceil(total / limit) if total > 0 else 1
-        )
+            pages=(ceil(total / limit) if total > 0 else 1) if total is not None else None,
+            next_cursor=next_cursor
+        ))
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in get_public_resources: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch resources")
@@ -127,10 +155,13 @@ async def get_public_resources(
 # Member endpoints (authentication required)
 @router.get("", response_model=ResourceList)
 async def get_resources(
+    request: Request,
     search: Optional[str] = Query(None),
     file_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True),
     user: dict = Depends(get_current_user),
 ):
     """List all available resources for authenticated members"""
@@ -145,10 +176,15 @@ async def get_resources(
         where_conditions = ["r.is_active = 1"]
         params = []
         
-        if search:
-            where_conditions.append("(r.title LIKE ? OR r.description LIKE ?)")
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term])
+        # Full-text search: ranked prefix matching via the FTS5 index
+        match = match_expression(search)
+        search_join = ""
+        if match:
+            if cursor:
+                raise HTTPException(status_code=400, detail="Search results are ranked; use page instead of cursor")
+            # Matches in the title/description or in the document text itself
+            search_join = f"JOIN ({ranked_hits_sql()}) hits ON hits.id = r.id"
+            params.extend([match] * len(RESOURCE_INDEXES))
         
         if file_type:
             where_conditions.append("r.file_type = ?")
@@ -156,22 +192,35 @@ async def get_resources(
         
         where_clause = " AND ".join(where_conditions)
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM resources r WHERE {where_clause}"
-        total_result = await db.fetchone(count_query, params)
-        total = total_result[0] if total_result else 0
+        # Total (cached between writes) - fetched together with the page
+        count_query = f"SELECT COUNT(*) FROM resources r {search_join} WHERE {where_clause}" if include_total else None
+        count_params = list(params)
+        
+        # Keyset mode: continue after the (created_at, id) of the last row seen
+        if cursor:
+            condition, condition_params = keyset_condition(["r.created_at", "r.id"], decode_cursor(cursor, 2))
+            where_clause += f" AND {condition}"
+            params.extend(condition_params)
+            offset = 0
         
         # Get resources (full view for authenticated users)
         query = f"""
             SELECT r.id, r.title, r.description, r.filename, r.original_filename, 
                    r.file_path, r.file_size, r.file_type, r.mime_type, r.created_at, 
-                   r.uploaded_by, r.download_count, r.is_active
+                   r.uploaded_by, r.download_count, r.is_active,
+                   {"hits.snippet" if match else "NULL"}
             FROM resources r
+            {search_join}
             WHERE {where_clause}
-            ORDER BY r.created_at DESC
+            ORDER BY {"hits.score, " if match else ""}r.created_at DESC, r.id DESC
             LIMIT ? OFFSET ?
         """
-        resource_rows = await db.fetchall(query, params + [limit, offset])
+        total, resource_rows = await fetch_page(
+            db, "resources", count_query, count_params, query, params + [limit + 1, offset]
+        )
+        resource_rows, next_cursor = page_rows(resource_rows, limit, (9, 0))
+        if match:
+            next_cursor = None  # Ranked order has no keyset
         
         resources = []
         for row in resource_rows:
@@ -187,18 +236,22 @@ async def get_resources(
                 mime_type=row[8],
                 upload_date=row[9],  # created_at as upload_date
                 uploaded_by=row[10],
-                download_count=row[11],
-                is_active=row[12]
+                download_count=row[11] + download_counter.pending_for(row[0]),
+                is_active=row[12],
+                snippet=highlight(row[13])
             )
             resources.append(resource)
         
-        return ResourceList(
+        return conditional_json_response(request, ResourceList(
             resources=resources,
             total=total,
             page=page,
-            pages=ceil(total / limit) if total > 0 else 1
-        )
+            pages=(ceil(total / limit) if total > 0 else 1) if total is not None else None,
+            next_cursor=next_cursor
+        ), cache_control="private, no-cache")
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error fetching resources: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch resources")
@@ -236,12 +289,13 @@ async def get_resource_details(
         mime_type=resource[8],
         upload_date=resource[9],  # created_at as upload_date
         uploaded_by=resource[10],
-        download_count=resource[11],
+        download_count=resource[11] + download_counter.pending_for(resource[0]),
         is_active=resource[12]
     )
 
 @router.get("/{resource_id}/download")
 async def download_resource(
+    request: Request,
     resource_id: int,
     user: dict = Depends(get_current_user)
 ):
@@ -267,28 +321,27 @@ async def download_resource(
     original_filename = resource[1]  # original_filename
     mime_type = resource[3]  # mime_type
     
-    print(f"📁 Looking for file at: {file_path}")
+    storage = get_storage()
+    key = storage_key("resources", file_path)
+    print(f"📁 Looking for file at: {key} ({storage.name} storage)")
     print(f"📄 Original filename: {original_filename}")
     print(f"🎯 MIME type: {mime_type}")
     
-    if not os.path.exists(file_path):
-        print(f"❌ File not found on disk: {file_path}")
-        print(f"📂 Current working directory: {os.getcwd()}")
-        print(f"📂 Upload path from env: {os.getenv('UPLOAD_PATH', './uploads')}")
+    info = await storage.stat(key)
+    if info is None:
+        print(f"❌ File not found in storage: {key}")
         raise HTTPException(status_code=404, detail="File not found on disk")
     
-    # Increment download count
-    await db.execute(
-        "UPDATE resources SET download_count = download_count + 1 WHERE id = ?",
-        (resource_id,)
-    )
+    response = await file_response(request, storage, info, original_filename, mime_type or 'application/octet-stream')
     
-    print(f"✅ Serving file: {file_path}")
-    return FileResponse(
-        path=file_path,
-        filename=original_filename,
-        media_type=mime_type or 'application/octet-stream'
-    )
+    # Count each download once: full responses and single ranges from byte 0 -
+    # not revalidations (304), unsatisfiable ranges (416) or resumed requests.
+    # Written behind in batches, so the download never waits on the database.
+    if response.status_code == 200 or (response.status_code == 206 and not is_resumed(response)):
+        download_counter.increment(resource_id)
+    
+    print(f"✅ Serving file: {key}")
+    return response
 
 # Admin endpoints
 @router.put("/{resource_id}", response_model=SuccessResponse)
@@ -344,6 +397,7 @@ async def update_resource(
     print(f"🔄 WITH PARAMS: {params}")
     
     result = await db.execute(query, params)
+    invalidate_counts("resources")
     
     print(f"✅ UPDATE COMPLETED")
     
@@ -379,6 +433,7 @@ async def delete_resource(
     # Soft delete - mark as inactive
     print(f"🔄 EXECUTING SOFT DELETE")
     result = await db.execute("UPDATE resources SET is_active = 0 WHERE id = ?", (resource_id,))
+    invalidate_counts("resources")
     
     print(f"✅ DELETE COMPLETED")
     
@@ -409,13 +464,13 @@ async def permanently_delete_resource(
     
     # Delete from database
     await db.execute("DELETE FROM resources WHERE id = ?", (resource_id,))
+    invalidate_counts("resources")
     
     file_path = resource[0]  # file_path
     title = resource[1]  # title
     
-    # Delete file from disk
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # Delete the stored file once no other resource row shares the blob
+    await release_blob(db, "resources", file_path)
     
     return SuccessResponse(
         success=True,
@@ -425,6 +480,7 @@ async def permanently_delete_resource(
 # Direct file serving endpoint (alternative to download with tracking)
 @router.get("/files/{filename}")
 async def serve_resource_file(
+    request: Request,
     filename: str,
     user: dict = Depends(get_current_user)
 ):
@@ -445,11 +501,10 @@ async def serve_resource_file(
     original_filename = resource[1]
     mime_type = resource[2]
     
-    if not os.path.exists(file_path):
+    storage = get_storage()
+    key = storage_key("resources", file_path)
+    info = await storage.stat(key)
+    if info is None:
         raise HTTPException(status_code=404, detail="File not found on disk")
     
-    return FileResponse(
-        path=file_path,
-        filename=original_filename,
-        media_type=mime_type or 'application/octet-stream'
-    )
\ No newline at end of file
+    return await file_response(request, storage, info, original_filename, mime_type or 'application/octet-stream')
\ No newline at end of file
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date
+from app.storage_backends import public_url
 
 # Authentication Schemas
 class EmailCheck(BaseModel):
@@ -31,6 +32,8 @@ class LoginResponse(BaseModel):
     success: bool
     user: Optional[User] = None
     message: Optional[str] = None
+    token: Optional[str] = None  # Send as "Authorization: Bearer <token>"
+    expires_at: Optional[int] = None  # Unix timestamp
 
 # Blog Schemas
 class BlogBase(BaseModel):
@@ -79,8 +82,8 @@ class Blog(BlogBase):
             title=row[1],
             content=row[2],
             competition_date=comp_date,
-            image1_url=f"/uploads/images/{row[4]}" if row[4] else None,  # image1_path is at index 4
-            image2_url=f"/uploads/images/{row[5]}" if row[5] else None,  # image2_path is at index 5
+            image1_url=public_url("images", row[4]),  # image1_path is at index 4
+            image2_url=public_url("images", row[5]),  # image2_path is at index 5
             created_at=row[6],  # created_at is at index 6
             updated_at=row[7],  # updated_at is at index 7
             author=row[8] if len(row) > 8 else "Admin"  # author name from join is at index 8
@@ -88,9 +91,26 @@ class Blog(BlogBase):
 
 class BlogList(BaseModel):
     blogs: List[Blog]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+class BlogFields(BaseModel):
+    """A blog in GET /api/blogs - only id and the ?fields= requested when given"""
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = None  # First ?excerpt= characters when given
+    competition_date: Optional[date] = None
+    image1_url: Optional[str] = None
+    image2_url: Optional[str] = None
+    author: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    published: Optional[bool] = None
+
+class BlogPage(BlogList):
+    blogs: List[BlogFields]
 
 # Resource Schemas
 class ResourceBase(BaseModel):
@@ -116,6 +136,7 @@ class Resource(ResourceBase):
     uploaded_by: int
     download_count: int = 0
     is_active: bool = True
+    snippet: Optional[str] = None  # Highlighted match, only for ?search= results
 
     class Config:
         from_attributes = True
@@ -130,18 +151,21 @@ class PublicResource(BaseModel):
     file_type: str
     upload_date: datetime
     download_count: int = 0
+    snippet: Optional[str] = None  # Highlighted match, only for ?search= results
 
 class ResourceList(BaseModel):
     resources: List[Resource]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 class PublicResourceList(BaseModel):
     resources: List[PublicResource]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 # Public Access Schemas
 class PublicResourceCheck(BaseModel):
@@ -170,6 +194,11 @@ class DashboardStats(BaseModel):
     total_resources: int
     recent_registrations: int
 
+class ExtendedDashboardStats(DashboardStats):
+    registrations_by_day: Dict[str, int]  # last 30 days, oldest first
+    downloads_by_file_type: Dict[str, int]
+    blogs_per_month: Dict[str, int]
+
 class MemberManagement(BaseModel):
     id: int
     email: str
@@ -183,11 +212,34 @@ class MemberUpdate(BaseModel):
     role: Optional[str] = None
     password: Optional[str] = None
 
+class BulkMemberDelete(BaseModel):
+    member_ids: List[int]
+
+class BulkMemberDeleteResponse(BaseModel):
+    success: bool
+    deleted: List[int]
+    skipped: Dict[int, str]  # member id -> "not_found" | "admin"
+    transferred_to: Optional[int] = None
+    blogs: int
+    resources: int
+
 class AddMemberEmail(BaseModel):
     email: EmailStr
     name: str
     role: str = "member"
 
+class EmailImportRow(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str  # added | updated | unchanged | skipped | duplicate | invalid
+    error: Optional[str] = None
+
+class EmailImportResponse(BaseModel):
+    success: bool
+    total: int
+    counts: Dict[str, int]
+    rows: List[EmailImportRow]
+
 # Author Schemas
 class AuthorBase(BaseModel):
     username: str
@@ -219,7 +271,7 @@ class CarouselImage(BaseModel):
             id=row[0],
             title=row[1], 
             description=row[2],
-            image_url=f"/uploads/carousel/{row[3]}" if row[3] else None,
+            image_url=public_url("carousel", row[3]),
             display_order=row[4],
             active=bool(row[5]),
             created_at=row[6]
@@ -249,8 +301,8 @@ class BlogWithAuthor(BlogBase):
             title=row[1],
             content=row[2],
             competition_date=row[3],
-            image1_url=f"/uploads/images/{row[4]}" if row[4] else None,
-            image2_url=f"/uploads/images/{row[5]}" if row[5] else None,
+            image1_url=public_url("images", row[4]),
+            image2_url=public_url("images", row[5]),
             created_at=row[6],
             updated_at=row[7],
             author=row[8] if len(row) > 8 else "Admin",
@@ -0,0 +1,78 @@
+"""
+Search Index for MUN Society Website
+FTS5 indexes over resources, blogs, users and the text extracted from
+resource files (resource_texts), kept in sync with their tables by triggers
+(created by migration 3 in app/migrations.py).
+Search terms become prefix queries ("parl rul" finds "Parliamentary Rules"),
+results are ranked with bm25 and snippets mark the matched words with <mark>.
+"""
+
+import html
+import re
+from typing import Dict, Optional, Tuple
+
+# name -> (source table, rowid column, indexed columns, bm25 column weights)
+FTS_INDEXES: Dict[str, Tuple[str, str, Tuple[str, ...], Tuple[float, ...]]] = {
+    "resources_fts": ("resources", "id", ("title", "description", "original_filename"), (10.0, 4.0, 2.0)),
+    "resource_texts_fts": ("resource_texts", "resource_id", ("body",), (1.0,)),
+    "blogs_fts": ("blogs", "id", ("title", "content"), (10.0, 1.0)),
+    "users_fts": ("users", "id", ("name", "email"), (1.0, 1.0)),
+}
+
+# Resource search covers metadata and document bodies
+RESOURCE_INDEXES = ("resources_fts", "resource_texts_fts")
+
+MAX_TERMS = 8
+SNIPPET_TOKENS = 12
+# Control characters FTS5 puts around matches; swapped for <mark> after escaping
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+def match_expression(search: Optional[str]) -> Optional[str]:
+    """FTS5 query for free text: every word must match, each as a prefix"""
+    if not search:
+        return None
+    # Only word characters survive, so user input cannot inject FTS syntax
+    terms = re.findall(r"\w+", search, re.UNICODE)[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def match_ids(name: str) -> str:
+    """`<alias>.id IN (...)` subquery body: ids of rows matching one ? parameter"""
+    return f"SELECT rowid FROM {name} WHERE {name} MATCH ?"
+
+
+def rank_sql(name: str) -> str:
+    """bm25 score (lower is better) for a query that MATCHes `name`"""
+    weights = ", ".join(str(weight) for weight in FTS_INDEXES[name][3])
+    return f"bm25({name}, {weights})"
+
+
+def snippet_sql(name: str) -> str:
+    """Best-matching fragment from any column, matches wrapped in marker characters"""
+    return f"snippet({name}, -1, char(2), char(3), '…', {SNIPPET_TOKENS})"
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and turn the match markers into <mark> tags"""
+    if not snippet:
+        return None
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def ranked_hits_sql(names=RESOURCE_INDEXES, unranked=()) -> str:
+    """Subquery of (id, score, snippet) over several indexes, best score per id
+
+    Takes one MATCH parameter per index, in order, then the parameters of the
+    `unranked` subqueries - ids that match without a score (NULL score/snippet).
+    """
+    parts = [
+        f"SELECT rowid AS id, {rank_sql(name)} AS score, {snippet_sql(name)} AS snippet "
+        f"FROM {name} WHERE {name} MATCH ?"
+        for name in names
+    ]
+    parts += [f"SELECT id, NULL, NULL FROM ({subquery})" for subquery in unranked]
+    # SQLite fills bare columns (snippet) from the row that has the MIN(score)
+    return f"SELECT id, MIN(score) AS score, snippet FROM ({' UNION ALL '.join(parts)}) GROUP BY id"
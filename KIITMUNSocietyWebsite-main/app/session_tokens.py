@@ -0,0 +1,143 @@
+"""
+Signed session tokens for MUN Society Website
+Issued at /api/auth/login so protected requests can be verified without a database round trip
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Token configuration
+SESSION_SECRET = os.getenv("SECRET_KEY", "")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "43200"))  # 12 hours
+TOKEN_PREFIX = "Bearer "
+
+if not SESSION_SECRET:
+    # Tokens will not survive a restart (or be shared between workers) without SECRET_KEY
+    logger.warning("⚠️ SECRET_KEY not set - using a random per-process session secret")
+    SESSION_SECRET = secrets.token_hex(32)
+
+# Server-side revocation state
+_revoked_tokens: Dict[str, float] = {}  # jti -> token expiry
+_user_revoked_before: Dict[int, float] = {}  # user_id -> tokens issued before this are invalid
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload_b64: str) -> str:
+    digest = hmac.new(SESSION_SECRET.encode("utf-8"), payload_b64.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def issue_session_token(user: dict, ttl: Optional[int] = None) -> Tuple[str, int]:
+    """Create a signed token carrying the user's identity and role claims
+
+    Returns: (token, expires_at unix timestamp)
+    """
+    now = time.time()
+    expires_at = int(now + (SESSION_TTL if ttl is None else ttl))
+    payload = {
+        "sub": user["id"],
+        "email": user["email"],
+        "name": user["name"],
+        "role": user["role"],
+        "iat": now,
+        "exp": expires_at,
+        "jti": secrets.token_urlsafe(12),
+    }
+    payload_b64 = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return f"{payload_b64}.{_sign(payload_b64)}", expires_at
+
+
+def decode_session_token(token: str) -> Optional[dict]:
+    """Return the token payload if the signature is valid and it is not expired or revoked"""
+    # Anything non-ASCII is forged, and would break the signature check below
+    if not token.isascii():
+        return None
+    try:
+        payload_b64, signature = token.split(".", 1)
+    except ValueError:
+        return None
+
+    if not hmac.compare_digest(signature, _sign(payload_b64)):
+        return None
+
+    try:
+        payload = json.loads(_b64decode(payload_b64))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    if payload.get("exp", 0) <= time.time():
+        return None
+
+    if payload.get("jti") in _revoked_tokens:
+        return None
+
+    revoked_before = _user_revoked_before.get(payload.get("sub"))
+    if revoked_before is not None and payload.get("iat", 0) <= revoked_before:
+        return None
+
+    return payload
+
+
+def verify_session_token(token: str) -> Optional[dict]:
+    """Validate a session token and return the user dict it represents"""
+    payload = decode_session_token(token)
+    if not payload:
+        return None
+
+    return {
+        "id": payload["sub"],
+        "email": payload["email"],
+        "name": payload["name"],
+        "role": payload["role"]
+    }
+
+
+def _prune_revocations() -> None:
+    """Forget revoked tokens that have expired anyway"""
+    now = time.time()
+    for jti in [jti for jti, exp in _revoked_tokens.items() if exp <= now]:
+        del _revoked_tokens[jti]
+    cutoff = now - SESSION_TTL
+    for user_id in [uid for uid, ts in _user_revoked_before.items() if ts <= cutoff]:
+        del _user_revoked_before[user_id]
+
+
+def revoke_session_token(token: str) -> bool:
+    """Revoke a single session token (logout)"""
+    payload = decode_session_token(token)
+    if not payload:
+        return False
+
+    _prune_revocations()
+    _revoked_tokens[payload["jti"]] = payload["exp"]
+    return True
+
+
+def revoke_user_sessions(user_id: int) -> None:
+    """Revoke every session issued to a user up to now"""
+    _prune_revocations()
+    _user_revoked_before[user_id] = time.time()
+
+
+def get_revocation_stats() -> dict:
+    """Size of the server-side revocation set"""
+    return {
+        "revoked_tokens": len(_revoked_tokens),
+        "revoked_users": len(_user_revoked_before)
+    }
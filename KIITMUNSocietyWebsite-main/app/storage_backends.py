@@ -0,0 +1,401 @@
+"""
+Storage Backends for MUN Society Website
+One async interface for every uploaded file. Keys are "<kind>/<name>", e.g.
+"resources/<sha256>.pdf", "images/<sha256>.png" or "carousel/<sha256>.jpg".
+LocalStorageBackend is the default; CloudinaryStorageBackend stores the same
+keys remotely and InMemoryStorageBackend is a stand-in for tests/benchmarks.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiofiles
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")  # local | cloudinary | memory
+STORAGE_READ_CHUNK = int(os.getenv("STORAGE_READ_CHUNK", "262144"))  # 256KB
+CLOUDINARY_FOLDER = os.getenv("CLOUDINARY_FOLDER", "mun-uploads")
+
+# Kinds of uploaded file, i.e. the first segment of every key
+KINDS = ("resources", "images", "carousel")
+
+
+@dataclass
+class BlobInfo:
+    """Size and last-modified time of a stored object"""
+    key: str
+    size: int
+    modified: float
+
+
+def storage_key(kind: str, value: str) -> str:
+    """Backend key for a stored name, key or legacy on-disk path"""
+    return f"{kind}/{os.path.basename(value)}"
+
+
+def public_url(kind: str, value: Optional[str]) -> Optional[str]:
+    """URL clients fetch a stored file from, wherever the configured backend keeps it"""
+    return get_storage().url(storage_key(kind, value)) if value else None
+
+
+class StorageBackend(ABC):
+    """Async storage interface every router goes through"""
+
+    name = "abstract"
+
+    def staging_dir(self, kind: str) -> str:
+        """Local directory for upload temp files (put_file is cheapest from here)"""
+        return tempfile.gettempdir()
+
+    @abstractmethod
+    async def put_file(self, key: str, local_path: str) -> BlobInfo:
+        """Store a local file under key, consuming (moving/removing) local_path"""
+
+    async def write_stream(self, key: str, chunks: AsyncIterable[bytes]) -> BlobInfo:
+        """Store an async stream of chunks under key"""
+        fd, temp_path = tempfile.mkstemp(prefix=".upload-", suffix=".part", dir=self.staging_dir(key.split("/")[0]))
+        os.close(fd)
+        try:
+            async with aiofiles.open(temp_path, "wb") as out:
+                async for chunk in chunks:
+                    await out.write(chunk)
+            return await self.put_file(key, temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    async def write_bytes(self, key: str, data: bytes) -> BlobInfo:
+        async def once():
+            yield data
+        return await self.write_stream(key, once())
+
+    @abstractmethod
+    def read_stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream `length` bytes (default: to the end) starting at `offset`"""
+
+    async def read_bytes(self, key: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        return b"".join([chunk async for chunk in self.read_stream(key, offset, length)])
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        """Size and modified time, or None if the object does not exist"""
+
+    @abstractmethod
+    async def touch(self, key: str) -> bool:
+        """Refresh the modified time; False if the object no longer exists"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Remove one object; False if it was already gone"""
+
+    async def delete_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        """Delete several objects; maps each key to whether it was removed"""
+        keys = list(keys)
+        results = await asyncio.gather(*(self.delete(key) for key in keys))
+        return dict(zip(keys, results))
+
+    @abstractmethod
+    async def list(self, kind: str) -> List[BlobInfo]:
+        """Every object stored under a kind"""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path when the object is local (enables sendfile), else None"""
+        return None
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """URL clients fetch the object from"""
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under UPLOAD_PATH, served by the /uploads static mounts"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def staging_dir(self, kind: str) -> str:
+        # Same directory as the final file, so put_file is an atomic rename
+        directory = self._path(f"{kind}/_")[:-2]
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    async def put_file(self, key: str, local_path: str) -> BlobInfo:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(local_path, path)
+        except OSError:
+            # Different filesystem - copy then remove
+            await asyncio.to_thread(shutil.move, local_path, path)
+        stat = os.stat(path)
+        return BlobInfo(key, stat.st_size, stat.st_mtime)
+
+    async def read_stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        remaining = length
+        async with aiofiles.open(self._path(key), "rb") as f:
+            await f.seek(offset)
+            while remaining is None or remaining > 0:
+                size = STORAGE_READ_CHUNK if remaining is None else min(STORAGE_READ_CHUNK, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            stat = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return BlobInfo(key, stat.st_size, stat.st_mtime)
+
+    async def touch(self, key: str) -> bool:
+        try:
+            os.utime(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def delete_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        def remove_all(paths):
+            results = {}
+            for key, path in paths:
+                try:
+                    os.remove(path)
+                    results[key] = True
+                except FileNotFoundError:
+                    results[key] = False
+            return results
+        # One worker-thread hop for the whole batch
+        return await asyncio.to_thread(remove_all, [(key, self._path(key)) for key in keys])
+
+    async def list(self, kind: str) -> List[BlobInfo]:
+        directory = os.path.join(self.root, kind)
+        if not os.path.isdir(directory):
+            return []
+        blobs = []
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                stat = entry.stat()
+                blobs.append(BlobInfo(f"{kind}/{entry.name}", stat.st_size, stat.st_mtime))
+        return blobs
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    def url(self, key: str) -> str:
+        return f"/uploads/{key}"
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """Dict-backed stand-in with the same semantics as the real backends"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.objects: Dict[str, Tuple[bytes, float]] = {}
+
+    async def put_file(self, key: str, local_path: str) -> BlobInfo:
+        async with aiofiles.open(local_path, "rb") as f:
+            data = await f.read()
+        os.remove(local_path)
+        self.objects[key] = (data, time.time())
+        return BlobInfo(key, len(data), self.objects[key][1])
+
+    async def write_stream(self, key: str, chunks: AsyncIterable[bytes]) -> BlobInfo:
+        data = b"".join([chunk async for chunk in chunks])
+        self.objects[key] = (data, time.time())
+        return BlobInfo(key, len(data), self.objects[key][1])
+
+    async def read_stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        if key not in self.objects:
+            raise FileNotFoundError(key)
+        data = self.objects[key][0]
+        end = len(data) if length is None else min(len(data), offset + length)
+        for start in range(offset, end, STORAGE_READ_CHUNK):
+            yield data[start:min(start + STORAGE_READ_CHUNK, end)]
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        if key not in self.objects:
+            return None
+        data, modified = self.objects[key]
+        return BlobInfo(key, len(data), modified)
+
+    async def touch(self, key: str) -> bool:
+        if key not in self.objects:
+            return False
+        self.objects[key] = (self.objects[key][0], time.time())
+        return True
+
+    async def delete(self, key: str) -> bool:
+        return self.objects.pop(key, None) is not None
+
+    async def list(self, kind: str) -> List[BlobInfo]:
+        return [
+            BlobInfo(key, len(data), modified)
+            for key, (data, modified) in self.objects.items()
+            if key.startswith(kind + "/")
+        ]
+
+    def url(self, key: str) -> str:
+        return f"/uploads/{key}"
+
+
+class CloudinaryStorageBackend(StorageBackend):
+    """Keys stored as raw Cloudinary assets; SDK calls run on the FileStorageService pool"""
+
+    name = "cloudinary"
+    DELETE_BATCH = 100  # Cloudinary's limit per delete_resources call
+
+    def __init__(self, service=None, folder: str = CLOUDINARY_FOLDER):
+        if service is None:
+            from app.file_storage import file_storage as service
+        if not hasattr(service, "cloudinary"):
+            service._init_cloudinary()
+        self.service = service
+        self.folder = folder
+
+    @property
+    def cloudinary(self):
+        return self.service.cloudinary
+
+    def _public_id(self, key: str) -> str:
+        return f"{self.folder}/{key}"
+
+    def _run(self, operation: str, func, *args, **kwargs):
+        return self.service._run_blocking(operation, partial(func, *args, **kwargs))
+
+    async def put_file(self, key: str, local_path: str) -> BlobInfo:
+        try:
+            # raw keeps the bytes and the public_id (including extension) untouched
+            result = await self._run(
+                "cloudinary.upload", self.cloudinary.uploader.upload, local_path,
+                public_id=self._public_id(key), resource_type="raw", overwrite=True
+            )
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+        return BlobInfo(key, int(result.get("bytes", 0)), time.time())
+
+    async def read_stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        import httpx
+        headers = {}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            headers["Range"] = f"bytes={offset}-{end}"
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            async with client.stream("GET", self.url(key), headers=headers) as response:
+                if response.status_code == 404:
+                    raise FileNotFoundError(key)
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(STORAGE_READ_CHUNK):
+                    yield chunk
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            result = await self._run(
+                "cloudinary.stat", self.cloudinary.api.resource, self._public_id(key), resource_type="raw"
+            )
+        except Exception as e:
+            if type(e).__name__ == "NotFound":
+                return None
+            raise
+        return BlobInfo(key, int(result.get("bytes", 0)), _parse_timestamp(result.get("created_at")))
+
+    async def touch(self, key: str) -> bool:
+        # Cloudinary has no cheap mtime update; existence is what matters here
+        return await self.stat(key) is not None
+
+    async def delete(self, key: str) -> bool:
+        result = await self._run(
+            "cloudinary.destroy", self.cloudinary.uploader.destroy, self._public_id(key), resource_type="raw"
+        )
+        return result.get("result") == "ok"
+
+    async def delete_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        keys = list(keys)
+        results: Dict[str, bool] = {}
+        for start in range(0, len(keys), self.DELETE_BATCH):
+            batch = keys[start:start + self.DELETE_BATCH]
+            result = await self._run(
+                "cloudinary.delete_resources", self.cloudinary.api.delete_resources,
+                [self._public_id(key) for key in batch], resource_type="raw"
+            )
+            deleted = result.get("deleted", {})
+            for key in batch:
+                results[key] = deleted.get(self._public_id(key)) == "deleted"
+        return results
+
+    async def list(self, kind: str) -> List[BlobInfo]:
+        blobs: List[BlobInfo] = []
+        prefix = self._public_id(kind) + "/"
+        next_cursor = None
+        while True:
+            options = {"type": "upload", "resource_type": "raw", "prefix": prefix, "max_results": 500}
+            if next_cursor:
+                options["next_cursor"] = next_cursor
+            result = await self._run("cloudinary.list", self.cloudinary.api.resources, **options)
+            for resource in result.get("resources", []):
+                key = resource["public_id"][len(self.folder) + 1:]
+                blobs.append(BlobInfo(key, int(resource.get("bytes", 0)), _parse_timestamp(resource.get("created_at"))))
+            next_cursor = result.get("next_cursor")
+            if not next_cursor:
+                return blobs
+
+    def url(self, key: str) -> str:
+        return self.cloudinary.utils.cloudinary_url(self._public_id(key), resource_type="raw", secure=True)[0]
+
+
+def _parse_timestamp(value: Optional[str]) -> float:
+    if not value:
+        return time.time()
+    from datetime import datetime
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _create_backend() -> StorageBackend:
+    if STORAGE_BACKEND == "memory":
+        return InMemoryStorageBackend()
+    if STORAGE_BACKEND == "cloudinary":
+        return CloudinaryStorageBackend()
+    return LocalStorageBackend(os.getenv("UPLOAD_PATH", "./uploads"))
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """The configured backend (STORAGE_BACKEND), created on first use"""
+    global _storage
+    if _storage is None:
+        _storage = _create_backend()
+    return _storage
+
+
+def set_storage(backend: Optional[StorageBackend]) -> None:
+    """Swap the backend (tests, offline benchmarks); None re-reads STORAGE_BACKEND"""
+    global _storage
+    _storage = backend
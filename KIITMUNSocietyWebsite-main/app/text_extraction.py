@@ -0,0 +1,215 @@
+"""
+Text Extraction for MUN Society Website
+Pulls searchable text out of uploaded resource files (PDF, DOCX, TXT and the
+documents inside ZIPs) and stores it in resource_texts, which feeds the
+resource_texts_fts search index. Parsing runs in a process pool so large
+documents never hold up the event loop; uploads only schedule the work.
+"""
+
+import asyncio
+import io
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Set
+from xml.etree import ElementTree
+
+from app.upload_pipeline import bom_encoding
+
+# PDF support is optional - without pypdf, PDFs are recorded as unsupported
+try:
+    from pypdf import PdfReader
+    PDF_AVAILABLE = True
+except ImportError:
+    PdfReader = None
+    PDF_AVAILABLE = False
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "2"))
+EXTRACT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "500000"))  # text kept per file
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "4"))  # files in flight at once
+
+# ZIP members larger than this are skipped (zip bombs, embedded media)
+ZIP_MEMBER_MAX_BYTES = 20 * 1024 * 1024
+DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+def _text_from_pdf(data: bytes) -> str:
+    if PdfReader is None:
+        raise UnsupportedFormat("PDF extraction needs pypdf")
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _text_from_docx(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{DOCX_NAMESPACE}p"):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{DOCX_NAMESPACE}t")))
+    return "\n".join(paragraphs)
+
+
+def _text_from_txt(data: bytes) -> str:
+    return data.decode(bom_encoding(data) or "utf-8", errors="replace")
+
+
+def _text_from_zip(data: bytes) -> str:
+    parts = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            # File names alone are useful ("Rules_of_Procedure_2024.pdf")
+            parts.append(member.filename)
+            extension = os.path.splitext(member.filename)[1].lower()
+            if extension == ".zip" or extension not in EXTRACTORS or member.file_size > ZIP_MEMBER_MAX_BYTES:
+                continue
+            try:
+                parts.append(EXTRACTORS[extension](archive.read(member)))
+            except Exception:
+                continue  # One unreadable member should not lose the rest
+    return "\n".join(parts)
+
+
+EXTRACTORS = {
+    ".pdf": _text_from_pdf,
+    ".docx": _text_from_docx,
+    ".txt": _text_from_txt,
+    ".zip": _text_from_zip,
+}
+
+
+def extract_text(path: str, extension: str) -> str:
+    """Text of the file at `path` (runs in a worker process)"""
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        raise UnsupportedFormat(f"No text extractor for {extension or 'files without an extension'}")
+    with open(path, "rb") as f:
+        text = extractor(f.read())
+    # Collapse layout whitespace; it only bloats the index
+    return re.sub(r"\s+", " ", text).strip()[:EXTRACT_MAX_CHARS]
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_pending: Set[asyncio.Task] = set()
+_stats: Dict[str, int] = {"indexed": 0, "empty": 0, "unsupported": 0, "failed": 0}
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _executor
+
+
+async def _extract_from_storage(backend, key: str, extension: str) -> str:
+    """Run extract_text on a local copy of the stored file"""
+    loop = asyncio.get_running_loop()
+    path = backend.local_path(key)
+    if path is not None:
+        return await loop.run_in_executor(_pool(), extract_text, path, extension)
+
+    # Remote backends: stream to a temp file the worker process can open
+    fd, temp_path = tempfile.mkstemp(suffix=extension)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in backend.read_stream(key):
+                out.write(chunk)
+        return await loop.run_in_executor(_pool(), extract_text, temp_path, extension)
+    finally:
+        os.remove(temp_path)
+
+
+async def index_resource_text(db, resource_id: int, key: str, extension: str, backend=None) -> str:
+    """Extract one resource's text into resource_texts; returns the status"""
+    from app.storage_backends import get_storage
+    backend = backend or get_storage()
+    body, error = "", None
+    try:
+        body = await _extract_from_storage(backend, key, extension)
+        status = "indexed" if body else "empty"
+    except UnsupportedFormat as e:
+        status, error = "unsupported", str(e)
+    except Exception as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+        print(f"❌ Text extraction failed for resource {resource_id}: {error}")
+
+    # The resource may have been deleted while we were extracting
+    exists = await db.fetchone("SELECT 1 FROM resources WHERE id = ?", (resource_id,))
+    if not exists:
+        return "deleted"
+    await db.execute(
+        """INSERT INTO resource_texts (resource_id, body, status, error, extracted_at)
+           VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+           ON CONFLICT(resource_id) DO UPDATE SET
+               body = excluded.body, status = excluded.status,
+               error = excluded.error, extracted_at = excluded.extracted_at""",
+        (resource_id, body, status, error)
+    )
+    _stats[status] += 1
+    return status
+
+
+async def _index_bounded(db, resource_id: int, key: str, extension: str) -> str:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+    async with _semaphore:
+        return await index_resource_text(db, resource_id, key, extension)
+
+
+def schedule_text_extraction(resource_id: int, key: str, extension: str) -> asyncio.Task:
+    """Index a new upload in the background (called after the row is inserted)"""
+    async def run():
+        from app.database import get_db
+        try:
+            await _index_bounded(await get_db(), resource_id, key, extension)
+        except Exception as e:
+            print(f"❌ Could not index resource {resource_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return task
+
+
+async def backfill_resource_texts(db, force: bool = False) -> Dict[str, int]:
+    """Index every active resource that has no extracted text yet (all with force)"""
+    query = "SELECT r.id, r.file_path FROM resources r WHERE r.is_active = 1"
+    if not force:
+        query += " AND NOT EXISTS (SELECT 1 FROM resource_texts t WHERE t.resource_id = r.id)"
+    rows = await db.fetchall(query)
+
+    from app.storage_backends import storage_key
+    statuses = await asyncio.gather(*(
+        _index_bounded(db, row[0], storage_key("resources", row[1]), os.path.splitext(row[1])[1])
+        for row in rows
+    ))
+    summary = {"resources": len(rows)}
+    for status in statuses:
+        summary[status] = summary.get(status, 0) + 1
+    return summary
+
+
+async def wait_for_extractions(timeout: Optional[float] = None) -> None:
+    """Wait for scheduled extractions (shutdown, tests)"""
+    if _pending:
+        await asyncio.wait(set(_pending), timeout=timeout)
+
+
+def shutdown_extraction() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_extraction_stats() -> dict:
+    return {**_stats, "in_flight": len(_pending), "pdf_available": PDF_AVAILABLE}
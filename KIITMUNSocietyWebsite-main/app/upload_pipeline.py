@@ -0,0 +1,215 @@
+"""
+Upload Pipeline for MUN Society Website
+Streams an UploadFile to a temp file in fixed-size chunks, enforcing the size
+limit as it goes, hashing and sniffing magic bytes in the same pass, then
+hands the file to the storage backend. Peak memory per upload is one chunk.
+store_upload keys files by their SHA-256 so identical content is kept once.
+"""
+
+import codecs
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", "1048576"))  # 1MB
+SNIFF_BYTES = 16
+TEMP_PREFIX = ".upload-"
+
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+# Content types each extension may actually contain (docx is a zip container)
+EXTENSION_TYPES = {
+    ".pdf": {"application/pdf"},
+    ".doc": {"application/msword"},
+    ".docx": {"application/zip"},
+    ".txt": {"text/plain"},
+    ".zip": {"application/zip"},
+    ".rar": {"application/x-rar-compressed"},
+    ".png": {"image/png"},
+    ".jpg": {"image/jpeg"},
+    ".jpeg": {"image/jpeg"},
+    ".gif": {"image/gif"},
+    ".webp": {"image/webp"},
+}
+
+
+# Byte order marks of Unicode text; UTF-32 LE first, as it starts with the UTF-16 LE mark
+TEXT_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def bom_encoding(head: bytes) -> Optional[str]:
+    """Codec for text starting with a byte order mark (the codec strips the mark)"""
+    for bom, encoding in TEXT_BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+@dataclass
+class StoredUpload:
+    """A file that has been handed to the storage backend"""
+    key: str
+    filename: str
+    size: int
+    sha256: str
+    content_type: Optional[str]
+    deduplicated: bool = False
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Detect a content type from the first bytes of a file"""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"PK\x03\x04", b"PK\x05\x06")):
+        return "application/zip"
+    if head.startswith(b"Rar!\x1a\x07"):
+        return "application/x-rar-compressed"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "application/msword"
+    # UTF-16/32 text is full of NUL bytes, so the mark is checked before UTF-8
+    if bom_encoding(head):
+        return "text/plain"
+    if b"\x00" not in head:
+        try:
+            # A multi-byte character may be cut off at the end of the sample
+            head.decode("utf-8")
+            return "text/plain"
+        except UnicodeDecodeError as e:
+            if e.start >= len(head) - 3:
+                return "text/plain"
+    return None
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_size // (1024*1024)}MB"
+    )
+
+
+async def _stream_to_temp(
+    upload: UploadFile,
+    dest_dir: str,
+    extension: str,
+    max_size: int,
+    allowed_types: Optional[Iterable[str]]
+) -> Tuple[str, int, str, Optional[str]]:
+    """Stream into a temp file in dest_dir (the backend's staging dir); returns (temp_path, size, sha256, content_type)"""
+    # Reject early when the client declared the size
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    # Staging dir is next to the target for the local backend, so the final rename is atomic
+    temp_path = os.path.join(dest_dir, f"{TEMP_PREFIX}{uuid.uuid4().hex}.part")
+
+    hasher = hashlib.sha256()
+    head = b""
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                hasher.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+
+        content_type = sniff_content_type(head)
+        expected = EXTENSION_TYPES.get(extension.lower())
+        if expected is not None and content_type not in expected:
+            raise HTTPException(status_code=400, detail="File content does not match its extension")
+        if allowed_types is not None and content_type not in set(allowed_types):
+            raise HTTPException(status_code=400, detail="File type not allowed")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return temp_path, size, hasher.hexdigest(), content_type
+
+
+def blob_filename(sha256: str, extension: str) -> str:
+    """Content-addressed name: the SHA-256 of the bytes plus the original extension"""
+    return f"{sha256}{extension.lower()}"
+
+
+async def _place_blob(backend, temp_path: str, kind: str, sha256: str, extension: str) -> Tuple[str, str, bool]:
+    """Hand a temp file to the backend at its content address; returns (key, filename, deduplicated)"""
+    filename = blob_filename(sha256, extension)
+    key = f"{kind}/{filename}"
+    # Same bytes already stored - refreshing mtime lets the GC grace period apply
+    if await backend.touch(key):
+        os.remove(temp_path)
+        return key, filename, True
+    await backend.put_file(key, temp_path)
+    return key, filename, False
+
+
+async def store_upload(
+    upload: UploadFile,
+    backend,
+    kind: str,
+    extension: str,
+    max_size: int,
+    allowed_types: Optional[Iterable[str]] = None
+) -> StoredUpload:
+    """Stream `upload` into the content-addressed store under `kind`
+
+    Identical content is stored once; a re-upload of an existing file only
+    costs the hash pass. Blobs are reclaimed through app.blob_store.
+    """
+    temp_path, size, sha256, content_type = await _stream_to_temp(
+        upload, backend.staging_dir(kind), extension, max_size, allowed_types
+    )
+    try:
+        key, filename, deduplicated = await _place_blob(backend, temp_path, kind, sha256, extension)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return StoredUpload(key, filename, size, sha256, content_type, deduplicated)
+
+
+async def store_bytes(content: bytes, backend, kind: str, extension: str) -> StoredUpload:
+    """Content-addressed store for content that is already in memory"""
+    staging_dir = backend.staging_dir(kind)
+    os.makedirs(staging_dir, exist_ok=True)
+    sha256 = hashlib.sha256(content).hexdigest()
+    temp_path = os.path.join(staging_dir, f"{TEMP_PREFIX}{uuid.uuid4().hex}.part")
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            await out.write(content)
+        key, filename, deduplicated = await _place_blob(backend, temp_path, kind, sha256, extension)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return StoredUpload(key, filename, len(content), sha256,
+                        sniff_content_type(content[:SNIFF_BYTES]), deduplicated)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Extract and index the text of resource files uploaded before content search
+Run from the project root: python scripts/backfill_resource_text.py [--force]
+--force re-extracts every active resource, not just the ones never indexed
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, close_db, get_db
+from app.text_extraction import backfill_resource_texts, shutdown_extraction, PDF_AVAILABLE
+
+
+async def main(force: bool) -> int:
+    if not await init_db():
+        print("❌ Could not connect to the database - check TURSO_DATABASE_URL / TURSO_AUTH_TOKEN")
+        return 1
+    if not PDF_AVAILABLE:
+        print("⚠️ pypdf is not installed - PDFs will be recorded as unsupported")
+    try:
+        summary = await backfill_resource_texts(await get_db(), force=force)
+    finally:
+        shutdown_extraction()
+        await close_db()
+
+    print(f"✅ Processed {summary.pop('resources')} resources")
+    for status, count in sorted(summary.items()):
+        print(f"   {status}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    print("🔎 MUN Society Resource Text Backfill")
+    print("=" * 40)
+    sys.exit(asyncio.run(main(force="--force" in sys.argv[1:])))
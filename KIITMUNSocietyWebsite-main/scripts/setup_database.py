@@ -2,6 +2,7 @@
 """
 Database setup script for MUN Society Website
 Creates all required tables with proper schema
+Superseded: the canonical schema is app/migrations.py, applied by init_db
 """
 
 import os
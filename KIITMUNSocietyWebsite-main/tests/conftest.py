@@ -0,0 +1,165 @@
+import sqlite3
+import pytest
+from libsql_client import create_client
+from app.database import TursoDatabase
+from app.cache import TTLCache
+from app.migrations import run_migrations
+
+# Schema as deployed on Turso before migrations (see munsociety_dev.db)
+LOCAL_SCHEMA = """
+CREATE TABLE allowed_emails (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    role TEXT DEFAULT 'member',
+    name TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    account_created BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE blogs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    image_path TEXT,
+    author_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    image1_path TEXT,
+    image2_path TEXT,
+    competition_date DATE,
+    published BOOLEAN DEFAULT 1
+);
+CREATE TABLE resources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    uploaded_by INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    original_filename TEXT NOT NULL DEFAULT '',
+    filename TEXT NOT NULL DEFAULT '',
+    file_type TEXT NOT NULL DEFAULT '',
+    mime_type TEXT NOT NULL DEFAULT '',
+    download_count INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE
+);
+CREATE TABLE authors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    user_id INTEGER UNIQUE NOT NULL,
+    bio TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE carousel_images (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    image_path TEXT NOT NULL,
+    display_order INTEGER DEFAULT 0,
+    active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def local_db_path(tmp_path):
+    """SQLite file with the deployed schema and a seeded admin user"""
+    path = tmp_path / "munsociety_test.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LOCAL_SCHEMA)
+    conn.execute(
+        "INSERT INTO users (email, password, role, name) VALUES ('admin@munsociety.edu', 'admin123', 'admin', 'MUN Admin')"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+async def local_db(local_db_path, monkeypatch):
+    """Migrated TursoDatabase backed by a local libsql file client (no network)"""
+    import app.database as database
+    client = create_client(f"file:{local_db_path}")
+    monkeypatch.setattr(database, "turso_client", client)
+    db = TursoDatabase(client)
+    await run_migrations(db)
+    return db
+
+@pytest.fixture
+async def api_client(local_db):
+    """HTTP client for the app wired to the local database"""
+    from httpx import AsyncClient
+    from app.main import app
+    from app.text_extraction import wait_for_extractions
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+    # Uploads schedule text extraction; let it finish inside this test's loop
+    await wait_for_extractions()
+
+@pytest.fixture
+def admin_headers():
+    """Bearer token for the seeded admin (user 1)"""
+    from app.session_tokens import issue_session_token
+    token, _ = issue_session_token({"id": 1, "email": "admin@munsociety.edu", "name": "MUN Admin", "role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    """Keep cached totals, author names and responses from leaking between tests"""
+    import app.pagination as pagination
+    import app.blog_service as blog_service
+    import app.response_cache as response_cache
+    monkeypatch.setattr(pagination, "count_cache", TTLCache(maxsize=256, ttl=30))
+    monkeypatch.setattr(blog_service, "author_cache", TTLCache(maxsize=512, ttl=300))
+    monkeypatch.setattr(response_cache, "response_cache", TTLCache(maxsize=256, ttl=300))
+
+@pytest.fixture(autouse=True)
+def audit_log_file(tmp_path, monkeypatch):
+    """Send audit records to a per-test file instead of ./logs"""
+    import app.audit_log as audit_log
+    from app.log_writer import LineWriter
+    path = tmp_path / "audit.log"
+    writer = LineWriter(path=str(path), name="audit-log-test")
+    monkeypatch.setattr(audit_log, "audit_writer", writer)
+    yield path
+    writer.close()
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path):
+    """Per-test local storage backend rooted at tmp_path/uploads"""
+    from app.storage_backends import LocalStorageBackend, set_storage
+    backend = LocalStorageBackend(str(tmp_path / "uploads"))
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+
+@pytest.fixture(autouse=True)
+def download_counts(monkeypatch):
+    """Start each test with no pending download deltas"""
+    import asyncio
+    from app.download_counter import download_counter
+    monkeypatch.setattr(download_counter, "pending", {})
+    monkeypatch.setattr(download_counter, "_lock", asyncio.Lock())
+    return download_counter
+
+@pytest.fixture(autouse=True)
+def extraction_pool(monkeypatch):
+    """Run text extraction on threads instead of worker processes in tests"""
+    from concurrent.futures import ThreadPoolExecutor
+    import app.text_extraction as text_extraction
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(text_extraction, "_pool", lambda: executor)
+    monkeypatch.setattr(text_extraction, "_semaphore", None)
+    yield executor
+    executor.shutdown(wait=True)
@@ -0,0 +1,58 @@
+"""Test doubles shared by several test modules"""
+
+from libsql_client import LibsqlError
+
+class RecordingClient:
+    """Passes statements through to a libsql client, remembering them and the round trips"""
+
+    def __init__(self, client):
+        self.client = client
+        self.statements = []
+        self.round_trips = 0
+
+    async def execute(self, query, params=None):
+        self.statements.append((query, params))
+        self.round_trips += 1
+        if params is None:
+            return await self.client.execute(query)
+        return await self.client.execute(query, params)
+
+    async def batch(self, stmts):
+        self.statements.extend(stmts)
+        self.round_trips += 1
+        return await self.client.batch(stmts)
+
+    def transaction(self):
+        return RecordingTransaction(self, self.client.transaction())
+
+    async def close(self):
+        await self.client.close()
+
+class RecordingTransaction:
+    """Interactive transaction of a RecordingClient; every statement is a round trip"""
+
+    def __init__(self, recorder, tx):
+        self.recorder = recorder
+        self.tx = tx
+
+    async def execute(self, query, params=None):
+        self.recorder.statements.append((query, params))
+        self.recorder.round_trips += 1
+        return await self.tx.execute(query, params)
+
+    async def commit(self):
+        self.recorder.round_trips += 1
+        await self.tx.commit()
+
+    async def rollback(self):
+        await self.tx.rollback()
+
+    @property
+    def closed(self):
+        return self.tx.closed
+
+class BatchOnlyClient(RecordingClient):
+    """Behaves like the HTTP client, which has no interactive transactions"""
+
+    def transaction(self):
+        raise LibsqlError("The HTTP client does not support transactions.", "TRANSACTIONS_NOT_SUPPORTED")
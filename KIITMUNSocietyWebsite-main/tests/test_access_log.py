@@ -0,0 +1,103 @@
+import json
+import threading
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient
+from app.access_log import AccessLogMiddleware
+from app.log_writer import LineWriter
+
+class ListWriter:
+    """Collects access log lines in memory"""
+    def __init__(self):
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(json.loads(line))
+        return True
+
+def make_app(**options):
+    writer = ListWriter()
+    app = FastAPI()
+
+    @app.post("/items/{item_id}")
+    async def echo(item_id: int, request: Request):
+        return {"id": item_id, "size": len(await request.body())}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(AccessLogMiddleware, writer=writer, **options)
+    return app, writer
+
+@pytest.mark.anyio
+async def test_access_log_line_fields_and_body_cap():
+    """Test one JSON line per request with route template, bytes and capped body"""
+    app, writer = make_app(sample_rate=1.0, capture_body=True, body_max=8)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/items/5", content=b'{"name": "a long body"}',
+                                     headers={"content-type": "application/json"})
+        await client.post("/items/6", files={"file": ("a.pdf", b"%PDF-1.4 data")})
+
+    entry, upload = writer.lines
+    assert entry["method"] == "POST"
+    assert entry["route"] == "/items/{item_id}"
+    assert entry["status"] == 200
+    assert entry["bytes_in"] == 23
+    assert entry["bytes_out"] == len(response.content)
+    assert entry["body"] == '{"name":'
+    assert entry["body_truncated"] is True
+    assert "body" not in upload
+
+@pytest.mark.anyio
+async def test_access_log_sampling_keeps_server_errors():
+    """Test a zero sample rate drops normal requests but still logs 5xx"""
+    app, writer = make_app(sample_rate=0.0)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.post("/items/1", content=b"x")
+        with pytest.raises(RuntimeError):
+            await client.get("/boom")
+
+    assert [(entry["route"], entry["status"]) for entry in writer.lines] == [("/boom", 500)]
+    assert "body" not in writer.lines[0]
+
+def test_line_writer_batches_in_background(tmp_path):
+    """Test queued lines reach the file in order"""
+    path = tmp_path / "access.log"
+    writer = LineWriter(path=str(path), maxsize=100)
+    for i in range(5):
+        assert writer.write(f"line {i}")
+    writer.close()
+    assert path.read_text().splitlines() == [f"line {i}" for i in range(5)]
+    assert writer.stats()["written"] == 5
+
+class BlockingStream:
+    """Holds the writer thread inside its first write until released"""
+    def __init__(self):
+        self.lines = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        self.lines.extend(text.splitlines())
+
+    def flush(self):
+        pass
+
+def test_line_writer_counts_overflow_instead_of_blocking():
+    """Test a full queue drops (and counts) lines while the writer is stuck"""
+    stream = BlockingStream()
+    writer = LineWriter(stream=stream, maxsize=2)
+    assert writer.write("line 0")
+    assert stream.writing.wait(5)
+    # The thread is blocked writing line 0: two lines fit in the queue, the rest overflow
+    results = [writer.write(f"line {i}") for i in range(1, 6)]
+    assert results == [True, True, False, False, False]
+    assert writer.stats()["dropped"] == 3
+
+    stream.release.set()
+    writer.close()
+    assert stream.lines == ["line 0", "line 1", "line 2"]
+    assert writer.stats()["written"] == 3
@@ -0,0 +1,52 @@
+import json
+import pytest
+from app.log_writer import LineWriter
+
+@pytest.mark.anyio
+async def test_admin_blog_delete_is_audited(local_db, api_client, admin_headers, audit_log_file):
+    """Test admin operations leave structured actor/action/target records"""
+    import app.audit_log as audit_log
+    await local_db.execute(
+        "INSERT INTO blogs (title, content, author_id, published) VALUES ('Old news', 'Body', 1, 1)"
+    )
+    assert (await api_client.delete("/api/admin/blogs/1", headers=admin_headers)).status_code == 200
+    assert (await api_client.delete("/api/admin/blogs/1", headers=admin_headers)).status_code == 404
+
+    audit_log.audit_writer.close()
+    records = [json.loads(line) for line in audit_log_file.read_text().splitlines()]
+    assert [(r["action"], r["outcome"]) for r in records] == [("blog.delete", "success"), ("blog.delete", "not_found")]
+    assert records[0]["actor"] == {"id": 1, "email": "admin@munsociety.edu"}
+    assert records[0]["target"] == {"type": "blog", "id": 1}
+    assert records[0]["details"] == {"title": "Old news"}
+
+@pytest.mark.anyio
+async def test_resource_upload_audit_targets_the_row(local_db, api_client, admin_headers, audit_log_file):
+    """Test uploads of the same file are audited against their own resource ids, not the shared blob"""
+    import app.audit_log as audit_log
+    for title in ("Study Guide", "Study Guide (copy)"):
+        response = await api_client.post("/api/admin/resources/upload", data={"title": title},
+                                         files={"file": ("guide.txt", b"Rules of procedure", "text/plain")},
+                                         headers=admin_headers)
+        assert response.status_code == 200
+
+    audit_log.audit_writer.close()
+    records = [json.loads(line) for line in audit_log_file.read_text().splitlines()]
+    uploads = [r for r in records if r["action"] == "resource.upload"]
+    assert [r["target"] for r in uploads] == [{"type": "resource", "id": 1}, {"type": "resource", "id": 2}]
+    assert uploads[0]["details"]["filename"] == uploads[1]["details"]["filename"]
+    assert uploads[1]["details"]["deduplicated"] is True
+
+def test_line_writer_rotates_by_size(tmp_path):
+    """Test the file is rotated once it passes max_bytes, keeping N backups"""
+    path = tmp_path / "audit.log"
+    writer = LineWriter(path=str(path), max_bytes=50, backups=2, batch_size=1)
+    for i in range(11):
+        writer.write(f"record {i:02d} " + "x" * 20)
+        writer.flush()
+    writer.close()
+
+    # 30-byte records: every second write crosses 50 bytes and rotates
+    assert writer.stats()["rotations"] == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["audit.log", "audit.log.1", "audit.log.2"]
+    assert path.read_text().startswith("record 10")
+    assert (tmp_path / "audit.log.1").read_text().startswith("record 08")
@@ -0,0 +1,99 @@
+import pytest
+from app.auth import get_current_user, invalidate_principal_cache, principal_cache
+from app.cache import TTLCache
+from app.session_tokens import decode_session_token, issue_session_token, revoke_session_token, revoke_user_sessions
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+class CountingDB:
+    """Minimal stand-in for TursoDatabase that counts credential lookups"""
+    def __init__(self):
+        self.calls = 0
+
+    async def fetchone(self, query, params=None):
+        self.calls += 1
+        email, password = params
+        if email == "member@kiit.ac.in" and password == "secret":
+            return (7, email, "Test Member", "member")
+        return None
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    invalidate_principal_cache()
+    yield
+    invalidate_principal_cache()
+
+def test_ttl_cache_lru_eviction():
+    """Test least recently used entries are evicted first"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_cache_expiry():
+    """Test entries stop being served once their TTL has passed"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+@pytest.mark.anyio
+async def test_principal_cache_skips_database():
+    """Test repeated requests with the same header only verify once"""
+    db = CountingDB()
+    user = await get_current_user("member@kiit.ac.in:secret", db)
+    again = await get_current_user("member@kiit.ac.in:secret", db)
+    assert user == again
+    assert db.calls == 1
+    assert principal_cache.stats()["hits"] >= 1
+
+@pytest.mark.anyio
+async def test_principal_cache_invalidated_by_user_id():
+    """Test a write to users forces the next request back to the database"""
+    db = CountingDB()
+    await get_current_user("member@kiit.ac.in:secret", db)
+    assert invalidate_principal_cache(user_id=7) == 1
+    await get_current_user("member@kiit.ac.in:secret", db)
+    assert db.calls == 2
+
+@pytest.mark.anyio
+async def test_session_token_skips_database():
+    """Test a bearer token from login is verified without a users lookup"""
+    db = CountingDB()
+    token, _ = issue_session_token({"id": 7, "email": "member@kiit.ac.in", "name": "Test Member", "role": "member"})
+    user = await get_current_user(f"Bearer {token}", db)
+    assert user["id"] == 7
+    assert user["role"] == "member"
+    assert db.calls == 0
+
+@pytest.mark.anyio
+async def test_session_token_tampering_and_revocation():
+    """Test forged (including non-ASCII), revoked and expired tokens are rejected"""
+    from fastapi import HTTPException
+    db = CountingDB()
+    member = {"id": 8, "email": "m@kiit.ac.in", "name": "M", "role": "member"}
+    token, _ = issue_session_token(member)
+    payload, signature = token.split(".")
+    forged = payload[:-2] + ("AA" if payload[-2:] != "AA" else "BB") + "." + signature
+    non_ascii = [f"{payload}\u00e9.{signature}", f"{payload}.{signature[:-1]}\u00e9"]
+    for bad in non_ascii:
+        assert decode_session_token(bad) is None
+        assert not revoke_session_token(bad)
+    for bad in (forged, *non_ascii, issue_session_token(member, ttl=-1)[0]):
+        with pytest.raises(HTTPException):
+            await get_current_user(f"Bearer {bad}", db)
+
+    assert revoke_session_token(token)
+    with pytest.raises(HTTPException):
+        await get_current_user(f"Bearer {token}", db)
+
+    other, _ = issue_session_token(member)
+    revoke_user_sessions(8)
+    with pytest.raises(HTTPException):
+        await get_current_user(f"Bearer {other}", db)
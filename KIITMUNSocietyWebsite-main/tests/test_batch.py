@@ -0,0 +1,97 @@
+import pytest
+from libsql_client import LibsqlError
+from app.database import TursoDatabase, get_transaction_stats
+from tests.helpers import BatchOnlyClient, RecordingClient
+
+@pytest.fixture
+def recorder(local_db, monkeypatch):
+    """Route the app's database calls through a round-trip counter"""
+    import app.database as database
+    recorder = RecordingClient(local_db.client)
+    monkeypatch.setattr(database, "turso_client", recorder)
+    return recorder
+
+@pytest.mark.anyio
+async def test_batch_is_atomic_and_gather_returns_rows(local_db):
+    """Test a failing statement rolls back the whole batch, and gather keeps statement order"""
+    with pytest.raises(LibsqlError):
+        await local_db.batch([
+            ("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("a@kiit.ac.in", "A")),
+            "INSERT INTO no_such_table VALUES (1)",
+        ])
+    results = await local_db.batch([
+        ("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("b@kiit.ac.in", "B")),
+        ("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("c@kiit.ac.in", "C")),
+    ])
+    # Nothing from the failed batch was kept, so the ids start over
+    assert [r.last_insert_rowid for r in results] == [1, 2]
+
+    emails, count = await local_db.gather("SELECT email FROM allowed_emails ORDER BY id", "SELECT COUNT(*) FROM users")
+    assert [row[0] for row in emails] == ["b@kiit.ac.in", "c@kiit.ac.in"]
+    assert count[0][0] == 1
+
+async def emails(db):
+    return [row[0] for row in await db.fetchall("SELECT email FROM allowed_emails ORDER BY id")]
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("interactive", [True, False], ids=["interactive", "batch"])
+async def test_transaction_commits_or_rolls_back(local_db, interactive, monkeypatch):
+    """Test a transaction applies all of its writes on exit, or none if the block raises"""
+    import app.database as database
+    monkeypatch.setattr(database, "_transaction_metrics", {})
+    client = RecordingClient(local_db.client) if interactive else BatchOnlyClient(local_db.client)
+    db = TursoDatabase(client)
+
+    with pytest.raises(RuntimeError):
+        async with db.transaction("roster") as tx:
+            await tx.execute("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("a@kiit.ac.in", "A"))
+            raise RuntimeError("abort")
+    with pytest.raises(LibsqlError):
+        async with db.transaction("roster") as tx:
+            await tx.execute("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("a@kiit.ac.in", "A"))
+            await tx.execute("INSERT INTO no_such_table VALUES (1)")
+    assert await emails(local_db) == []
+
+    async with db.transaction("roster") as tx:
+        assert tx.interactive is interactive
+        (count,) = await tx.fetchone("SELECT COUNT(*) FROM allowed_emails")
+        await tx.execute("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("b@kiit.ac.in", "B"))
+        await tx.execute("INSERT INTO allowed_emails (email, name) VALUES (?, ?)", ("c@kiit.ac.in", "C"))
+    assert count == 0
+    assert await emails(local_db) == ["b@kiit.ac.in", "c@kiit.ac.in"]
+
+    stats = get_transaction_stats()["roster"]
+    assert stats["commits"] == 1 and stats["rollbacks"] == 2
+
+@pytest.mark.anyio
+async def test_multi_query_endpoints_take_one_round_trip(recorder, api_client, admin_headers):
+    """Test dashboard stats and uncached listings send their queries together"""
+    response = await api_client.get("/api/admin/dashboard/stats", headers=admin_headers)
+    assert response.status_code == 200
+    assert recorder.round_trips == 1
+
+    recorder.round_trips = 0
+    assert (await api_client.get("/api/resources/public")).json()["total"] == 0
+    assert recorder.round_trips == 1
+
+@pytest.mark.anyio
+async def test_delete_member_reads_once_and_writes_once(local_db, recorder, api_client, admin_headers, monkeypatch):
+    """Test member deletion transfers their content in one transaction"""
+    import app.database as database
+    monkeypatch.setattr(database, "_transaction_metrics", {})
+    await local_db.execute("INSERT INTO users (email, password, role, name) VALUES ('m@kiit.ac.in', 'x', 'member', 'Mira')")
+    await local_db.execute("INSERT INTO authors (username, user_id) VALUES ('mira', 2)")
+    await local_db.execute("INSERT INTO blogs (title, content, author_id) VALUES ('Recap', 'Text', 2)")
+    await local_db.execute(
+        "INSERT INTO resources (title, file_path, file_size, uploaded_by) VALUES ('Guide', 'resources/g.pdf', 1, 2)"
+    )
+
+    response = await api_client.delete("/api/admin/members/2", headers=admin_headers)
+    assert response.status_code == 200
+    # Lookups, then the pipelined writes, then COMMIT
+    stats = get_transaction_stats()["member.delete"]
+    assert stats["commits"] == 1 and stats["round_trips"] == 3
+
+    assert (await local_db.fetchone("SELECT author_id FROM blogs"))[0] == 1
+    assert (await local_db.fetchone("SELECT uploaded_by FROM resources"))[0] == 1
+    assert await local_db.fetchone("SELECT id FROM users WHERE id = 2") is None
@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+import pytest
+import app.blob_store as blob_store
+from app.blob_store import collect_garbage, reference_count
+
+PDF = b"%PDF-1.4\n" + b"y" * 2048
+
+@pytest.mark.anyio
+async def test_duplicate_uploads_share_one_blob(local_db, api_client, admin_headers, storage, monkeypatch):
+    """Test identical uploads are stored once and the blob outlives all but its last row"""
+    resources_dir = os.path.join(storage.root, "resources")
+    monkeypatch.setattr(blob_store, "BLOB_RELEASE_GRACE", 0)
+
+    for title in ("Study Guide", "Study Guide (copy)"):
+        response = await api_client.post(
+            "/api/admin/resources/upload",
+            data={"title": title},
+            files={"file": ("guide.pdf", PDF, "application/pdf")},
+            headers=admin_headers
+        )
+        assert response.status_code == 200
+
+    (blob,) = os.listdir(resources_dir)
+    assert await reference_count(local_db, "resources", blob) == 2
+
+    assert (await api_client.delete("/api/resources/1/permanent", headers=admin_headers)).status_code == 200
+    assert await storage.stat(f"resources/{blob}") is not None
+    assert (await api_client.delete("/api/resources/2/permanent", headers=admin_headers)).status_code == 200
+    assert await storage.stat(f"resources/{blob}") is None
+
+@pytest.mark.anyio
+async def test_admin_blog_delete_releases_unshared_images(local_db, api_client, admin_headers, storage, monkeypatch):
+    """Test deleting a post from the admin panel removes images no other post uses"""
+    monkeypatch.setattr(blob_store, "BLOB_RELEASE_GRACE", 0)
+    for name in ("own.jpg", "shared.jpg", "legacy.jpg"):
+        await storage.write_bytes(f"images/{name}", b"\xff\xd8\xff" + name.encode())
+    await local_db.execute("INSERT INTO blogs (title, content, author_id, image1_path, image2_path, image_path) "
+                           "VALUES ('Recap', 'Text', 1, 'own.jpg', 'shared.jpg', 'legacy.jpg')")
+    await local_db.execute("INSERT INTO blogs (title, content, author_id, image1_path) VALUES ('Other', 'Text', 1, 'shared.jpg')")
+
+    assert (await api_client.delete("/api/admin/blogs/1", headers=admin_headers)).status_code == 200
+    assert await storage.stat("images/own.jpg") is None
+    assert await storage.stat("images/legacy.jpg") is None
+    assert await storage.stat("images/shared.jpg") is not None
+
+@pytest.mark.anyio
+async def test_garbage_collection_removes_only_old_unreferenced_files(local_db, storage):
+    """Test GC keeps referenced, recent and dot files and reports what it freed"""
+    images = Path(storage.staging_dir("images"))
+    for name in ("kept.png", "orphan.png", "fresh.png", ".gitkeep", ".upload-dead.part"):
+        (images / name).write_bytes(b"12345")
+    for name in ("kept.png", "orphan.png", ".upload-dead.part"):
+        os.utime(images / name, (0, 0))
+    await local_db.execute(
+        "INSERT INTO blogs (title, content, author_id, published, image1_path) VALUES ('A', 'B', 1, 1, 'kept.png')"
+    )
+
+    dry = await collect_garbage(local_db, ["images"], grace=60, dry_run=True)
+    assert dry["images"]["removed"] == 2
+    assert (images / "orphan.png").exists()
+
+    report = await collect_garbage(local_db, ["images"], grace=60)
+    assert report["images"] == {"scanned": 4, "referenced": 1, "removed": 2, "bytes_freed": 10}
+    assert sorted(p.name for p in images.iterdir()) == [".gitkeep", "fresh.png", "kept.png"]
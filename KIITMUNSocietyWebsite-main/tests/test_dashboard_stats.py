@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.dashboard_stats import REBUILD_STATS
+from tests.helpers import RecordingClient
+
+async def counters(db):
+    rows = await db.fetchall("SELECT metric, bucket, value FROM dashboard_stats WHERE value != 0 ORDER BY 1, 2")
+    return [tuple(row) for row in rows]
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+@pytest.mark.anyio
+async def test_triggers_match_a_full_recount(local_db, api_client, admin_headers):
+    """Test counters kept by triggers equal a recount after inserts, updates and deletes"""
+    for i, age in enumerate((0, 3, 3, 45)):
+        await local_db.execute("INSERT INTO users (email, password, role, name, created_at) VALUES (?, 'x', 'member', ?, ?)",
+                               (f"d{i}@kiit.ac.in", f"Delegate {i}", days_ago(age)))
+    for i, kind in enumerate(("pdf", "pdf", "docx")):
+        await local_db.execute(
+            "INSERT INTO resources (title, file_path, file_size, uploaded_by, file_type, download_count) VALUES (?, ?, 1, ?, ?, ?)",
+            (f"Guide {i}", f"r{i}", 2 + i, kind, i))
+        await local_db.execute("INSERT INTO blogs (title, content, author_id, created_at) VALUES ('Recap', 'Text', ?, ?)",
+                               (2 + i, f"2026-0{i + 1}-15 10:00:00"))
+    await local_db.execute("UPDATE resources SET download_count = download_count + 5 WHERE file_type = 'pdf'")
+    await local_db.execute("UPDATE resources SET file_type = 'pdf' WHERE file_type = 'docx'")
+    await local_db.execute("UPDATE users SET role = 'admin' WHERE id = 2")
+    await local_db.execute("UPDATE blogs SET created_at = '2025-12-01 09:00:00' WHERE id = 1")
+    response = await api_client.post("/api/admin/members/bulk-delete", headers=admin_headers, json={"member_ids": [3, 4]})
+    assert response.status_code == 200
+
+    maintained = await counters(local_db)
+    await local_db.batch(REBUILD_STATS)
+    assert maintained == await counters(local_db)
+    values = {(metric, bucket): value for metric, bucket, value in maintained}
+    # One member promoted, two deleted; their resources moved to the admin
+    assert values[("totals", "members")] == 1
+    assert values[("downloads", "pdf")] == 13 and ("downloads", "docx") not in values
+
+@pytest.mark.anyio
+async def test_dashboard_is_one_primary_key_read(local_db, api_client, admin_headers, monkeypatch):
+    """Test the dashboard endpoints read only the counters table, in one statement"""
+    import app.database as database
+    recorder = RecordingClient(local_db.client)
+    monkeypatch.setattr(database, "turso_client", recorder)
+    for i, age in enumerate((0, 29, 30)):
+        await local_db.execute("INSERT INTO users (email, password, role, name, created_at) VALUES (?, 'x', 'member', ?, ?)",
+                               (f"d{i}@kiit.ac.in", f"Delegate {i}", days_ago(age)))
+    await local_db.execute(
+        "INSERT INTO resources (title, file_path, file_size, uploaded_by, file_type, download_count) VALUES ('G', 'g', 1, 1, 'pdf', 7)")
+
+    recorder.statements.clear()
+    stats = (await api_client.get("/api/admin/dashboard/stats", headers=admin_headers)).json()
+    assert stats == {"total_members": 3, "total_blogs": 0, "total_resources": 1, "recent_registrations": 3}
+    assert len(recorder.statements) == 1 and "FROM dashboard_stats" in recorder.statements[0][0]
+
+    extended = (await api_client.get("/api/admin/dashboard/stats/extended", headers=admin_headers)).json()
+    assert len(extended["registrations_by_day"]) == 30
+    # Today: the seeded admin and one delegate
+    assert list(extended["registrations_by_day"].values())[-1] == 2
+    assert extended["downloads_by_file_type"] == {"pdf": 7}
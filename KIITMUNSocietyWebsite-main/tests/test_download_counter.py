@@ -0,0 +1,80 @@
+import pytest
+import app.download_counter as download_counter
+from app.download_counter import DownloadCounter
+
+async def insert_resource(db, title):
+    return await db.execute_with_lastrowid(
+        "INSERT INTO resources (title, file_path, file_size, uploaded_by, original_filename, filename, file_type, mime_type) "
+        "VALUES (?, 'resources/x.pdf', 10, 1, 'x.pdf', 'x.pdf', 'pdf', 'application/pdf')",
+        (title,)
+    )
+
+@pytest.mark.anyio
+async def test_flush_writes_all_deltas_in_one_statement(local_db, monkeypatch):
+    """Test pending increments are summed per resource and written together"""
+    first = await insert_resource(local_db, "Handbook")
+    second = await insert_resource(local_db, "Rules")
+    counter = DownloadCounter()
+    for _ in range(3):
+        counter.increment(first)
+    counter.increment(second)
+
+    statements = []
+    batch = local_db.batch
+    async def recording_batch(stmts):
+        statements.extend(stmts)
+        return await batch(stmts)
+    monkeypatch.setattr(local_db, "batch", recording_batch)
+
+    assert await counter.flush(local_db) == 4
+    assert len(statements) == 1
+    rows = await local_db.fetchall("SELECT id, download_count FROM resources ORDER BY id")
+    assert [tuple(row) for row in rows] == [(first, 3), (second, 1)]
+    assert counter.pending == {}
+    assert await counter.flush(local_db) == 0
+
+@pytest.mark.anyio
+async def test_failed_flush_keeps_deltas(local_db, monkeypatch):
+    """Test a failed write puts the increments back for the next flush"""
+    resource_id = await insert_resource(local_db, "Handbook")
+    counter = DownloadCounter()
+    counter.increment(resource_id, 2)
+
+    async def failing_batch(stmts):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(local_db, "batch", failing_batch)
+    assert await counter.flush(local_db) == 0
+    assert counter.pending_for(resource_id) == 2
+    assert counter.stats()["failures"] == 1
+
+@pytest.mark.anyio
+async def test_failed_later_chunk_applies_nothing_twice(local_db, monkeypatch):
+    """Test a failure in the second chunk rolls back the first, so the retry counts every download once"""
+    monkeypatch.setattr(download_counter, "FLUSH_BATCH", 1)
+    first = await insert_resource(local_db, "Handbook")
+    second = await insert_resource(local_db, "Rules")
+    counter = DownloadCounter()
+    counter.increment(first, 2)
+    counter.increment(second, 3)
+
+    await local_db.execute(
+        "CREATE TRIGGER fail_second BEFORE UPDATE OF download_count ON resources "
+        f"WHEN new.id = {second} BEGIN SELECT RAISE(ABORT, 'database unavailable'); END"
+    )
+    assert await counter.flush(local_db) == 0
+    assert counter.pending == {first: 2, second: 3}
+    rows = await local_db.fetchall("SELECT download_count FROM resources ORDER BY id")
+    assert [row[0] for row in rows] == [0, 0]
+
+    await local_db.execute("DROP TRIGGER fail_second")
+    assert await counter.flush(local_db) == 5
+    rows = await local_db.fetchall("SELECT download_count FROM resources ORDER BY id")
+    assert [row[0] for row in rows] == [2, 3]
+
+@pytest.mark.anyio
+async def test_listing_includes_pending_downloads(local_db, api_client, download_counts):
+    """Test public listings add deltas that have not been flushed yet"""
+    resource_id = await insert_resource(local_db, "Handbook")
+    download_counts.increment(resource_id, 5)
+    response = await api_client.get("/api/resources/public")
+    assert response.json()["resources"][0]["download_count"] == 5
@@ -0,0 +1,64 @@
+import json
+import pytest
+from app.email_import import iter_csv_rows, iter_json_rows
+from tests.helpers import RecordingClient
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def collect(rows):
+    return [row async for row in rows]
+
+@pytest.mark.anyio
+async def test_csv_rows_survive_any_chunking():
+    """Test BOM, CRLF, quoted newlines and an optional header parse the same in 1-byte chunks"""
+    data = '\ufeffName,Email,Role\r\n"Doe, Jane",jane@kiit.ac.in,admin\r\n\r\n"Multi\nLine",ml@kiit.ac.in,member'.encode()
+    rows = await collect(iter_csv_rows(chunked(data, 1)))
+    assert rows == [
+        (1, {"name": "Doe, Jane", "email": "jane@kiit.ac.in", "role": "admin"}),
+        (2, {"name": "Multi\nLine", "email": "ml@kiit.ac.in", "role": "member"}),
+    ]
+    headerless = await collect(iter_csv_rows(chunked(b"a@kiit.ac.in,Ana\n", 4)))
+    assert headerless == [(1, {"email": "a@kiit.ac.in", "name": "Ana"})]
+
+@pytest.mark.anyio
+async def test_json_rows_array_and_lines():
+    """Test a JSON array and JSON Lines stream object by object; truncated input is an error"""
+    records = [{"email": f"d{i}@kiit.ac.in", "name": f"Delegate {i}"} for i in range(3)]
+    for data in (json.dumps(records).encode(), "\n".join(json.dumps(r) for r in records).encode()):
+        assert await collect(iter_json_rows(chunked(data, 3))) == list(enumerate(records, start=1))
+    with pytest.raises(ValueError):
+        await collect(iter_json_rows(chunked(b'[{"email": "a@kiit.ac.in"}, {"email"', 5)))
+
+@pytest.mark.anyio
+async def test_import_endpoint_upserts_in_batches(local_db, api_client, admin_headers, monkeypatch):
+    """Test a large roster takes one round trip per batch and reports every row"""
+    import app.database as database
+    recorder = RecordingClient(local_db.client)
+    monkeypatch.setattr(database, "turso_client", recorder)
+    await local_db.execute("INSERT INTO allowed_emails (email, name, role) VALUES ('d0@kiit.ac.in', 'Old Name', 'member')")
+    await local_db.execute("INSERT INTO allowed_emails (email, name, role) VALUES ('d1@kiit.ac.in', 'Delegate 1', 'member')")
+
+    lines = ["email,name,role"] + [f"d{i}@kiit.ac.in,Delegate {i},member" for i in range(600)]
+    lines += ["not-an-email,Nobody,member", "d5@kiit.ac.in,Again,member", "x@kiit.ac.in,Rogue,chair"]
+    response = await api_client.post("/api/admin/members/import-emails", headers={**admin_headers, "Content-Type": "text/csv"},
+                                     content="\n".join(lines).encode())
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 603
+    assert body["counts"] == {"added": 598, "updated": 1, "unchanged": 1, "invalid": 2, "duplicate": 1}
+    assert body["rows"][0] == {"row": 1, "email": "d0@kiit.ac.in", "status": "updated", "error": None}
+    assert body["rows"][602]["error"] == "unknown role 'chair'"
+    # 600 valid rows in batches of 250
+    assert recorder.round_trips == 3
+
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM allowed_emails"))[0] == 600
+    assert (await local_db.fetchone("SELECT name FROM allowed_emails WHERE email = 'd0@kiit.ac.in'"))[0] == "Delegate 0"
+
+@pytest.mark.anyio
+async def test_import_endpoint_rejects_malformed_json(local_db, api_client, admin_headers):
+    """Test malformed JSON stops the import with a 400"""
+    response = await api_client.post("/api/admin/members/import-emails", headers=admin_headers,
+                                     params={"format": "json"}, content=b'[{"email": "a@kiit.ac.in", "name": "A"}, 42]')
+    assert response.status_code == 400
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import types
+import pytest
+import app.file_storage as file_storage_module
+from app.file_storage import FileStorageService
+
+class BadRequest(Exception):
+    pass
+
+class FakeUploader:
+    """Blocking stand-in for cloudinary.uploader"""
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+
+    def upload(self, content, public_id, **options):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        return {"secure_url": f"https://cdn.test/{public_id}", "public_id": public_id}
+
+    def destroy(self, public_id):
+        raise BadRequest("invalid public_id")
+
+def cloud_service(uploader):
+    service = FileStorageService()
+    service.use_cloud = True
+    service.cloudinary = types.SimpleNamespace(
+        uploader=uploader,
+        exceptions=types.SimpleNamespace(BadRequest=BadRequest)
+    )
+    return service
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(file_storage_module, "CLOUD_RETRY_BACKOFF", 0.001)
+
+@pytest.mark.anyio
+async def test_cloud_upload_does_not_block_event_loop():
+    """Test other coroutines keep running while a slow SDK upload is in flight"""
+    service = cloud_service(FakeUploader(delay=0.3))
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    url, path = await service.upload_file(b"%PDF-1.4", "guide.pdf")
+    task.cancel()
+
+    assert url.startswith("https://cdn.test/mun-resources/resource_")
+    assert ticks >= 10
+
+@pytest.mark.anyio
+async def test_cloud_retries_and_metrics():
+    """Test transient failures are retried, client errors are not, and both are timed"""
+    uploader = FakeUploader(failures=2)
+    service = cloud_service(uploader)
+    await service.upload_file(b"data", "notes.txt")
+    assert uploader.calls == 3
+
+    assert await service.delete_file("mun-resources/missing") is False
+
+    metrics = service.get_metrics()
+    assert metrics["cloudinary.upload"]["calls"] == 1
+    assert metrics["cloudinary.upload"]["retries"] == 2
+    assert metrics["cloudinary.destroy"]["errors"] == 1
+    assert metrics["cloudinary.destroy"]["retries"] == 0
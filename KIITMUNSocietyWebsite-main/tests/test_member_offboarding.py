@@ -0,0 +1,75 @@
+import pytest
+from app.database import DatabaseTransaction, get_transaction_stats
+from tests.helpers import BatchOnlyClient
+
+async def seed_members(db, count):
+    """Members 2..count+1, each with an author record, a blog and a resource"""
+    for i in range(2, count + 2):
+        await db.execute("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'member', ?)",
+                         (f"d{i}@kiit.ac.in", f"Delegate {i}"))
+        await db.execute("INSERT INTO authors (username, user_id) VALUES (?, ?)", (f"d{i}", i))
+        await db.execute("INSERT INTO blogs (title, content, author_id) VALUES ('Recap', 'Text', ?)", (i,))
+        await db.execute("INSERT INTO resources (title, file_path, file_size, uploaded_by) VALUES ('Guide', ?, 1, ?)",
+                         (f"resources/{i}.pdf", i))
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("count", [3, 60])
+async def test_bulk_delete_is_set_based(local_db, api_client, admin_headers, monkeypatch, count):
+    """Test a batch of members goes in a fixed number of statements, content moving to the admin"""
+    import app.database as database
+    monkeypatch.setattr(database, "_transaction_metrics", {})
+    await seed_members(local_db, count)
+    member_ids = list(range(2, count + 2))
+
+    response = await api_client.post("/api/admin/members/bulk-delete", headers=admin_headers,
+                                     json={"member_ids": [1, *member_ids, 999]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["deleted"] == member_ids
+    assert body["skipped"] == {"1": "admin", "999": "not_found"}
+    assert (body["transferred_to"], body["blogs"], body["resources"]) == (1, count, count)
+
+    # 4 lookups + 4 writes, whatever the number of members
+    stats = get_transaction_stats()["member.bulk_delete"]
+    assert (stats["statements"], stats["round_trips"]) == (8, 3)
+
+    assert [tuple(row) for row in await local_db.fetchall("SELECT id, role FROM users")] == [(1, "admin")]
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM authors"))[0] == 0
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM blogs WHERE author_id = 1"))[0] == count
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM resources WHERE uploaded_by = 1"))[0] == count
+
+@pytest.mark.anyio
+async def test_bulk_delete_limits(api_client, admin_headers, monkeypatch):
+    """Test empty and oversized requests are refused"""
+    import app.routers.admin as admin
+    monkeypatch.setattr(admin, "OFFBOARD_MAX_MEMBERS", 2)
+    response = await api_client.post("/api/admin/members/bulk-delete", headers=admin_headers, json={"member_ids": []})
+    assert response.status_code == 400
+    response = await api_client.post("/api/admin/members/bulk-delete", headers=admin_headers,
+                                     json={"member_ids": [2, 3, 4]})
+    assert response.status_code == 400
+
+@pytest.mark.anyio
+async def test_member_promoted_after_lookup_keeps_everything(local_db, api_client, admin_headers, monkeypatch):
+    """Test a member made admin between the lookup and the batched writes loses nothing and nobody is deleted"""
+    import app.database as database
+    monkeypatch.setattr(database, "turso_client", BatchOnlyClient(local_db.client))
+    await seed_members(local_db, 2)
+    lookup = DatabaseTransaction.gather
+
+    async def gather_then_promote(self, *statements):
+        rows = await lookup(self, *statements)
+        await local_db.execute("UPDATE users SET role = 'admin' WHERE id = 3")
+        return rows
+
+    monkeypatch.setattr(DatabaseTransaction, "gather", gather_then_promote)
+    response = await api_client.post("/api/admin/members/bulk-delete", headers=admin_headers,
+                                     json={"member_ids": [2, 3]})
+    assert response.status_code == 409
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM users"))[0] == 3
+    assert (await local_db.fetchone("SELECT COUNT(*) FROM authors"))[0] == 2
+    assert [tuple(row) for row in await local_db.fetchall("SELECT author_id FROM blogs ORDER BY id")] == [(2,), (3,)]
+    assert [tuple(row) for row in await local_db.fetchall("SELECT uploaded_by FROM resources ORDER BY id")] == [(2,), (3,)]
+
+    response = await api_client.delete("/api/admin/members/3", headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+import sqlite3
+import pytest
+from libsql_client import create_client
+from app.database import TursoDatabase
+from app.migrations import MIGRATIONS, Migration, run_migrations, schema_version
+
+HOT_PATH_INDEXES = {
+    "idx_blogs_published_order": ["published", "competition_date", "created_at"],
+    "idx_resources_active_order": ["is_active", "created_at"],
+    "idx_resources_active_type_created": ["is_active", "file_type", "created_at"],
+    "idx_carousel_active_order": ["active", "display_order"],
+}
+
+async def index_columns(db, name):
+    rows = await db.fetchall(f"PRAGMA index_info({name})")
+    return [row[2] for row in sorted(rows, key=lambda row: row[0])]
+
+@pytest.mark.anyio
+async def test_fresh_database_gets_canonical_schema(tmp_path):
+    """Test an empty database is fully built, and a second run is a no-op"""
+    db = TursoDatabase(create_client(f"file:{tmp_path / 'fresh.db'}"))
+    assert await run_migrations(db) == [m.version for m in MIGRATIONS]
+    assert await run_migrations(db) == []
+    assert await schema_version(db) == MIGRATIONS[-1].version
+
+    for name, columns in HOT_PATH_INDEXES.items():
+        assert await index_columns(db, name) == columns
+    await db.execute("INSERT INTO resources (title, file_path, file_size, uploaded_by) VALUES ('Handbook', 'x', 1, 1)")
+    rows = await db.fetchall("SELECT rowid FROM resources_fts WHERE resources_fts MATCH 'handbook'")
+    assert len(rows) == 1
+
+@pytest.mark.anyio
+async def test_old_database_is_upgraded_in_place(tmp_path):
+    """Test missing columns are added, rows keep their data and get indexed"""
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE blogs (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT NOT NULL,
+                            author_id INTEGER NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE INDEX idx_resources_active ON blogs(author_id);
+        INSERT INTO blogs (title, content, author_id) VALUES ('General Assembly recap', 'Day one', 1);
+    """)
+    conn.commit()
+    conn.close()
+
+    db = TursoDatabase(create_client(f"file:{path}"))
+    await run_migrations(db)
+    assert tuple(await db.fetchone("SELECT title, published FROM blogs")) == ("General Assembly recap", 1)
+    assert await db.fetchone("SELECT name FROM sqlite_master WHERE name = 'idx_resources_active'") is None
+    rows = await db.fetchall("SELECT rowid FROM blogs_fts WHERE blogs_fts MATCH 'assembly'")
+    assert len(rows) == 1
+    # Dashboard counters are filled from existing rows
+    assert (await db.fetchone("SELECT value FROM dashboard_stats WHERE metric = 'totals' AND bucket = 'blogs'"))[0] == 1
+
+@pytest.mark.anyio
+async def test_only_pending_migrations_run(local_db):
+    """Test new migrations apply once, in version order"""
+    latest = await schema_version(local_db)
+    extra = [
+        Migration(latest + 2, "second", ["ALTER TABLE authors ADD COLUMN twitter TEXT"]),
+        Migration(latest + 1, "first", ["CREATE TABLE IF NOT EXISTS sponsors (id INTEGER PRIMARY KEY)"]),
+    ]
+    assert await run_migrations(local_db, MIGRATIONS + extra) == [latest + 1, latest + 2]
+    assert await run_migrations(local_db, MIGRATIONS + extra) == []
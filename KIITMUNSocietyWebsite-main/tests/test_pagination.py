@@ -0,0 +1,107 @@
+import pytest
+from fastapi import HTTPException
+from app.pagination import encode_cursor, decode_cursor
+
+async def seed_blogs(db):
+    # Duplicate timestamps and NULL competition dates exercise every tie-breaker
+    for i in range(23):
+        await db.execute(
+            "INSERT INTO blogs (title, content, author_id, competition_date, created_at, updated_at, published) "
+            "VALUES (?, ?, 1, ?, ?, ?, 1)",
+            (f"Blog {i}", "content", None if i % 4 == 0 else f"2025-0{1 + i % 3}-10",
+             f"2025-06-0{1 + i % 2} 10:00:00", "2025-06-01 10:00:00")
+        )
+
+def test_cursor_round_trip():
+    """Test cursors decode to the values they were built from"""
+    cursor = encode_cursor(["2025-01-10", "2025-06-01 10:00:00", 42])
+    assert decode_cursor(cursor, 3) == ["2025-01-10", "2025-06-01 10:00:00", 42]
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, 2)
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", 3)
+
+@pytest.mark.anyio
+async def test_blog_cursor_pages_match_offset_order(local_db, api_client):
+    """Test walking next_cursor visits every blog once, in offset-mode order"""
+    await seed_blogs(local_db)
+    everything = (await api_client.get("/api/blogs", params={"limit": 50})).json()
+    assert everything["total"] == 23
+    assert everything["next_cursor"] is None
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 5, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await api_client.get("/api/blogs", params=params)).json()
+        assert page["total"] is None
+        seen.extend(blog["id"] for blog in page["blogs"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [blog["id"] for blog in everything["blogs"]]
+
+@pytest.mark.anyio
+async def test_resource_cursor_pagination(local_db, api_client):
+    """Test public resource listing pages with a (created_at, id) cursor"""
+    for i in range(7):
+        await local_db.execute(
+            "INSERT INTO resources (title, file_path, file_size, uploaded_by, created_at, original_filename, filename, file_type, mime_type) "
+            "VALUES (?, '/tmp/x', 10, 1, '2025-06-01 10:00:00', 'x.pdf', ?, 'pdf', 'application/pdf')",
+            (f"Resource {i}", f"x{i}.pdf")
+        )
+
+    first = (await api_client.get("/api/resources/public", params={"limit": 4})).json()
+    second = (await api_client.get("/api/resources/public", params={"limit": 4, "cursor": first["next_cursor"]})).json()
+    assert [r["id"] for r in first["resources"]] == [7, 6, 5, 4]
+    assert [r["id"] for r in second["resources"]] == [3, 2, 1]
+    assert second["next_cursor"] is None
+    assert first["total"] == second["total"] == 7
+
+@pytest.mark.anyio
+async def test_blog_index_projection_and_excerpt(local_db):
+    """Test the blog listing pages in SQL and honours fields= and excerpt="""
+    from app.blog_service import list_blogs
+    await seed_blogs(local_db)
+
+    result = await list_blogs(local_db, page=3, limit=10, fields="title,content", excerpt=4)
+    assert result["total"] == 23
+    assert result["pages"] == 3
+    assert len(result["blogs"]) == 3
+    assert set(result["blogs"][0]) == {"id", "title", "content"}
+    assert result["blogs"][0]["content"] == "cont"
+
+    with pytest.raises(HTTPException):
+        await list_blogs(local_db, page=1, limit=10, fields="title,password")
+
+@pytest.mark.anyio
+async def test_blog_listing_matches_its_response_model(local_db, api_client):
+    """Test full and sparse listings validate against the documented BlogPage"""
+    from app.main import app
+    from app.schemas import BlogPage
+    await seed_blogs(local_db)
+    for params in ({"limit": 5}, {"fields": "title", "include_total": "false"}):
+        page = BlogPage.model_validate((await api_client.get("/api/blogs", params=params)).json())
+        assert page.next_cursor
+    schema = app.openapi()["paths"]["/api/blogs"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["$ref"].endswith("/BlogPage")
+
+@pytest.mark.anyio
+async def test_blog_detail_resolves_author_through_cache(local_db):
+    """Test detail and list share one builder and the author lookup is cached"""
+    from app.blog_service import get_blog
+    import app.blog_service as blog_service
+    from app.schemas import Blog
+    await seed_blogs(local_db)
+
+    blog = await get_blog(local_db, 1)
+    assert blog["author"] == "MUN Admin"
+    assert blog["created_at"] == "2025-06-01T10:00:00"
+    Blog(**blog)  # Still satisfies the public response schema
+    assert 1 in blog_service.author_cache
+
+    with pytest.raises(HTTPException):
+        await get_blog(local_db, 999)
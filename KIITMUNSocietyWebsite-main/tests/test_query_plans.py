@@ -0,0 +1,200 @@
+"""
+Query-plan regression tests: every listing/detail endpoint is driven against
+a migrated database full of synthetic rows, the SQL it sends is captured and
+each statement is checked with EXPLAIN QUERY PLAN. Hot queries must not scan
+a whole table or sort outside an index. Per-query timings are kept in the
+pytest cache (query_plans/timings) and printed with -s.
+
+QUERY_PLAN_ROWS sets the table sizes, e.g. QUERY_PLAN_ROWS=10000,100000 in CI.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pytest
+from libsql_client import create_client
+from app.database import TursoDatabase
+from app.migrations import run_migrations
+from tests.helpers import RecordingClient
+
+SIZES = [int(size) for size in os.getenv("QUERY_PLAN_ROWS", "10000").split(",")]
+TIMING_RUNS = 5
+
+# Base tables and the aliases the routers give them
+TABLE_NAMES = {"users", "blogs", "resources", "carousel_images", "authors", "allowed_emails",
+               "resource_texts", "dashboard_stats", "u", "b", "r", "a"}
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+ORDER_BY_SORT = "USE TEMP B-TREE FOR"
+
+
+@dataclass
+class QueryCase:
+    name: str
+    path: str
+    params: Dict[str, str] = field(default_factory=dict)
+    # Request the page after the first one with its next_cursor
+    follow_cursor: bool = False
+    # Ranked search results are sorted by score, which no index can provide
+    index_order: bool = True
+    admin: bool = False
+
+
+CASES = [
+    QueryCase("blog list", "/api/blogs"),
+    QueryCase("blog list cursor", "/api/blogs", follow_cursor=True),
+    QueryCase("blog detail", "/api/blogs/7"),
+    QueryCase("public resources", "/api/resources/public"),
+    QueryCase("public resources by type", "/api/resources/public", {"file_type": "pdf"}),
+    QueryCase("public resources cursor", "/api/resources/public", follow_cursor=True),
+    QueryCase("public resource search", "/api/resources/public", {"search": "guide"}, index_order=False),
+    QueryCase("member resources", "/api/resources", {"file_type": "docx"}, admin=True),
+    QueryCase("resource detail", "/api/resources/7", admin=True),
+    QueryCase("carousel", "/api/carousel/"),
+    QueryCase("admin members", "/api/admin/members", admin=True),
+    QueryCase("admin members cursor", "/api/admin/members", follow_cursor=True, admin=True),
+    QueryCase("admin member search", "/api/admin/members", {"search": "delegate"}, index_order=False, admin=True),
+    QueryCase("admin blogs", "/api/admin/blogs", admin=True),
+    QueryCase("admin blogs cursor", "/api/admin/blogs", follow_cursor=True, admin=True),
+    QueryCase("admin blog search", "/api/admin/blogs", {"search": "council"}, index_order=False, admin=True),
+    QueryCase("dashboard stats", "/api/admin/dashboard/stats", admin=True),
+    QueryCase("dashboard stats extended", "/api/admin/dashboard/stats/extended", admin=True),
+]
+
+FILE_TYPES = ("pdf", "docx", "doc", "txt", "zip")
+WORDS = ("council", "guide", "assembly", "crisis", "rules", "veto", "caucus", "handbook")
+
+
+def seed(path: str, rows: int) -> None:
+    """Synthetic data shaped like production: mostly published/active rows, repeated timestamps"""
+    def day(i):
+        return f"20{20 + i % 6}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (email, password, role, name, created_at) VALUES (?, 'x', ?, ?, ?)",
+        ((f"delegate{i}@kiit.ac.in", "admin" if i % 50 == 0 else "member",
+          f"Delegate {WORDS[i % len(WORDS)]} {i}", day(i) + " 10:00:00") for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO blogs (title, content, author_id, competition_date, created_at, published) VALUES (?, ?, ?, ?, ?, ?)",
+        ((f"{WORDS[i % len(WORDS)]} report {i}", "Minutes of the session " * 20, 1 + i % rows,
+          None if i % 7 == 0 else day(i), day(i * 3) + " 09:00:00", int(i % 10 != 0)) for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO resources (title, description, file_path, file_size, uploaded_by, created_at, "
+        "original_filename, filename, file_type, mime_type, is_active) VALUES (?, ?, ?, 100, 1, ?, ?, ?, ?, '', ?)",
+        ((f"{WORDS[i % len(WORDS)]} {i}", "Background reading", f"r{i}.{FILE_TYPES[i % 5]}", day(i * 7) + " 08:00:00",
+          f"r{i}.{FILE_TYPES[i % 5]}", f"r{i}.{FILE_TYPES[i % 5]}", FILE_TYPES[i % 5], int(i % 20 != 0))
+         for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO carousel_images (title, image_path, display_order, active) VALUES (?, ?, ?, ?)",
+        ((f"Slide {i}", f"slide{i}.jpg", i % 40, int(i % 3 != 0)) for i in range(200))
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda rows: f"{rows}rows")
+def seeded_db_path(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("query_plans") / "plans.db")
+
+    async def migrate():
+        client = create_client(f"file:{path}")
+        await run_migrations(TursoDatabase(client))
+        await client.close()
+
+    asyncio.run(migrate())
+    seed(path, request.param)
+    yield path, request.param
+
+
+@pytest.fixture(scope="module")
+def timings(request):
+    """Median milliseconds per (rows, case, statement), saved when the module finishes"""
+    results: Dict[str, float] = {}
+    yield results
+    previous = request.config.cache.get("query_plans/timings", {})
+    request.config.cache.set("query_plans/timings", {**previous, **results})
+    for key, ms in sorted(results.items()):
+        was = previous.get(key)
+        trend = f" (was {was:.2f})" if was is not None else ""
+        print(f"⏱️ {key}: {ms:.2f} ms{trend}")
+
+
+async def capture(case: QueryCase, recorder, headers) -> List[tuple]:
+    from httpx import AsyncClient
+    from app.main import app
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(case.path, params=case.params, headers=headers if case.admin else None)
+        assert response.status_code == 200, response.text
+        if case.follow_cursor:
+            cursor = response.json()["next_cursor"]
+            assert cursor, f"{case.name}: first page has no next_cursor"
+            recorder.statements.clear()
+            response = await ac.get(case.path, params={**case.params, "cursor": cursor},
+                                    headers=headers if case.admin else None)
+            assert response.status_code == 200, response.text
+    return [(sql, params) for sql, params in recorder.statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def plan_problems(plan: List[tuple], index_order: bool) -> List[str]:
+    """Full table scans, sorts an index could have avoided, and full-text
+    searches re-run once per outer row (a MATCH inside a correlated subquery)"""
+    problems = []
+    correlated = set()
+    for node, parent, _, detail in plan:
+        if detail.startswith("CORRELATED") or parent in correlated:
+            correlated.add(node)
+        scan = FULL_SCAN.match(detail)
+        if scan and scan.group(1) in TABLE_NAMES:
+            problems.append(detail)
+        if index_order and detail.startswith(ORDER_BY_SORT):
+            problems.append(detail)
+        if parent in correlated and "VIRTUAL TABLE" in detail:
+            problems.append(f"per-row search: {detail}")
+    return problems
+
+
+def shape(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+async def test_query_uses_indexes(case, seeded_db_path, timings, admin_headers, monkeypatch):
+    """Test every statement behind an endpoint avoids full scans and out-of-index sorts"""
+    import app.database as database
+    path, rows = seeded_db_path
+    recorder = RecordingClient(create_client(f"file:{path}"))
+    monkeypatch.setattr(database, "turso_client", recorder)
+    db = TursoDatabase(recorder.client)
+    try:
+        statements = await capture(case, recorder, admin_headers)
+        assert statements, f"{case.name}: no SELECT statements captured"
+
+        failures = []
+        for i, (sql, params) in enumerate(statements):
+            args = params if params is not None else []
+            plan = [tuple(row) for row in await db.fetchall("EXPLAIN QUERY PLAN " + sql, args)]
+            problems = plan_problems(plan, case.index_order)
+            if problems:
+                failures.append(f"{shape(sql)}\n    problems: {json.dumps(problems)}")
+
+            samples = []
+            for _ in range(TIMING_RUNS):
+                started = time.perf_counter()
+                await db.fetchall(sql, args)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[f"{rows} rows | {case.name} | #{i}"] = sorted(samples)[TIMING_RUNS // 2]
+
+        assert not failures, f"{case.name} at {rows} rows:\n" + "\n".join(failures)
+    finally:
+        await recorder.close()
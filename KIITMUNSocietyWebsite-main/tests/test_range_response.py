@@ -0,0 +1,87 @@
+import hashlib
+import pytest
+from app.range_response import RangeNotSatisfiable, parse_range
+from app.storage_backends import InMemoryStorageBackend, set_storage
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 20
+SHA = hashlib.sha256(PDF).hexdigest()
+
+def test_parse_range():
+    """Test single, open-ended, suffix and overlapping multi-ranges"""
+    assert parse_range("bytes=0-99", 1000) == [(0, 100)]
+    assert parse_range("bytes=900-", 1000) == [(900, 1000)]
+    assert parse_range("bytes=-50", 1000) == [(950, 1000)]
+    assert parse_range("bytes=990-2000", 1000) == [(990, 1000)]
+    assert parse_range("bytes=200-299, 0-99, 250-399", 1000) == [(0, 100), (200, 400)]
+    assert parse_range("items=0-1", 1000) is None
+    assert parse_range("bytes=5-1", 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=1000-", 1000)
+
+@pytest.fixture(params=["local", "memory"])
+async def uploaded(request, local_db, api_client, admin_headers):
+    """A resource uploaded through the admin endpoint, on each kind of backend"""
+    if request.param == "memory":
+        set_storage(InMemoryStorageBackend())
+    response = await api_client.post(
+        "/api/admin/resources/upload",
+        data={"title": "Delegate Handbook"},
+        files={"file": ("handbook.pdf", PDF, "application/pdf")},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    return admin_headers
+
+@pytest.mark.anyio
+async def test_download_resumes_with_range_and_if_range(api_client, local_db, uploaded, download_counts):
+    """Test 206 for a resumed download, and a full restart when the file changed"""
+    full = await api_client.get("/api/resources/1/download", headers=uploaded)
+    assert full.status_code == 200
+    assert full.content == PDF
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["etag"] == f'"{SHA}"'
+
+    resumed = await api_client.get(
+        "/api/resources/1/download",
+        headers={**uploaded, "Range": "bytes=1000-", "If-Range": f'"{SHA}"'}
+    )
+    assert resumed.status_code == 206
+    assert resumed.content == PDF[1000:]
+    assert resumed.headers["content-range"] == f"bytes 1000-{len(PDF) - 1}/{len(PDF)}"
+
+    stale = await api_client.get(
+        "/api/resources/1/download",
+        headers={**uploaded, "Range": "bytes=1000-", "If-Range": '"some-older-version"'}
+    )
+    assert stale.status_code == 200
+    assert stale.content == PDF
+
+    # The first download and the restart count; the resumed request does not
+    assert await download_counts.flush(local_db) == 2
+    row = await local_db.fetchone("SELECT download_count FROM resources WHERE id = 1")
+    assert row[0] == 2
+
+@pytest.mark.anyio
+async def test_download_count_skips_partial_and_failed_requests(api_client, local_db, uploaded, download_counts):
+    """Test only 200s and single ranges from byte 0 count; multipart ranges, 416 and 304 do not"""
+    url = "/api/resources/1/download"
+    assert (await api_client.get(url, headers={**uploaded, "Range": "bytes=0-99"})).status_code == 206
+    assert (await api_client.get(url, headers={**uploaded, "Range": "bytes=0-9,100-109"})).status_code == 206
+    assert (await api_client.get(url, headers={**uploaded, "Range": f"bytes={len(PDF)}-"})).status_code == 416
+    assert (await api_client.get(url, headers={**uploaded, "If-None-Match": f'"{SHA}"'})).status_code == 304
+    assert await download_counts.flush(local_db) == 1
+
+@pytest.mark.anyio
+async def test_serve_file_multi_range_unsatisfiable_and_not_modified(api_client, uploaded):
+    """Test multipart ranges, 416 past the end, and 304 on a matching ETag"""
+    url = f"/api/resources/files/{SHA}.pdf"
+    multi = await api_client.get(url, headers={**uploaded, "Range": "bytes=0-9,100-109"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges")
+    assert PDF[0:10] in multi.content and PDF[100:110] in multi.content
+
+    past_end = await api_client.get(url, headers={**uploaded, "Range": f"bytes={len(PDF)}-"})
+    assert past_end.status_code == 416
+
+    cached = await api_client.get(url, headers={**uploaded, "If-None-Match": f'"{SHA}"'})
+    assert cached.status_code == 304
@@ -0,0 +1,61 @@
+import pytest
+from app.database import TursoDatabase
+from app.read_replica import ReadReplica, bind_read_session, session_key
+
+@pytest.fixture
+async def replica(local_db, local_db_path, tmp_path, monkeypatch):
+    """Replica of the local test primary, synced only when a test says so"""
+    import app.database as database
+    replica = ReadReplica(str(tmp_path / "replica" / "replica.db"), f"file:{local_db_path}", sync_on_write=False)
+    assert await replica.open()
+    monkeypatch.setattr(database, "read_replica", replica)
+    yield replica
+    await replica.close()
+
+async def member_names(db):
+    return [row[0] for row in await db.fetchall("SELECT name FROM users ORDER BY id")]
+
+@pytest.mark.anyio
+async def test_reads_are_local_until_synced(local_db, replica):
+    """Test reads come from the replica, which catches up on sync"""
+    db = TursoDatabase(local_db.client, replica)
+    # Written by another process: this one's replica cannot know yet
+    await local_db.execute("INSERT INTO users (email, password, role, name) VALUES ('b@kiit.ac.in', 'x', 'member', 'Bela')")
+    assert await member_names(db) == ["MUN Admin"]
+    assert replica.local_reads == 1
+
+    assert await replica.sync()
+    assert await member_names(db) == ["MUN Admin", "Bela"]
+
+@pytest.mark.anyio
+async def test_session_reads_its_own_writes(local_db, replica):
+    """Test the writing session reads the primary until a sync, other sessions the replica"""
+    db = TursoDatabase(local_db.client, replica)
+    bind_read_session(session_key("Bearer writer"))
+    await db.execute("UPDATE users SET name = 'Secretary General' WHERE id = 1")
+    assert await member_names(db) == ["Secretary General"]
+    assert replica.primary_reads == 1
+
+    bind_read_session(session_key("Bearer someone-else"))
+    assert await member_names(db) == ["MUN Admin"]
+
+    await replica.sync()
+    assert await member_names(db) == ["Secretary General"]
+    bind_read_session(None)
+    assert replica.stats()["lag_writes"] == 0
+    assert replica.local_reads == 2
+
+@pytest.mark.anyio
+async def test_admin_api_sees_its_write_immediately(local_db, replica, api_client, admin_headers):
+    """Test the middleware pins the admin's session: an edit shows up in the next listing"""
+    response = await api_client.put("/api/admin/members/1", json={"name": "Head Delegate"}, headers=admin_headers)
+    assert response.status_code == 200
+    members = (await api_client.get("/api/admin/members", headers=admin_headers)).json()["members"]
+    assert [m["name"] for m in members] == ["Head Delegate"]
+
+    # Another admin session is served the (not yet synced) replica
+    from app.session_tokens import issue_session_token
+    token, _ = issue_session_token({"id": 1, "email": "admin@munsociety.edu", "name": "MUN Admin", "role": "admin"})
+    other_session = {"Authorization": f"Bearer {token}"}
+    members = (await api_client.get("/api/admin/members", headers=other_session)).json()["members"]
+    assert [m["name"] for m in members] == ["MUN Admin"]
@@ -0,0 +1,99 @@
+import pytest
+
+@pytest.mark.anyio
+async def test_blog_listing_served_from_cache_until_write(local_db, api_client):
+    """Test repeat reads hit the cache and a blog write invalidates it"""
+    from app.response_cache import invalidate_responses
+    await local_db.execute(
+        "INSERT INTO blogs (title, content, author_id, published) VALUES ('First', 'Body', 1, 1)"
+    )
+
+    first = await api_client.get("/api/blogs")
+    again = await api_client.get("/api/blogs")
+    assert first.headers["x-cache"] == "MISS"
+    assert again.headers["x-cache"] == "HIT"
+    assert again.content == first.content
+
+    # Different query parameters are cached separately
+    other = await api_client.get("/api/blogs", params={"fields": "title"})
+    assert other.headers["x-cache"] == "MISS"
+
+    await local_db.execute(
+        "INSERT INTO blogs (title, content, author_id, published) VALUES ('Second', 'Body', 1, 1)"
+    )
+    stale = await api_client.get("/api/blogs")
+    assert stale.json()["total"] == 1
+
+    invalidate_responses("blogs")
+    from app.pagination import invalidate_counts
+    invalidate_counts("blogs")
+    fresh = await api_client.get("/api/blogs")
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.json()["total"] == 2
+
+@pytest.mark.anyio
+async def test_carousel_cached_and_missing_blog_not_cached(local_db, api_client):
+    """Test carousel responses are cached and 404s are never stored"""
+    await local_db.execute(
+        "INSERT INTO carousel_images (title, image_path, display_order, active) VALUES ('Slide', 'a.jpg', 1, 1)"
+    )
+    first = await api_client.get("/api/carousel/")
+    assert first.status_code == 200
+    assert first.json()[0]["image_url"] == "/uploads/carousel/a.jpg"
+    assert (await api_client.get("/api/carousel/")).headers["x-cache"] == "HIT"
+
+    assert (await api_client.get("/api/blogs/42")).status_code == 404
+    assert (await api_client.get("/api/blogs/42")).status_code == 404
+    import app.response_cache as response_cache
+    assert len(response_cache.response_cache) == 1
+
+@pytest.mark.anyio
+async def test_conditional_requests_return_304(local_db, api_client):
+    """Test ETag / Last-Modified revalidation on cached and uncached listings"""
+    from app.response_cache import invalidate_responses
+    await local_db.execute(
+        "INSERT INTO blogs (title, content, author_id, published) VALUES ('First', 'Body', 1, 1)"
+    )
+    first = await api_client.get("/api/blogs")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    revalidated = await api_client.get("/api/blogs", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert (await api_client.get("/api/blogs", headers={"If-Modified-Since": last_modified})).status_code == 304
+    assert (await api_client.get("/api/blogs", headers={"If-None-Match": '"stale"'})).status_code == 200
+
+    # A write changes the body, so the old validator no longer matches
+    await local_db.execute("UPDATE blogs SET title = 'Renamed' WHERE id = 1")
+    invalidate_responses("blogs")
+    changed = await api_client.get("/api/blogs", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    resources = await api_client.get("/api/resources/public")
+    assert resources.status_code == 200
+    again = await api_client.get("/api/resources/public", headers={"If-None-Match": resources.headers["etag"]})
+    assert again.status_code == 304
+
+@pytest.mark.anyio
+async def test_body_built_across_a_write_is_not_cached():
+    """Test an invalidation while the producer is still reading keeps its body out of the cache"""
+    from fastapi import Request
+    from app.response_cache import cached_json_response, invalidate_responses
+    request = Request({"type": "http", "method": "GET", "path": "/api/blogs", "query_string": b"", "headers": []})
+
+    async def slow_producer():
+        # A blog write lands after this read
+        invalidate_responses("blogs")
+        return {"total": 1}
+
+    async def producer():
+        return {"total": 2}
+
+    stale = await cached_json_response("blogs", request, slow_producer)
+    assert stale.headers["x-cache"] == "MISS"
+    fresh = await cached_json_response("blogs", request, producer)
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.body == b'{"total":2}'
+    assert (await cached_json_response("blogs", request, producer)).headers["x-cache"] == "HIT"
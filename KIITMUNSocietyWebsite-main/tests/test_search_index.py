@@ -0,0 +1,61 @@
+import pytest
+from app.search_index import FTS_INDEXES, highlight, match_expression
+
+async def add_resource(db, title, description, created_at):
+    await db.execute(
+        "INSERT INTO resources (title, description, file_path, file_size, uploaded_by, created_at, original_filename, filename, file_type, mime_type) "
+        "VALUES (?, ?, 'resources/x.pdf', 10, 1, ?, 'x.pdf', 'x.pdf', 'pdf', 'application/pdf')",
+        (title, description, created_at)
+    )
+
+def test_match_expression_prefixes_words_and_drops_syntax():
+    """Test user input becomes quoted prefix terms with FTS operators stripped"""
+    assert match_expression("Parl rules") == '"Parl"* "rules"*'
+    assert match_expression('title:"x" OR NEAR(') == '"title"* "x"* "OR"* "NEAR"*'
+    assert match_expression("  --  ") is None
+    assert highlight("<b>\x02rules\x03</b>") == "&lt;b&gt;<mark>rules</mark>&lt;/b&gt;"
+
+@pytest.mark.anyio
+async def test_resource_search_is_ranked_prefix_matched_and_synced(local_db, api_client):
+    """Test title hits outrank description hits, and edits/deletes update the index"""
+    await add_resource(local_db, "Study Guide", "Covers parliamentary procedure basics", "2024-01-03")
+    await add_resource(local_db, "Parliamentary Rules", "Full rules of procedure", "2024-01-01")
+    await add_resource(local_db, "Position Papers", "How to write one", "2024-01-02")
+
+    response = await api_client.get("/api/resources/public", params={"search": "parliament"})
+    body = response.json()
+    assert [r["title"] for r in body["resources"]] == ["Parliamentary Rules", "Study Guide"]
+    assert body["total"] == 2
+    assert "<mark>parliamentary</mark>" in body["resources"][1]["snippet"]
+
+    await local_db.execute("UPDATE resources SET title = 'Crisis Committee Guide' WHERE id = 2")
+    await local_db.execute("DELETE FROM resources WHERE id = 1")
+    response = await api_client.get("/api/resources/public", params={"search": "crisis"})
+    assert [r["id"] for r in response.json()["resources"]] == [2]
+    response = await api_client.get("/api/resources/public", params={"search": "parliament"})
+    assert response.json()["resources"] == []
+
+@pytest.mark.anyio
+async def test_admin_blog_and_member_search(local_db, api_client, admin_headers):
+    """Test blog search covers title/content plus author name, and member search uses the index"""
+    await local_db.execute("INSERT INTO users (email, password, role, name) VALUES ('asha@kiit.ac.in', 'x', 'member', 'Asha Verma')")
+    await local_db.execute("INSERT INTO blogs (title, content, author_id, published) VALUES ('Security Council recap', 'Veto debates', 1, 1)")
+    await local_db.execute("INSERT INTO blogs (title, content, author_id, published) VALUES ('Day two', 'Unmoderated caucus', 2, 1)")
+
+    blogs = (await api_client.get("/api/admin/blogs", params={"search": "secur"}, headers=admin_headers)).json()
+    assert [b["title"] for b in blogs["blogs"]] == ["Security Council recap"]
+    assert "<mark>Security</mark>" in blogs["blogs"][0]["snippet"]
+
+    by_author = (await api_client.get("/api/admin/blogs", params={"search": "asha"}, headers=admin_headers)).json()
+    assert [b["title"] for b in by_author["blogs"]] == ["Day two"]
+
+    members = (await api_client.get("/api/admin/members", params={"search": "verm"}, headers=admin_headers)).json()
+    assert [m["email"] for m in members["members"]] == ["asha@kiit.ac.in"]
+
+@pytest.mark.anyio
+async def test_migrated_indexes_match_search_config(local_db):
+    """Test every FTS table the queries rank over exists with the configured columns"""
+    for name, (_, _, columns, weights) in FTS_INDEXES.items():
+        rows = await local_db.fetchall(f"PRAGMA table_info({name})")
+        assert tuple(row[1] for row in rows) == columns
+        assert len(weights) == len(columns)
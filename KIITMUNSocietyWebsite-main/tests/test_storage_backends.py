@@ -0,0 +1,146 @@
+import os
+from types import SimpleNamespace
+import pytest
+import app.storage_backends as storage_backends
+from app.storage_backends import CloudinaryStorageBackend, InMemoryStorageBackend, LocalStorageBackend, set_storage
+
+DATA = bytes(range(256)) * 40
+
+@pytest.fixture(params=["local", "memory"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_backends, "STORAGE_READ_CHUNK", 1000)
+    if request.param == "local":
+        return LocalStorageBackend(str(tmp_path / "store"))
+    return InMemoryStorageBackend()
+
+@pytest.mark.anyio
+async def test_backends_round_trip_and_ranged_reads(backend):
+    """Test local and in-memory backends agree on writes, ranged reads and stat"""
+    info = await backend.write_bytes("resources/a.bin", DATA)
+    assert info.size == len(DATA)
+    assert (await backend.stat("resources/a.bin")).size == len(DATA)
+    assert await backend.read_bytes("resources/a.bin") == DATA
+    assert await backend.read_bytes("resources/a.bin", offset=2500, length=1234) == DATA[2500:3734]
+    assert await backend.read_bytes("resources/a.bin", offset=len(DATA) - 10) == DATA[-10:]
+    chunks = [chunk async for chunk in backend.read_stream("resources/a.bin")]
+    assert max(len(chunk) for chunk in chunks) == 1000
+    assert await backend.stat("resources/missing.bin") is None
+
+@pytest.mark.anyio
+async def test_backends_batch_delete_and_list(backend):
+    """Test delete_many reports per-key results and list is scoped to a kind"""
+    for name in ("a", "b", "c"):
+        await backend.write_bytes(f"images/{name}.png", b"x")
+    await backend.write_bytes("carousel/a.png", b"x")
+
+    results = await backend.delete_many(["images/a.png", "images/b.png", "images/gone.png"])
+    assert results == {"images/a.png": True, "images/b.png": True, "images/gone.png": False}
+    assert [blob.key for blob in await backend.list("images")] == ["images/c.png"]
+    assert await backend.touch("carousel/a.png")
+    assert not await backend.touch("carousel/b.png")
+
+def test_local_backend_rejects_keys_outside_root(tmp_path):
+    """Test keys cannot escape the upload root"""
+    backend = LocalStorageBackend(str(tmp_path / "store"))
+    with pytest.raises(ValueError):
+        backend.local_path("../secrets.txt")
+
+@pytest.mark.anyio
+async def test_download_streams_from_non_local_backend(local_db, api_client, admin_headers):
+    """Test resource downloads work when the backend has no local files"""
+    backend = InMemoryStorageBackend()
+    set_storage(backend)
+
+    pdf = b"%PDF-1.4\n" + DATA
+    response = await api_client.post(
+        "/api/admin/resources/upload",
+        data={"title": "Background Guide"},
+        files={"file": ("guide.pdf", pdf, "application/pdf")},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    (blob,) = await backend.list("resources")
+
+    download = await api_client.get("/api/resources/1/download", headers=admin_headers)
+    assert download.status_code == 200
+    assert download.content == pdf
+    assert 'filename="guide.pdf"' in download.headers["content-disposition"]
+
+class StubCloudinary:
+    """Just enough of the Cloudinary SDK (raw assets kept in a dict) for CloudinaryStorageBackend"""
+
+    def __init__(self):
+        self.assets = {}
+        self.uploader = SimpleNamespace(upload=self.upload, destroy=self.destroy)
+        self.api = SimpleNamespace(resource=self.resource, resources=self.resources, delete_resources=self.delete_resources)
+        self.utils = SimpleNamespace(cloudinary_url=self.cloudinary_url)
+
+    def upload(self, local_path, public_id, resource_type, overwrite):
+        with open(local_path, "rb") as f:
+            self.assets[public_id] = f.read()
+        return {"public_id": public_id, "bytes": len(self.assets[public_id])}
+
+    def destroy(self, public_id, resource_type):
+        return {"result": "ok" if self.assets.pop(public_id, None) is not None else "not found"}
+
+    def resource(self, public_id, resource_type):
+        if public_id not in self.assets:
+            raise type("NotFound", (Exception,), {})(public_id)
+        return {"bytes": len(self.assets[public_id]), "created_at": "2026-10-01T12:00:00Z"}
+
+    def resources(self, prefix, **options):
+        return {"resources": [{"public_id": public_id, "bytes": len(data)}
+                              for public_id, data in self.assets.items() if public_id.startswith(prefix)]}
+
+    def delete_resources(self, public_ids, resource_type):
+        return {"deleted": {public_id: "deleted" if self.assets.pop(public_id, None) is not None else "not_found"
+                            for public_id in public_ids}}
+
+    def cloudinary_url(self, public_id, resource_type, secure):
+        return f"https://res.cloudinary.com/demo/{resource_type}/upload/{public_id}", {}
+
+class StubService:
+    def __init__(self):
+        self.cloudinary = StubCloudinary()
+
+    async def _run_blocking(self, operation, call):
+        return call()
+
+@pytest.mark.anyio
+async def test_cloudinary_backend_with_stub_client(tmp_path):
+    """Test keys map to raw public ids under the folder and every operation reports per key"""
+    service = StubService()
+    backend = CloudinaryStorageBackend(service=service, folder="mun")
+    local = tmp_path / "upload.part"
+    local.write_bytes(DATA)
+
+    info = await backend.put_file("resources/a.pdf", str(local))
+    assert info.size == len(DATA)
+    assert not os.path.exists(local)
+    assert service.cloudinary.assets["mun/resources/a.pdf"] == DATA
+    assert (await backend.stat("resources/a.pdf")).size == len(DATA)
+    assert await backend.stat("resources/missing.pdf") is None
+
+    await backend.write_bytes("images/b.png", b"png")
+    assert [blob.key for blob in await backend.list("images")] == ["images/b.png"]
+    assert backend.url("images/b.png") == "https://res.cloudinary.com/demo/raw/upload/mun/images/b.png"
+    assert await backend.delete_many(["images/b.png", "images/gone.png"]) == {"images/b.png": True, "images/gone.png": False}
+    assert await backend.delete("resources/a.pdf")
+    assert service.cloudinary.assets == {}
+
+@pytest.mark.anyio
+async def test_blog_images_link_to_the_remote_backend(local_db, api_client, admin_headers):
+    """Test images stored remotely are served from the backend's URL, not the /uploads mount"""
+    service = StubService()
+    set_storage(CloudinaryStorageBackend(service=service, folder="mun"))
+    png = b"\x89PNG\r\n\x1a\n" + DATA
+    response = await api_client.post("/api/blogs", headers=admin_headers, data={"title": "Recap", "content": "Text"},
+                                     files={"image1": ("cover.png", png, "image/png")})
+    assert response.status_code == 200
+    (public_id,) = service.cloudinary.assets
+    expected = f"https://res.cloudinary.com/demo/raw/upload/{public_id}"
+    assert response.json()["image1_url"] == expected
+
+    blog = (await api_client.get(f"/api/blogs/{response.json()['id']}")).json()
+    assert blog["image1_url"] == expected
+    assert blog["image2_url"] is None
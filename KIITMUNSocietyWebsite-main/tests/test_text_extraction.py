@@ -0,0 +1,98 @@
+import io
+import zipfile
+import pytest
+from app.text_extraction import UnsupportedFormat, backfill_resource_texts, extract_text, wait_for_extractions
+
+def make_docx(*paragraphs):
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def make_pdf(text):
+    """One-page PDF showing `text` in Helvetica"""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+def test_extract_text_formats(tmp_path):
+    """Test PDF, DOCX, TXT and ZIP extraction, and that unknown formats are reported"""
+    pdf = tmp_path / "background.pdf"
+    pdf.write_bytes(make_pdf("Security Council Background Guide"))
+    assert extract_text(str(pdf), ".pdf") == "Security Council Background Guide"
+
+    docx = tmp_path / "guide.docx"
+    docx.write_bytes(make_docx("Rules of Procedure", "Points of order"))
+    assert extract_text(str(docx), ".docx") == "Rules of Procedure Points of order"
+
+    bundle = tmp_path / "bundle.zip"
+    bundle.write_bytes(make_zip({"notes.txt": "Moderated   caucus\n\n", "papers/brief.docx": make_docx("Veto power")}))
+    text = extract_text(str(bundle), ".zip")
+    assert "Moderated caucus" in text and "Veto power" in text and "papers/brief.docx" in text
+
+    notes = tmp_path / "notes.txt"
+    notes.write_bytes("Résolution 2231".encode("utf-16"))
+    assert extract_text(str(notes), ".txt") == "Résolution 2231"
+
+    with pytest.raises(UnsupportedFormat):
+        extract_text(str(docx), ".rar")
+
+@pytest.mark.anyio
+async def test_uploaded_document_body_is_searchable(local_db, api_client, admin_headers):
+    """Test an upload is extracted in the background and matched by its contents"""
+    response = await api_client.post(
+        "/api/admin/resources/upload",
+        data={"title": "Committee Notes"},
+        files={"file": ("notes.txt", b"Delegates discussed the humanitarian corridor proposal.", "text/plain")},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    await wait_for_extractions()
+
+    row = await local_db.fetchone("SELECT status FROM resource_texts WHERE resource_id = 1")
+    assert row[0] == "indexed"
+    found = (await api_client.get("/api/resources/public", params={"search": "humanitar"})).json()
+    assert [r["title"] for r in found["resources"]] == ["Committee Notes"]
+    assert "<mark>humanitarian</mark>" in found["resources"][0]["snippet"]
+
+@pytest.mark.anyio
+async def test_backfill_indexes_existing_files_once(local_db, storage):
+    """Test the backfill covers resources without text and skips them afterwards"""
+    await storage.write_bytes("resources/guide.docx", make_docx("Crisis committee procedure"))
+    await storage.write_bytes("resources/archive.rar", b"Rar!\x1a\x07\x00")
+    for name in ("guide.docx", "archive.rar"):
+        await local_db.execute(
+            "INSERT INTO resources (title, file_path, file_size, uploaded_by, original_filename, filename, file_type, mime_type) "
+            "VALUES (?, ?, 10, 1, ?, ?, 'doc', 'application/octet-stream')",
+            (name, f"resources/{name}", name, name)
+        )
+
+    assert await backfill_resource_texts(local_db) == {"resources": 2, "indexed": 1, "unsupported": 1}
+    assert await backfill_resource_texts(local_db) == {"resources": 0}
+    rows = await local_db.fetchall("SELECT rowid FROM resource_texts_fts WHERE resource_texts_fts MATCH 'crisis'")
+    assert len(rows) == 1
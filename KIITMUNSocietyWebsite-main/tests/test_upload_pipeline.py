@@ -0,0 +1,78 @@
+import hashlib
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+import app.upload_pipeline as upload_pipeline
+from app.upload_pipeline import store_upload, sniff_content_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+PDF = b"%PDF-1.4\n" + b"x" * 5000
+
+def make_upload(data, filename="file.bin"):
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(upload_pipeline, "UPLOAD_CHUNK_SIZE", 1024)
+
+def test_sniff_content_type():
+    """Test magic-byte detection of the supported formats"""
+    assert sniff_content_type(PNG[:16]) == "image/png"
+    assert sniff_content_type(b"%PDF-1.7") == "application/pdf"
+    assert sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_content_type(b"PK\x03\x04rest") == "application/zip"
+    assert sniff_content_type("Résolution".encode("utf-8")[:2]) == "text/plain"
+    assert sniff_content_type(b"\x00\x01\x02\xff") is None
+    for encoding in ("utf-8-sig", "utf-16", "utf-16-be", "utf-32"):
+        data = ("\ufeff" if encoding == "utf-16-be" else "") + "Résolution 2231"
+        assert sniff_content_type(data.encode(encoding)[:16]) == "text/plain"
+
+@pytest.mark.anyio
+async def test_store_upload_hashes_and_moves_into_place(storage):
+    """Test the file lands atomically with its size and hash computed in one pass"""
+    stored = await store_upload(make_upload(PDF), storage, "resources", ".pdf", max_size=10_000)
+    sha256 = hashlib.sha256(PDF).hexdigest()
+    assert stored.size == len(PDF)
+    assert stored.sha256 == sha256
+    assert stored.key == f"resources/{sha256}.pdf"
+    assert stored.content_type == "application/pdf"
+    assert [blob.key for blob in await storage.list("resources")] == [stored.key]
+    assert await storage.read_bytes(stored.key) == PDF
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("data, filename, allowed, status", [
+    (PDF, "big.pdf", None, 413),
+    (b"", "empty.pdf", None, 400),
+    (PDF[:100], "fake.png", None, 400),
+    (PDF[:100], "notes.bin", upload_pipeline.IMAGE_TYPES, 400),
+], ids=["too-large", "empty", "extension-mismatch", "not-an-image"])
+async def test_store_upload_rejections_leave_nothing_behind(storage, data, filename, allowed, status):
+    """Test oversized, empty and mismatched uploads are rejected and cleaned up"""
+    extension = "." + filename.rsplit(".", 1)[1]
+    with pytest.raises(HTTPException) as exc:
+        await store_upload(make_upload(data, filename), storage, "resources", extension, max_size=4096, allowed_types=allowed)
+    assert exc.value.status_code == status
+    assert await storage.list("resources") == []
+
+@pytest.mark.anyio
+async def test_admin_resource_upload_streams_to_storage(local_db, api_client, admin_headers, storage):
+    """Test the resource upload endpoint stores the streamed file and its size"""
+    response = await api_client.post(
+        "/api/admin/resources/upload",
+        data={"title": "Rules of Procedure"},
+        files={"file": ("rules.pdf", PDF, "application/pdf")},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    row = await local_db.fetchone("SELECT file_path, file_size FROM resources WHERE title = 'Rules of Procedure'")
+    assert row[1] == len(PDF)
+    assert await storage.read_bytes(row[0]) == PDF
+
+    spoofed = await api_client.post(
+        "/api/admin/resources/upload",
+        data={"title": "Spoofed"},
+        files={"file": ("virus.pdf", b"MZ\x90\x00 not a pdf", "application/pdf")},
+        headers=admin_headers
+    )
+    assert spoofed.status_code == 400
+    assert len(await storage.list("resources")) == 1